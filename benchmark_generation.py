@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the quote generation pipeline
+
+Drives generate_random_quote(), cleanup_old_history(),
+get_recently_used_quote_ids() and generate_all_theme_files() against synthetic
+catalogs and histories in a temporary directory, reports wall time, peak
+allocated memory and bytes written, and compares them with a committed
+baseline so regressions are caught before they reach the daily workflow.
+
+Usage:
+    python3 benchmark_generation.py                   # Quick run (1k-10k), compare with baseline
+    python3 benchmark_generation.py --full            # 1k-1M catalogs and histories, compare with the full baseline
+    python3 benchmark_generation.py --update-baseline # Record current results as the baseline
+    python3 benchmark_generation.py --metrics alloc,bytes  # Only gate on machine-independent metrics
+
+Output:
+    Exits with status 1 if any benchmark regressed past its tolerance
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+import generate_random_quote as gq
+
+
+BASELINE_FILE = Path(__file__).parent / 'benchmarks' / 'generation-baseline.json'
+FULL_BASELINE_FILE = Path(__file__).parent / 'benchmarks' / 'generation-baseline-full.json'
+
+QUICK_SIZES = [1_000, 10_000]
+FULL_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+# Allowed growth over the baseline before a result counts as a regression
+TOLERANCES = {
+    'wall': 0.50,
+    'alloc': 0.25,
+    'bytes': 0.10,
+}
+
+# Wall-time changes smaller than this are timer noise, not regressions
+MIN_WALL_DELTA = 0.005  # seconds
+
+THEMES = ['Wisdom', 'Humor', 'Growth', 'Combat', 'Identity', 'Confidence', 'Iconic', 'Villainy']
+AUTHORS = ['Master Oogway', 'Po', 'Master Shifu', 'Tigress', 'Mr. Ping', 'Tai Lung', 'Lord Shen', 'Kai']
+MOVIES = ['Kung Fu Panda', 'Kung Fu Panda 2', 'Kung Fu Panda 3', 'Kung Fu Panda 4']
+WORDS = ['inner', 'peace', 'dragon', 'warrior', 'scroll', 'destiny', 'noodle', 'master',
+         'path', 'today', 'gift', 'present', 'kung', 'fu', 'awesome', 'water', 'mind']
+
+
+def make_catalog(size, seed=0):
+    """Build a synthetic catalog shaped like quotes.json
+
+    Args:
+        size: Number of quotes
+        seed: Random seed so runs are reproducible
+
+    Returns:
+        List of quote dictionaries
+    """
+    rng = random.Random(seed)
+    return [
+        {
+            'id': i,
+            'text': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(4, 24))).capitalize() + '.',
+            'author': rng.choice(AUTHORS),
+            'movie': rng.choice(MOVIES),
+            'theme': rng.choice(THEMES),
+        }
+        for i in range(1, size + 1)
+    ]
+
+
+def make_history(size, catalog_size, seed=0):
+    """Build a synthetic history spread over twice the reuse window
+
+    About half of the entries are older than DAYS_BEFORE_REUSE, so cleanup has
+    real work to do.
+
+    Args:
+        size: Number of history entries
+        catalog_size: Largest quote id to reference
+        seed: Random seed so runs are reproducible
+
+    Returns:
+        History dictionary with 'quotes' list
+    """
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    window = timedelta(days=gq.DAYS_BEFORE_REUSE * 2).total_seconds()
+    entries = []
+    for _ in range(size):
+        selected = now - timedelta(seconds=rng.random() * window)
+        entries.append({
+            'id': rng.randint(1, catalog_size),
+            'text': 'Synthetic quote',
+            'author': rng.choice(AUTHORS),
+            'movie': rng.choice(MOVIES),
+            'theme': rng.choice(THEMES),
+            'selected_on': selected.isoformat().replace('+00:00', 'Z'),
+        })
+    return {'quotes': entries}
+
+
+def directory_bytes(path):
+    """Total size in bytes of all files under path"""
+    return sum(f.stat().st_size for f in Path(path).rglob('*') if f.is_file())
+
+
+class Workspace:
+    """Temporary catalog, history and output directory for one benchmark case"""
+
+    def __init__(self, catalog_size, history_size):
+        self.root = Path(tempfile.mkdtemp(prefix='kfp-bench-'))
+        self.quotes_file = self.root / 'quotes.json'
+        self.history_file = self.root / 'state' / '.quote-history.json'
+        self.output_root = self.root / 'out'
+        self.history_file.parent.mkdir()
+        self.output_root.mkdir()
+
+        self.catalog = make_catalog(catalog_size)
+        with open(self.quotes_file, 'w', encoding='utf-8') as f:
+            json.dump(self.catalog, f, indent=2, ensure_ascii=False)
+
+        self.history = make_history(history_size, catalog_size)
+        self.history_text = json.dumps(self.history, indent=2, ensure_ascii=False)
+
+    def reset(self):
+        """Restore the history file, empty the output directory and drop cached catalogs"""
+        self.history_file.write_text(self.history_text, encoding='utf-8')
+        shutil.rmtree(self.output_root)
+        self.output_root.mkdir()
+        # Every run is a fresh process in production, so measure catalog loading too
+        gq._catalog_cache.clear()
+        gq._theme_indexes.clear()
+
+    def bytes_written(self):
+        """Bytes of history and endpoint files written since the last reset"""
+        return self.history_file.stat().st_size + directory_bytes(self.output_root)
+
+    @contextlib.contextmanager
+    def patched(self):
+        """Point the generator at this workspace"""
+        with patch.object(gq, 'QUOTES_FILE', self.quotes_file), \
+                patch.object(gq, 'HISTORY_FILE', self.history_file), \
+                patch.object(gq, 'OUTPUT_ROOT', self.output_root), \
+                contextlib.redirect_stdout(io.StringIO()):
+            yield
+
+    def close(self):
+        """Remove the workspace"""
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def measure(func, workspace, repeat, writes_files):
+    """Run func repeatedly and collect wall time, peak allocation and bytes written
+
+    Args:
+        func: Zero-argument callable to benchmark
+        workspace: Workspace the generator is pointed at
+        repeat: Number of timed runs (the fastest one is reported)
+        writes_files: Whether func writes history/endpoint files
+
+    Returns:
+        Dictionary with 'wall', 'alloc' and 'bytes' results
+    """
+    timings = []
+    with workspace.patched():
+        for _ in range(repeat):
+            workspace.reset()
+            random.seed(0)
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+
+        # Allocation tracing slows everything down, so it gets its own run
+        workspace.reset()
+        random.seed(0)
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        'wall': min(timings),
+        'alloc': peak,
+        'bytes': workspace.bytes_written() if writes_files else 0,
+    }
+
+
+def run_benchmarks(sizes, repeat):
+    """Run every benchmark case for the given catalog/history sizes
+
+    Args:
+        sizes: List of sizes used for both catalogs and histories
+        repeat: Number of timed runs per case
+
+    Returns:
+        Dictionary mapping case name to its results
+    """
+    results = {}
+
+    for size in sizes:
+        # Catalog scaling: large catalog, realistic 30-day history
+        workspace = Workspace(catalog_size=size, history_size=gq.DAYS_BEFORE_REUSE * 9)
+        try:
+            results[f'generate_random_quote/catalog={size}'] = measure(
+                lambda: gq.generate_random_quote(theme_filter='wisdom'), workspace, repeat, True)
+            results[f'generate_all_theme_files/catalog={size}'] = measure(
+                gq.generate_all_theme_files, workspace, repeat, True)
+        finally:
+            workspace.close()
+
+        # History scaling: realistic catalog, large history
+        workspace = Workspace(catalog_size=1_000, history_size=size)
+        try:
+            history = workspace.history
+            cleaned = gq.cleanup_old_history(history)
+            results[f'cleanup_old_history/history={size}'] = measure(
+                lambda: gq.cleanup_old_history(history), workspace, repeat, False)
+            results[f'get_recently_used_quote_ids/history={size}'] = measure(
+                lambda: gq.get_recently_used_quote_ids(cleaned), workspace, repeat, False)
+            results[f'generate_random_quote/history={size}'] = measure(
+                lambda: gq.generate_random_quote(theme_filter='wisdom'), workspace, repeat, True)
+        finally:
+            workspace.close()
+
+        print(f"  ✓ size {size:,}")
+
+    return results
+
+
+def compare_with_baseline(results, baseline, metrics):
+    """Compare results with the baseline
+
+    Args:
+        results: Current results
+        baseline: Baseline results (same shape)
+        metrics: Metrics to gate on ('wall', 'alloc', 'bytes')
+
+    Returns:
+        List of regression descriptions
+    """
+    regressions = []
+    for case, current in results.items():
+        if case not in baseline:
+            continue
+        for metric in metrics:
+            previous = baseline[case].get(metric)
+            if not previous:
+                continue
+            limit = previous * (1 + TOLERANCES[metric])
+            if metric == 'wall' and current[metric] - previous < MIN_WALL_DELTA:
+                continue
+            if current[metric] > limit:
+                change = (current[metric] / previous - 1) * 100
+                regressions.append(f"{case}: {metric} {previous:,.4g} → {current[metric]:,.4g} (+{change:.0f}%)")
+    return regressions
+
+
+def print_results(results):
+    """Print a results table"""
+    print(f"\n{'Case':<48s} | {'Wall (ms)':>10s} | {'Peak alloc (KB)':>15s} | {'Written (KB)':>12s}")
+    print('-' * 95)
+    for case, result in results.items():
+        print(f"{case:<48s} | {result['wall'] * 1000:10.2f} | {result['alloc'] / 1024:15.1f} | {result['bytes'] / 1024:12.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the quote generation pipeline')
+    parser.add_argument('--full', action='store_true', help='Run 1k-1M sizes instead of the quick 1k-10k set')
+    parser.add_argument('--sizes', help='Comma-separated catalog/history sizes (overrides --full)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per case (default: 3)')
+    parser.add_argument('--metrics', default='wall,alloc,bytes', help='Metrics to gate on (default: wall,alloc,bytes)')
+    parser.add_argument('--baseline', type=Path,
+                        help=f'Baseline JSON file (default: {BASELINE_FILE.name}, or {FULL_BASELINE_FILE.name} with --full)')
+    parser.add_argument('--output', type=Path, help='Write results to this JSON file')
+    parser.add_argument('--update-baseline', action='store_true', help='Record results as the new baseline')
+    args = parser.parse_args(argv)
+
+    if args.sizes:
+        sizes = [int(s) for s in args.sizes.split(',')]
+    else:
+        sizes = FULL_SIZES if args.full else QUICK_SIZES
+    metrics = [m.strip() for m in args.metrics.split(',') if m.strip()]
+    if args.baseline is None:
+        args.baseline = FULL_BASELINE_FILE if args.full else BASELINE_FILE
+
+    print(f"⏱️  Benchmarking quote generation (sizes: {', '.join(f'{s:,}' for s in sizes)})\n")
+    results = run_benchmarks(sizes, args.repeat)
+    print_results(results)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + '\n', encoding='utf-8')
+        print(f"\n📄 Results written to {args.output}")
+
+    if args.update_baseline:
+        baseline = {}
+        if args.baseline.exists():
+            baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+        baseline.update(results)
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(baseline, indent=2) + '\n', encoding='utf-8')
+        print(f"\n✅ Baseline updated: {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"\nℹ️  No baseline at {args.baseline}. Run with --update-baseline to record one.")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+    regressions = compare_with_baseline(results, baseline, metrics)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) against {args.baseline.name}:")
+        for regression in regressions:
+            print(f"   - {regression}")
+        return 1
+
+    print(f"\n✅ No regressions against {args.baseline.name} ({', '.join(metrics)})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Benchmark and regression gate for the poster optimization scripts
+
+Runs the width search of resize_posters_optimized.py (PNG) and
+resize_posters_webp.py (WebP/cwebp) on the posters already in the repository,
+entirely offline and into a temporary directory, and records per poster:
+    - encode time (whole width search, including cwebp subprocesses)
+    - encoder call count
+    - peak RSS of the worker process and its cwebp children
+    - final width, encoder setting, file size and SSIM (and the metric the
+      search scored with: 'ssim', or None for the width-only fallback)
+
+Each poster runs in its own worker process so peak RSS is per poster.
+
+Usage:
+    python3 benchmark_posters.py                   # Benchmark and compare with baseline
+    python3 benchmark_posters.py --update-baseline # Record current results as the baseline
+    python3 benchmark_posters.py --encoders png    # Only benchmark the PNG script
+    python3 benchmark_posters.py --metrics quality # Only gate on machine-independent results
+
+Output:
+    Writes results to benchmarks/posters-latest.json and exits with status 1 if
+    any poster got slower, or scored a lower SSIM (narrower, when neither run
+    was scored) under the same size budget
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+
+PROJECT_ROOT = Path(__file__).parent
+BASELINE_FILE = PROJECT_ROOT / 'benchmarks' / 'posters-baseline.json'
+RESULTS_FILE = PROJECT_ROOT / 'benchmarks' / 'posters-latest.json'
+
+# Poster sources already in the repository (original BW outline PNGs)
+SOURCES = {
+    'raw': PROJECT_ROOT / 'assets' / 'posters-raw',
+    'small': PROJECT_ROOT / 'assets' / 'posters-small-bw-outline',
+}
+SOURCE_PATTERN = '*-poster-bw-outline.png'
+
+# encoder name -> (module, encode function name, output extension)
+ENCODERS = {
+    'png': ('resize_posters_optimized', 'resize_image', '.png'),
+    'webp': ('resize_posters_webp', 'resize_and_convert_to_webp', '.webp'),
+}
+
+# A poster is "slower" only if it exceeds the baseline by this much
+TIME_TOLERANCE = 0.25
+MIN_TIME_DELTA = 0.05  # seconds
+
+METRICS = ('time', 'quality')
+
+
+def max_rss_bytes(who):
+    """Peak resident set size in bytes for RUSAGE_SELF or RUSAGE_CHILDREN"""
+    rss = resource.getrusage(who).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def benchmark_poster(task):
+    """Run one encoder's width search on one poster (in a worker process)
+
+    Args:
+        task: Tuple of (encoder, source name, poster path)
+
+    Returns:
+        Result dictionary for this poster
+    """
+    encoder, source, poster_path = task
+    module_name, func_name, extension = ENCODERS[encoder]
+
+    module = __import__(module_name)
+    import poster_quality
+    encode = getattr(module, func_name)
+    calls = {'count': 0}
+
+    def counting_encode(*args, **kwargs):
+        calls['count'] += 1
+        return encode(*args, **kwargs)
+
+    work_dir = tempfile.mkdtemp(prefix='kfp-posters-')
+    try:
+        temp_output = os.path.join(work_dir, Path(poster_path).stem + extension + '.tmp')
+        with patch.object(module, func_name, counting_encode), \
+                open(os.devnull, 'w') as devnull, \
+                patch('sys.stdout', devnull):
+            start = time.perf_counter()
+            chosen, _ = module.find_optimal_width(str(poster_path), temp_output, module.TARGET_MAX_SIZE)
+            elapsed = time.perf_counter() - start
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        'encoder': encoder,
+        'source': source,
+        'poster': Path(poster_path).name,
+        'target_max_size': module.TARGET_MAX_SIZE,
+        'encode_time': elapsed,
+        'encoder_calls': calls['count'],
+        'peak_rss': max(max_rss_bytes(resource.RUSAGE_SELF), max_rss_bytes(resource.RUSAGE_CHILDREN)),
+        'final_width': chosen['width'] if chosen else None,
+        'final_bytes': chosen['bytes'] if chosen else None,
+        'final_setting': chosen['setting'] if chosen else None,
+        'final_ssim': chosen.get('ssim') if chosen else None,
+        'metric': 'ssim' if poster_quality.np is not None else None,
+    }
+
+
+def result_key(result):
+    """Stable key identifying a poster benchmark across runs"""
+    return f"{result['encoder']}/{result['source']}/{result['poster']}"
+
+
+def collect_tasks(encoders):
+    """List (encoder, source, poster) tasks for every poster on disk"""
+    tasks = []
+    for encoder in encoders:
+        for source, directory in SOURCES.items():
+            for poster in sorted(directory.glob(SOURCE_PATTERN)):
+                tasks.append((encoder, source, str(poster)))
+    return tasks
+
+
+def quality_metric(result):
+    """Metric a result's width search scored with ('ssim' or None)"""
+    if 'metric' in result:
+        return result['metric']
+    return 'ssim' if result.get('final_ssim') is not None else None
+
+
+def compare_with_baseline(results, baseline, metrics=METRICS):
+    """Find posters that got slower or looked worse than the baseline
+
+    Quality is only compared when the size budget and the search metric are
+    unchanged: by SSIM when both runs scored the poster, by width when neither
+    did. The scored search may pick a narrower, cleaner setting than the
+    width-only fallback, so a scored run is never compared by width.
+
+    Args:
+        results: Dictionary of current results keyed by result_key()
+        baseline: Dictionary of baseline results keyed the same way
+        metrics: Metrics to gate on ('time', 'quality')
+
+    Returns:
+        List of regression descriptions
+    """
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+
+        if ('time' in metrics
+                and current['encode_time'] > previous['encode_time'] * (1 + TIME_TOLERANCE)
+                and current['encode_time'] - previous['encode_time'] > MIN_TIME_DELTA):
+            regressions.append(f"{key}: slower {previous['encode_time']:.3f}s → {current['encode_time']:.3f}s")
+
+        if ('quality' not in metrics or current['target_max_size'] != previous['target_max_size']
+                or quality_metric(current) != quality_metric(previous)):
+            continue
+        if quality_metric(current) == 'ssim':
+            before, after = previous['final_ssim'] or 0, current['final_ssim'] or 0
+            if after < before:
+                regressions.append(f"{key}: lower SSIM {before:.4f} → {after:.4f}")
+        elif (current['final_width'] or 0) < (previous['final_width'] or 0):
+            regressions.append(f"{key}: narrower {previous['final_width']}px → {current['final_width']}px")
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the poster optimization scripts')
+    parser.add_argument('--encoders', default='png,webp', help='Comma-separated encoders to run (default: png,webp)')
+    parser.add_argument('--baseline', type=Path, default=BASELINE_FILE, help='Baseline JSON file')
+    parser.add_argument('--output', type=Path, default=RESULTS_FILE, help='Results JSON file')
+    parser.add_argument('--metrics', default='time,quality', help='Metrics to gate on (default: time,quality)')
+    parser.add_argument('--update-baseline', action='store_true', help='Record results as the new baseline')
+    args = parser.parse_args(argv)
+
+    encoders = [e.strip() for e in args.encoders.split(',') if e.strip()]
+    unknown = [e for e in encoders if e not in ENCODERS]
+    if unknown:
+        print(f"❌ Unknown encoder(s): {', '.join(unknown)}")
+        return 1
+    metrics = [m.strip() for m in args.metrics.split(',') if m.strip()]
+    unknown = [m for m in metrics if m not in METRICS]
+    if unknown:
+        print(f"❌ Unknown metric(s): {', '.join(unknown)}")
+        return 1
+
+    try:
+        import PIL  # noqa: F401  (both resize scripts need Pillow)
+    except ImportError:
+        print("❌ Error: Pillow not found. Please install via: pip install Pillow")
+        return 1
+
+    if 'webp' in encoders and shutil.which('cwebp') is None:
+        print("⚠️  cwebp not found, skipping WebP benchmarks (install via: brew install webp)")
+        encoders.remove('webp')
+
+    tasks = collect_tasks(encoders)
+    if not tasks:
+        print("No posters to benchmark")
+        return 1
+
+    print(f"⏱️  Benchmarking {len(tasks)} poster encodes ({', '.join(encoders)})\n")
+
+    # One task per worker process so ru_maxrss is per poster
+    with multiprocessing.Pool(processes=1, maxtasksperchild=1) as pool:
+        results = {}
+        for result in pool.imap(benchmark_poster, tasks):
+            results[result_key(result)] = result
+            width = f"{result['final_width']}px @ {result['final_setting']}" if result['final_width'] else 'none'
+            if result['final_ssim'] is not None:
+                width += f" (SSIM {result['final_ssim']:.4f})"
+            print(f"  {result_key(result):<60s} {result['encode_time']:6.2f}s "
+                  f"{result['encoder_calls']:2d} calls {result['peak_rss'] / 1024 / 1024:6.1f} MB RSS -> {width}")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2) + '\n', encoding='utf-8')
+    print(f"\n📄 Results written to {args.output}")
+
+    if args.update_baseline:
+        baseline = {}
+        if args.baseline.exists():
+            baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+        baseline.update(results)
+        args.baseline.write_text(json.dumps(baseline, indent=2) + '\n', encoding='utf-8')
+        print(f"✅ Baseline updated: {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"ℹ️  No baseline at {args.baseline}. Run with --update-baseline to record one.")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+    regressions = compare_with_baseline(results, baseline, metrics)
+    if regressions:
+        print(f"\n❌ {len(regressions)} poster regression(s) against {args.baseline.name}:")
+        for regression in regressions:
+            print(f"   - {regression}")
+        return 1
+
+    print(f"✅ No poster regressions against {args.baseline.name} ({', '.join(metrics)})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Paged catalog publishing
+
+quotes.json is one file: a client that wants a few quotes, or one theme,
+downloads the whole catalog, and any edit changes that file for every
+cache. The generator also publishes the catalog as pages keyed by id range:
+
+    api/catalog/manifest.json               Pages with counts, id ranges and content hashes
+    api/catalog/pages/<n>.json              Quotes with ids n * PAGE_SIZE to n * PAGE_SIZE + PAGE_SIZE - 1
+    api/catalog/themes/<theme>/<n>.json     The same id range for one theme
+
+Theme shards come from generate_random_quote.theme_index(), the index the
+generator picks from. Pages hold the same records as quotes.json, so a
+client can use them as a drop-in catalog (quotes without an id are not
+paged, as in the search index).
+
+A quote's page depends only on its id, so inserting, deleting or editing a
+quote rewrites only its catalog page and its theme page, never the pages
+after it. Ranges with no quotes have no page, and a page holds fewer than
+PAGE_SIZE quotes once quotes in its range are deleted. Each manifest entry
+carries a hash of the page contents, so clients keep any cached page whose
+hash did not change. Pages whose contents did not change are not
+rewritten, and pages that are no longer published are removed.
+
+Usage:
+    python3 catalog_pages.py                      # Publish api/catalog/ for quotes.json
+    python3 catalog_pages.py --page-size 50 --catalog big.qcat --output /tmp/catalog
+"""
+
+import argparse
+import hashlib
+import sys
+from pathlib import Path
+
+import generate_random_quote as gq
+import precompress
+from publish_util import catalog_digest, read_manifest, slugify
+
+
+MANIFEST_VERSION = 2
+PAGE_SIZE = 100
+DEFAULT_CATALOG_DIR = Path(__file__).parent / 'api' / 'catalog'
+
+
+def paginate(quotes, page_size=PAGE_SIZE):
+    """Group quotes by id range
+
+    Args:
+        quotes: Iterable of Quote records
+        page_size: Ids per page
+
+    Returns:
+        List of (page number, list of Quote records) for the non-empty pages,
+        in page order; page n holds ids n * page_size to n * page_size + page_size - 1
+    """
+    pages = {}
+    for quote in quotes:
+        if quote.id is not None:
+            pages.setdefault(quote.id // page_size, []).append(quote)
+    return sorted(pages.items())
+
+
+def page_entry(path, page):
+    """Manifest entry for one page of Quote records"""
+    ids = [q.id for q in page if q.id is not None]
+    return {
+        'file': path,
+        'count': len(page),
+        'first_id': min(ids, default=None),
+        'last_id': max(ids, default=None),
+        'hash': hashlib.sha256(precompress.minify_json([q.to_dict() for q in page])).hexdigest()[:16],
+    }
+
+
+def build_pages(quotes, page_size=PAGE_SIZE, digest=None):
+    """Build every page and the manifest in memory
+
+    Args:
+        quotes: Catalog (Quote records or a compiled catalog)
+        page_size: Ids per page
+        digest: Catalog digest to record in the manifest
+
+    Returns:
+        Dictionary of path relative to the output directory -> JSON object
+    """
+    if page_size < 1:
+        raise ValueError('page_size must be at least 1')
+
+    files = {}
+    pages = []
+    for n, page in paginate(quotes, page_size):
+        path = f'pages/{n}.json'
+        files[path] = [q.to_dict() for q in page]
+        pages.append(page_entry(path, page))
+
+    themes = {}
+    used = set()
+    for theme, pool in sorted(gq.theme_index(quotes).items()):
+        slug = base = slugify(theme)
+        suffix = 2
+        while slug in used:
+            slug, suffix = f'{base}-{suffix}', suffix + 1
+        used.add(slug)
+
+        theme_pages = []
+        for n, page in paginate(pool, page_size):
+            path = f'themes/{slug}/{n}.json'
+            files[path] = [q.to_dict() for q in page]
+            theme_pages.append(page_entry(path, page))
+        if not theme_pages:
+            continue
+        themes[theme] = {'name': pool[0].theme, 'count': sum(page['count'] for page in theme_pages),
+                         'pages': theme_pages}
+
+    files['manifest.json'] = {
+        'version': MANIFEST_VERSION,
+        'catalog': digest,
+        'quotes': sum(page['count'] for page in pages),
+        'page_size': page_size,
+        'pages': pages,
+        'themes': themes,
+    }
+    return files
+
+
+def publish(quotes, output_dir=DEFAULT_CATALOG_DIR, page_size=PAGE_SIZE, digest=None, force=False):
+    """Write the paged catalog, replacing a previously published one
+
+    Args:
+        quotes: Catalog (Quote records or a compiled catalog)
+        output_dir: Output directory
+        page_size: Ids per page
+        digest: Catalog digest (see catalog_digest()); when it
+            and page_size match the published manifest nothing is written
+        force: Rebuild even if the digest matches (the digest is still recorded)
+
+    Returns:
+        Dictionary with 'files', 'written', 'removed' and 'bytes', or None if
+        the published pages are already current
+    """
+    output_dir = Path(output_dir)
+    manifest = read_manifest(output_dir)
+    if not force and digest is not None and manifest and manifest.get('catalog') == digest \
+            and manifest.get('page_size') == page_size and manifest.get('version') == MANIFEST_VERSION:
+        return None
+
+    files = build_pages(quotes, page_size, digest)
+    written = total_bytes = 0
+    # The manifest goes last, so a reader never sees it point at missing pages
+    for relative in sorted(files, key=lambda p: p == 'manifest.json'):
+        path = output_dir / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        size = precompress.write_json(path, files[relative], skip_unchanged=True)
+        if size:
+            written += 1
+            total_bytes += size
+
+    removed = precompress.remove_stale(output_dir, files)
+    return {'files': len(files), 'written': written, 'removed': removed, 'bytes': total_bytes}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Publish the quote catalog as id-range pages and theme shards')
+    parser.add_argument('--catalog', type=Path, help='Quote catalog (default: quotes.json)')
+    parser.add_argument('--output', type=Path, default=DEFAULT_CATALOG_DIR, help='Output directory (default: api/catalog)')
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE, help=f'Ids per page (default: {PAGE_SIZE})')
+    parser.add_argument('--force', action='store_true', help='Rebuild even if the catalog did not change')
+    args = parser.parse_args(argv)
+
+    catalog = args.catalog or gq.QUOTES_FILE
+    if not Path(catalog).exists():
+        print(f"❌ Catalog not found: {catalog}")
+        return 1
+    if args.page_size < 1:
+        print("❌ --page-size must be at least 1")
+        return 1
+
+    stats = publish(gq.load_quotes(catalog), args.output, args.page_size,
+                    catalog_digest(catalog), force=args.force)
+    if stats is None:
+        print(f"✓ Paged catalog in {args.output} is current")
+    else:
+        print(f"✅ Paged catalog: {stats['files']:,} files in {args.output} "
+              f"({stats['written']:,} written, {stats['removed']:,} removed, {stats['bytes'] / 1024:.1f} KB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,39 +1,85 @@
 #!/usr/bin/env python3
-"""Compare PNG vs WebP optimization results."""
-
-from PIL import Image
-import os
-import glob
-
-print('\n📊 COMPARISON: PNG vs WebP Optimization')
-print('=' * 85)
-print(f"{'Image':<20s} | {'PNG (optimized)':<25s} | {'WebP (optimized)':<25s} | {'Improvement':<8s}")
-print('-' * 85)
-
-png_files = sorted(glob.glob('assets/posters-small-bw-outline/*-optimized.png'))
-webp_files = sorted(glob.glob('assets/posters-small-bw-outline/*-webp.webp'))
-
-for png_f, webp_f in zip(png_files, webp_files):
-    basename = os.path.basename(png_f).replace('-poster-bw-outline-optimized.png', '')
-    
-    png_size_kb = os.path.getsize(png_f) / 1024
-    with Image.open(png_f) as img:
-        png_dims = f'{img.width}x{img.height}'
-        png_width = img.width
-    
-    webp_size_kb = os.path.getsize(webp_f) / 1024
-    with Image.open(webp_f) as img:
-        webp_dims = f'{img.width}x{img.height}'
-        webp_width = img.width
-    
-    improvement = ((webp_width / png_width) - 1) * 100
-    
-    print(f'{basename:<20s} | {png_dims:>8s} ({png_size_kb:5.2f} KB) | {webp_dims:>8s} ({webp_size_kb:5.2f} KB) | +{improvement:5.0f}%')
-
-print('=' * 85)
-print('\n✨ Results:')
-print('   • WebP format achieves 60-100% larger images for the same 15KB budget')
-print('   • 3 posters: 160x238px (vs 100x149px PNG) = 60% larger in width')
-print('   • 1 poster:  200x298px (vs 100x149px PNG) = 100% larger in width')
-print('   • All images remain under 15KB target')
-print('   • Average WebP width: 170px vs PNG width: 100px = 70% improvement!')
+"""Compare PNG vs WebP optimization results from the poster build report.
+
+Reads poster-report.json, written by resize_posters_optimized.py (PNG) and
+resize_posters_webp.py (WebP), and compares the chosen poster of each format
+by size and perceptual quality (SSIM against the source).
+"""
+
+import sys
+from pathlib import Path
+
+import poster_quality
+
+
+def compare(report):
+    """Pair the chosen PNG and WebP candidates of every poster
+
+    Args:
+        report: Build report dictionary (see poster_quality.write_report())
+
+    Returns:
+        List of (poster, png candidate, webp candidate) tuples for posters
+        with a chosen candidate in both formats
+    """
+    formats = report.get('formats', {})
+    png = formats.get('png', {}).get('posters', {})
+    webp = formats.get('webp', {}).get('posters', {})
+    rows = []
+    for poster in sorted(set(png) & set(webp)):
+        if png[poster]['chosen'] and webp[poster]['chosen']:
+            rows.append((poster, png[poster]['chosen'], webp[poster]['chosen']))
+    return rows
+
+
+def describe(candidate):
+    """'160x238 16.2 KB' for a candidate"""
+    return f"{candidate['width']}x{candidate['height']} {candidate['bytes'] / 1024:4.1f} KB"
+
+
+def score(candidate):
+    """SSIM as text ('  n/a' if the candidate was not scored)"""
+    return f"{candidate['ssim']:.4f}" if candidate.get('ssim') is not None else '  n/a'
+
+
+def main(report_file=poster_quality.REPORT_FILE):
+    report = poster_quality.load_report(report_file)
+    missing = [f for f in ('png', 'webp') if f not in report.get('formats', {})]
+    if missing:
+        print(f"❌ No {' or '.join(missing)} results in {report_file}")
+        print("   Run resize_posters_optimized.py and resize_posters_webp.py first")
+        return 1
+
+    rows = compare(report)
+    print('\n📊 COMPARISON: PNG vs WebP Optimization')
+    print('=' * 85)
+    print(f"{'Image':<20s} | {'PNG (optimized)':<27s} | {'WebP (optimized)':<27s} | {'Width':<6s}")
+    print('-' * 85)
+    for poster, png, webp in rows:
+        basename = Path(poster).stem.replace('-poster-bw-outline', '')
+        improvement = ((webp['width'] / png['width']) - 1) * 100
+        print(f"{basename:<20s} | {describe(png):<17s} {score(png)} | {describe(webp):<17s} {score(webp)} | "
+              f"{improvement:+5.0f}%")
+    print('=' * 85)
+
+    if not rows:
+        print('\nNo poster was optimized in both formats.')
+        return 0
+
+    png_width = sum(png['width'] for _, png, _ in rows) / len(rows)
+    webp_width = sum(webp['width'] for _, _, webp in rows) / len(rows)
+    print('\n✨ Results:')
+    print(f"   • Average width: WebP {webp_width:.0f}px vs PNG {png_width:.0f}px")
+    scored = [(png['ssim'], webp['ssim']) for _, png, webp in rows
+              if png.get('ssim') is not None and webp.get('ssim') is not None]
+    if scored:
+        print(f"   • Average SSIM:  WebP {sum(w for _, w in scored) / len(scored):.4f} "
+              f"vs PNG {sum(p for p, _ in scored) / len(scored):.4f}")
+        print(f"   • WebP looks closer to the source for {sum(w > p for p, w in scored)} of {len(scored)} posters")
+    budgets = {f: report['formats'][f]['target_max_size'] for f in ('png', 'webp')}
+    print(f"   • Size budget: {budgets['png'] / 1024:.0f} KB (PNG), {budgets['webp'] / 1024:.0f} KB (WebP)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Compiled binary quote catalog with lazy, memory-mapped record access
+
+json.load of a large catalog builds one dict per quote before a single quote
+can be picked. A compiled catalog is one file that is memory-mapped instead:
+opening it only reads a fixed-size header and the small theme directory, and
+reading a record touches only that record's 24-byte row, its text bytes and
+the (cached) author/movie/theme strings.
+
+File layout (little-endian):
+
+    header        magic, version, counts and section offsets
+    strings       offset table + UTF-8 blob of interned author/movie/theme names
+    records       one fixed-size row per quote, sorted by id:
+                  id, text offset, text length, author, movie, theme (string indexes)
+    text          UTF-8 blob of all quote texts
+    themes        directory of (theme string, first position, count)
+    positions     record positions grouped by theme
+
+Only the id/text/author/movie/theme fields of each quote are stored.
+
+Usage:
+    python3 compiled_catalog.py quotes.json                 # Writes quotes.qcat
+    python3 compiled_catalog.py quotes-store/catalog.json -o catalog.qcat
+    python3 generate_random_quote.py --catalog quotes.qcat  # Use it for generation
+
+    from compiled_catalog import CompiledCatalog
+
+    catalog = CompiledCatalog('quotes.qcat')
+    quote = catalog.theme('wisdom').choice_excluding(recent_ids)
+"""
+
+import argparse
+import mmap
+import os
+import random
+import struct
+import sys
+import tempfile
+from pathlib import Path
+
+from json_stream import iter_records
+from quote_record import Quote
+
+
+MAGIC = b'KFPQCAT1'
+VERSION = 1
+
+HEADER = struct.Struct('<8sHHIII6Q')
+RECORD = struct.Struct('<IIIIII')
+THEME_ENTRY = struct.Struct('<III')
+UINT32 = struct.Struct('<I')
+
+# Random probes before falling back to a scan of the pool
+MAX_REJECTION_TRIES = 64
+
+
+def is_compiled(path):
+    """Whether path is a compiled catalog (checks the magic bytes)"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+class CatalogView:
+    """Sequence of quotes backed by the catalog (all quotes or one theme)
+
+    Records are decoded into immutable Quote records on access.
+    """
+
+    def __init__(self, catalog, theme_index=None, start=0, count=None):
+        self.catalog = catalog
+        self.theme_index = theme_index
+        self.start = start
+        self.count = len(catalog) if count is None else count
+
+    def __len__(self):
+        return self.count
+
+    def position(self, index):
+        """Record position of the index-th quote in this view"""
+        if not 0 <= index < self.count:
+            raise IndexError('catalog index out of range')
+        if self.theme_index is None:
+            return index
+        return self.catalog._theme_position(self.start + index)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        return self.catalog.record(self.position(index))
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self.catalog.record(self.position(index))
+
+    def __contains__(self, quote_id):
+        position = self.catalog.position_of(quote_id)
+        if position is None:
+            return False
+        return self.theme_index is None or self.catalog._theme_of(position) == self.theme_index
+
+    def count_excluding(self, quote_ids):
+        """Number of quotes in this view whose id is not in quote_ids"""
+        return self.count - sum(1 for quote_id in quote_ids if quote_id in self)
+
+    def choice_excluding(self, quote_ids, rng=random):
+        """Uniformly random quote whose id is not in quote_ids
+
+        Probes random positions first, so only the probed rows are read; a
+        nearly exhausted pool falls back to scanning its ids.
+
+        Raises:
+            IndexError: If every quote in the view is excluded
+        """
+        if self.count:
+            for _ in range(MAX_REJECTION_TRIES):
+                position = self.position(rng.randrange(self.count))
+                if self.catalog.id_at(position) not in quote_ids:
+                    return self.catalog.record(position)
+
+        candidates = [
+            position for position in map(self.position, range(self.count))
+            if self.catalog.id_at(position) not in quote_ids
+        ]
+        if not candidates:
+            raise IndexError('no quotes left to choose from')
+        return self.catalog.record(rng.choice(candidates))
+
+
+class CompiledCatalog(CatalogView):
+    """Memory-mapped compiled catalog; behaves like a read-only sequence of Quote records"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, _, record_count, string_count, theme_count,
+         self._string_offsets, self._string_blob, self._records,
+         self._text, self._themes, self._positions) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a compiled quote catalog")
+        if version != VERSION:
+            raise ValueError(f"{path}: unsupported catalog version {version}")
+
+        self.string_count = string_count
+        self._strings = {}
+        self._theme_views = {}
+        for i in range(theme_count):
+            string_index, start, count = THEME_ENTRY.unpack_from(self._map, self._themes + i * THEME_ENTRY.size)
+            self._theme_views[self.string(string_index).lower()] = (string_index, start, count)
+
+        self.theme_index = None
+        self.start = 0
+        self.count = record_count
+
+    @property
+    def catalog(self):
+        return self
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def themes(self):
+        """Theme names in the catalog"""
+        return [self.string(string_index) for string_index, _, _ in self._theme_views.values()]
+
+    def theme(self, name):
+        """View of the quotes with this theme (case-insensitive), or None"""
+        entry = self._theme_views.get(name.lower())
+        if entry is None:
+            return None
+        return CatalogView(self, *entry)
+
+    def string(self, index):
+        """Interned author/movie/theme string"""
+        value = self._strings.get(index)
+        if value is None:
+            start, end = struct.unpack_from('<II', self._map, self._string_offsets + index * UINT32.size)
+            value = self._strings[index] = self._map[self._string_blob + start:self._string_blob + end].decode('utf-8')
+        return value
+
+    def id_at(self, position):
+        """Quote id of the record at position"""
+        return UINT32.unpack_from(self._map, self._records + position * RECORD.size)[0]
+
+    def _theme_of(self, position):
+        return UINT32.unpack_from(self._map, self._records + position * RECORD.size + 20)[0]
+
+    def _theme_position(self, index):
+        return UINT32.unpack_from(self._map, self._positions + index * UINT32.size)[0]
+
+    def position_of(self, quote_id):
+        """Record position of a quote id (binary search), or None"""
+        if not isinstance(quote_id, int):
+            return None
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self.id_at(middle) < quote_id:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self) and self.id_at(low) == quote_id:
+            return low
+        return None
+
+    def get(self, quote_id):
+        """Quote with this id, or None"""
+        position = self.position_of(quote_id)
+        return None if position is None else self.record(position)
+
+    def record(self, position):
+        """Decode the record at position into a Quote"""
+        quote_id, text_offset, text_length, author, movie, theme = RECORD.unpack_from(
+            self._map, self._records + position * RECORD.size)
+        start = self._text + text_offset
+        return Quote(
+            id=quote_id,
+            text=self._map[start:start + text_length].decode('utf-8'),
+            author=self.string(author),
+            movie=self.string(movie),
+            theme=self.string(theme),
+        )
+
+
+def compile_catalog(records, output_file):
+    """Write quotes to a compiled catalog
+
+    Texts are streamed into a temporary blob, so memory holds one small row
+    per quote rather than the quotes themselves.
+
+    Args:
+        records: Iterable of quote dictionaries with integer ids
+        output_file: Compiled catalog path
+
+    Returns:
+        Number of records written
+    """
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+
+    strings, string_list = {}, []
+
+    def intern(value):
+        value = value or ''
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(string_list)
+            string_list.append(value)
+        return index
+
+    rows = {}
+    text_size = 0
+    with tempfile.TemporaryFile() as text_blob:
+        for record in records:
+            quote_id = record.get('id')
+            if not isinstance(quote_id, int) or quote_id < 0:
+                raise ValueError(f"Quote without a valid id: {record.get('text', '')[:50]!r}")
+            if quote_id in rows:
+                continue  # first record with an id wins, as in ingestion
+            text = (record.get('text') or '').encode('utf-8')
+            text_blob.write(text)
+            rows[quote_id] = (text_size, len(text), intern(record.get('author')),
+                              intern(record.get('movie')), intern(record.get('theme')))
+            text_size += len(text)
+
+        ids = sorted(rows)
+        by_theme = {}
+        for position, quote_id in enumerate(ids):
+            by_theme.setdefault(rows[quote_id][4], []).append(position)
+        themes = sorted((index for index in by_theme if string_list[index]), key=lambda i: string_list[i].lower())
+
+        encoded = [s.encode('utf-8') for s in string_list]
+        string_offsets = HEADER.size
+        string_blob = string_offsets + (len(encoded) + 1) * UINT32.size
+        records_offset = string_blob + sum(map(len, encoded))
+        text_offset = records_offset + len(ids) * RECORD.size
+        themes_offset = text_offset + text_size
+        positions_offset = themes_offset + len(themes) * THEME_ENTRY.size
+
+        temp_file = output_file.with_suffix('.tmp')
+        with open(temp_file, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 0, len(ids), len(encoded), len(themes),
+                                string_offsets, string_blob, records_offset,
+                                text_offset, themes_offset, positions_offset))
+            offset = 0
+            for value in encoded:
+                f.write(UINT32.pack(offset))
+                offset += len(value)
+            f.write(UINT32.pack(offset))
+            f.write(b''.join(encoded))
+
+            for quote_id in ids:
+                f.write(RECORD.pack(quote_id, *rows[quote_id]))
+
+            text_blob.seek(0)
+            while True:
+                chunk = text_blob.read(1024 * 1024)
+                if not chunk:
+                    break
+                f.write(chunk)
+
+            start = 0
+            for index in themes:
+                f.write(THEME_ENTRY.pack(index, start, len(by_theme[index])))
+                start += len(by_theme[index])
+            for index in themes:
+                f.write(struct.pack(f'<{len(by_theme[index])}I', *by_theme[index]))
+        os.replace(temp_file, output_file)
+
+    return len(ids)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compile a JSON quote catalog into a memory-mappable file')
+    parser.add_argument('catalog', type=Path, help='JSON catalog (quotes.json format)')
+    parser.add_argument('-o', '--output', type=Path, help='Compiled catalog path (default: <catalog>.qcat)')
+    args = parser.parse_args(argv)
+
+    if not args.catalog.exists():
+        print(f"❌ Catalog not found: {args.catalog}")
+        return 1
+
+    output = args.output or args.catalog.with_suffix('.qcat')
+    count = compile_catalog((record for _, record in iter_records(args.catalog)), output)
+
+    catalog = CompiledCatalog(output)
+    print(f"✅ Compiled {count:,} quotes to {output}")
+    print(f"   JSON: {args.catalog.stat().st_size / 1024:.1f} KB → compiled: {output.stat().st_size / 1024:.1f} KB")
+    print(f"   {catalog.string_count} interned strings, {len(catalog.themes)} themes")
+    catalog.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
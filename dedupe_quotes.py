@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Find and merge near-duplicate quotes
+
+Quote sources overlap heavily, with punctuation, casing and attribution
+differences ("There are no accidents." by Oogway vs Master Oogway). Comparing
+every pair is quadratic, so this uses MinHash signatures over word shingles of
+the normalized text and LSH banding to find candidate pairs in near-linear
+time. Candidates are confirmed with the exact Jaccard similarity of their
+shingle sets and grouped into clusters with union-find.
+
+The first record of each cluster (in input order) is kept, so list curated
+sources first. The merge report maps every dropped id onto the id it was
+merged into.
+
+Usage:
+    python3 dedupe_quotes.py quotes-store/catalog.json             # Report only
+    python3 dedupe_quotes.py quotes-store/catalog.json --output deduped.json
+    python3 dedupe_quotes.py quotes.json --threshold 0.7
+
+Output:
+    quotes-store/dedupe-report.json (clusters of merged quotes)
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import unicodedata
+import zlib
+from pathlib import Path
+
+from json_stream import iter_records
+
+
+DEFAULT_REPORT = Path(__file__).parent / 'quotes-store' / 'dedupe-report.json'
+
+NUM_PERMUTATIONS = 64
+BANDS = 16  # 16 bands x 4 rows: pairs above ~0.5 similarity become candidates
+SHINGLE_SIZE = 2
+DEFAULT_THRESHOLD = 0.8
+
+# Hashed shingle rows kept in memory (common word pairs repeat across quotes)
+SHINGLE_CACHE_SIZE = 500_000
+
+# Buckets bigger than this are not compared pairwise: their members are
+# sorted by signature and each is compared with the next MAX_BUCKET_PAIRWISE
+MAX_BUCKET_PAIRWISE = 50
+
+_PRIME = (1 << 31) - 1  # Mersenne prime; keeps products within two CPython digits
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_text(text):
+    """Lowercase, strip accents and punctuation, and collapse whitespace"""
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = ''.join(c for c in text if not unicodedata.combining(c))
+    text = text.replace('’', "'").replace("'", '')
+    text = _PUNCTUATION_RE.sub(' ', text.casefold())
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+
+def shingles(normalized):
+    """Set of hashed word n-grams (the whole text for very short quotes)"""
+    words = normalized.split()
+    if len(words) <= SHINGLE_SIZE:
+        grams = [' '.join(words)]
+    else:
+        grams = [' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+    return {zlib.crc32(gram.encode('utf-8')) % _PRIME for gram in grams}
+
+
+class MinHasher:
+    """MinHash signatures from a fixed family of universal hash functions
+
+    Shingles repeat a lot across a catalog (common word pairs), so the hashed
+    row of each shingle is cached and a signature is the column-wise minimum
+    of its shingles' rows.
+    """
+
+    def __init__(self, num_permutations=NUM_PERMUTATIONS, seed=1, cache_size=SHINGLE_CACHE_SIZE):
+        rng = random.Random(seed)
+        self.permutations = [
+            (rng.randrange(1, _PRIME), rng.randrange(0, _PRIME))
+            for _ in range(num_permutations)
+        ]
+        self.cache_size = cache_size
+        self._rows = {}
+
+    def _row(self, shingle):
+        """Hash of one shingle under every permutation"""
+        row = self._rows.get(shingle)
+        if row is None:
+            row = [(a * shingle + b) % _PRIME for a, b in self.permutations]
+            if len(self._rows) < self.cache_size:
+                self._rows[shingle] = row
+        return row
+
+    def signature(self, shingle_set):
+        """MinHash signature of a set of hashed shingles"""
+        return tuple(map(min, zip(*[self._row(h) for h in shingle_set])))
+
+
+def jaccard(a, b):
+    """Jaccard similarity of two sets"""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class UnionFind:
+    """Disjoint sets over record positions, rooted at the earliest record"""
+
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, x):
+        parent = self.parent.setdefault(x, x)
+        if parent != x:
+            parent = self.parent[x] = self.find(parent)
+        return parent
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            # Keep the earliest record as the root so it is the one kept
+            if root_b < root_a:
+                root_a, root_b = root_b, root_a
+            self.parent[root_b] = root_a
+
+
+def find_duplicates(records, threshold=DEFAULT_THRESHOLD):
+    """Cluster near-duplicate records
+
+    Args:
+        records: Iterable of quote dictionaries (with 'text')
+        threshold: Minimum Jaccard similarity of shingle sets to merge
+
+    Returns:
+        Tuple of (records list, dict mapping each duplicate position to
+        (kept position, similarity))
+    """
+    hasher = MinHasher()
+    rows = NUM_PERMUTATIONS // BANDS
+    records = list(records)
+    shingle_sets = []
+    signatures = {}
+    exact = {}
+    buckets = {}
+    union_find = UnionFind()
+    similarity = {}
+
+    for position, record in enumerate(records):
+        normalized = normalize_text(record.get('text', ''))
+        shingle_set = shingles(normalized)
+        shingle_sets.append(shingle_set)
+
+        # Identical normalized text needs no MinHash
+        first = exact.setdefault(normalized, position)
+        if first != position:
+            union_find.union(first, position)
+            similarity[position] = 1.0
+            continue
+
+        signature = signatures[position] = hasher.signature(shingle_set)
+        for band in range(BANDS):
+            key = (band, signature[band * rows:(band + 1) * rows])
+            buckets.setdefault(key, []).append(position)
+
+    checked = set()
+    for (band, _), members in buckets.items():
+        if len(members) < 2:
+            continue
+        if len(members) <= MAX_BUCKET_PAIRWISE:
+            pairs = ((a, b) for i, a in enumerate(members) for b in members[i + 1:])
+        else:
+            # Members agree on this band; sorting by the bands after it puts
+            # records that agree on more of their signature next to each other
+            start = (band + 1) * rows
+            ordered = sorted(members, key=lambda p: (signatures[p][start:] + signatures[p][:start], p))
+            pairs = (tuple(sorted((a, b))) for i, a in enumerate(ordered)
+                     for b in ordered[i + 1:i + 1 + MAX_BUCKET_PAIRWISE])
+
+        for a, b in pairs:
+            if (a, b) in checked:
+                continue
+            checked.add((a, b))
+            score = jaccard(shingle_sets[a], shingle_sets[b])
+            if score >= threshold:
+                union_find.union(a, b)
+                similarity[b] = max(similarity.get(b, 0), score)
+
+    duplicates = {}
+    for position in range(len(records)):
+        root = union_find.find(position)
+        if root != position:
+            duplicates[position] = (root, similarity.get(position, threshold))
+    return records, duplicates
+
+
+def build_report(records, duplicates):
+    """Merge report: one cluster per kept record with the records merged into it"""
+    clusters = {}
+    for position, (root, score) in sorted(duplicates.items()):
+        kept = records[root]
+        cluster = clusters.setdefault(root, {
+            'kept': {k: kept.get(k) for k in ('id', 'text', 'author', 'movie', 'theme')},
+            'merged': [],
+        })
+        dropped = records[position]
+        cluster['merged'].append({
+            **{k: dropped.get(k) for k in ('id', 'text', 'author', 'movie', 'theme')},
+            'similarity': round(score, 3),
+        })
+
+    id_map = {}
+    for position, (root, _) in duplicates.items():
+        if records[position].get('id') is not None:
+            id_map[str(records[position]['id'])] = records[root].get('id')
+
+    return {
+        'total_records': len(records),
+        'duplicates': len(duplicates),
+        'kept_records': len(records) - len(duplicates),
+        'clusters': list(clusters.values()),
+        'id_map': id_map,
+    }
+
+
+def dedupe(records, threshold=DEFAULT_THRESHOLD):
+    """Drop near-duplicates, keeping the first record of each cluster
+
+    Args:
+        records: Iterable of quote dictionaries
+        threshold: Minimum Jaccard similarity to merge
+
+    Returns:
+        Tuple of (kept records, merge report)
+    """
+    records, duplicates = find_duplicates(records, threshold)
+    kept = [record for position, record in enumerate(records) if position not in duplicates]
+    return kept, build_report(records, duplicates)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Find and merge near-duplicate quotes')
+    parser.add_argument('catalog', type=Path, help='Catalog JSON (array of quotes), highest priority first')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Minimum shingle Jaccard similarity to merge (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--report', type=Path, default=DEFAULT_REPORT, help='Merge report path')
+    parser.add_argument('--output', type=Path, help='Write the deduplicated catalog here')
+    args = parser.parse_args(argv)
+
+    records = (record for _, record in iter_records(args.catalog))
+    kept, report = dedupe(records, args.threshold)
+
+    args.report.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(f"🔍 {report['total_records']:,} quotes, {report['duplicates']:,} near-duplicates "
+          f"in {len(report['clusters']):,} clusters")
+    for cluster in report['clusters'][:10]:
+        merged = ', '.join(f"#{m['id']}" for m in cluster['merged'])
+        print(f"   #{cluster['kept']['id']} \"{cluster['kept']['text'][:50]}\" ← {merged}")
+    print(f"📄 Merge report written to {args.report}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(kept, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        print(f"✅ Wrote {len(kept):,} quotes to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
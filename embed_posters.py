@@ -7,31 +7,87 @@ and embeds them into the shared-posters.liquid template for use in TRMNL layouts
 
 Usage:
     python3 embed_posters.py
+    python3 embed_posters.py 2    # Only re-embed kung-fu-panda-2-poster
 
 Output:
     Updates templates/shared-posters.liquid with inline base64-encoded images
 """
 
+import argparse
 import os
+import re
+import sys
 import base64
 from pathlib import Path
 
+import profiling
+
+
+# Paths
+PROJECT_ROOT = Path(__file__).parent
+POSTER_DIR = PROJECT_ROOT / 'assets' / 'posters-small'
+SHARED_FILE = PROJECT_ROOT / 'templates' / 'shared-posters.liquid'
+
+# Posters to embed (in order): poster_kfp_1 ... poster_kfp_4
+POSTER_FILES = [
+    'kung-fu-panda-1-poster.jpeg',
+    'kung-fu-panda-2-poster.jpeg',
+    'kung-fu-panda-3-poster.jpeg',
+    'kung-fu-panda-4-poster.jpg'
+]
+
+
+def replace_capture(content, name, data_uri):
+    """Replace the body of one {%- capture <name> -%} block
+    
+    Returns:
+        Tuple of (new content, whether the block was found)
+    """
+    pattern = rf'({{%- capture {re.escape(name)} -%}})[\s\S]*?({{%- endcapture -%}})'
+    content, count = re.subn(pattern, lambda m: f"{m.group(1)}\n{data_uri}\n{m.group(2)}", content, count=1)
+    return content, count == 1
+
+
+def embed_poster(number, poster_dir=POSTER_DIR, shared_file=SHARED_FILE):
+    """Re-embed a single poster (poster_kfp_<number>), leaving the other blocks alone
+    
+    Args:
+        number: Poster number (1-4)
+        poster_dir: Directory with the poster images
+        shared_file: Template with the capture blocks
+    
+    Returns:
+        True if the block was updated
+    """
+    if not 1 <= number <= len(POSTER_FILES):
+        print(f"❌ No poster {number} (1-{len(POSTER_FILES)})")
+        return False
+    poster_path = Path(poster_dir) / POSTER_FILES[number - 1]
+    if not poster_path.exists() or not Path(shared_file).exists():
+        print(f"❌ File not found: {poster_path if not poster_path.exists() else shared_file}")
+        return False
+    
+    with open(poster_path, 'rb') as f:
+        base64_data = base64.b64encode(f.read()).decode('utf-8')
+    with open(shared_file, 'r') as f:
+        content = f.read()
+    
+    content, found = replace_capture(content, f'poster_kfp_{number}', f'data:image/jpeg;base64,{base64_data}')
+    if not found:
+        print(f"❌ No poster_kfp_{number} block in {shared_file}")
+        return False
+    with open(shared_file, 'w') as f:
+        f.write(content)
+    print(f"✅ Embedded kung-fu-panda-{number}-poster ({len(base64_data):,} bytes base64)")
+    return True
+
 
 def embed_posters():
     """Read poster images and embed them as base64 into shared-posters.liquid"""
     
-    # Paths
-    project_root = Path(__file__).parent
-    poster_dir = project_root / 'assets' / 'posters-small'
-    shared_file = project_root / 'templates' / 'shared-posters.liquid'
-    
-    # Define posters to embed (in order)
-    poster_files = [
-        'kung-fu-panda-1-poster.jpeg',
-        'kung-fu-panda-2-poster.jpeg',
-        'kung-fu-panda-3-poster.jpeg',
-        'kung-fu-panda-4-poster.jpg'
-    ]
+    poster_dir = POSTER_DIR
+    shared_file = SHARED_FILE
+    poster_files = POSTER_FILES
     
     # Read and encode poster images
     posters = {}
@@ -66,12 +122,8 @@ def embed_posters():
     }
     
     # Replace capture blocks with base64-encoded images
-    import re
-    
     for i in range(1, 5):
-        pattern = rf'({{%- capture poster_kfp_{i} -%}})[\s\S]*?({{%- endcapture -%}})'
-        replacement = rf'\1\ndata:{mime_types[i]};base64,{posters[i]}\n\2'
-        content = re.sub(pattern, replacement, content)
+        content, _ = replace_capture(content, f'poster_kfp_{i}', f'data:{mime_types[i]};base64,{posters[i]}')
     
     # Write updated file
     with open(shared_file, 'w') as f:
@@ -94,8 +146,21 @@ def embed_posters():
     return True
 
 
-if __name__ == '__main__':
-    success = embed_posters()
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Embed the posters into shared-posters.liquid')
+    parser.add_argument('poster', nargs='?', type=int, choices=range(1, len(POSTER_FILES) + 1), metavar='N',
+                        help=f'Only re-embed this poster (1-{len(POSTER_FILES)})')
+    args = parser.parse_args(argv)
+
+    if args.poster is not None:
+        success = embed_poster(args.poster)
+    else:
+        success = embed_posters()
     if not success:
         print("\n❌ Failed to embed posters. Please check the error messages above.")
-        exit(1)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(profiling.run_main(main))
@@ -8,32 +8,77 @@ for use in TRMNL layouts.
 
 Usage:
     python3 embed_posters_bw_outline.py
+    python3 embed_posters_bw_outline.py 2    # Only re-embed poster_kfp_2_bw
 
 Output:
     Updates templates/shared-posters.liquid with inline base64-encoded WebP images
     as poster_kfp_1_bw, poster_kfp_2_bw, poster_kfp_3_bw, poster_kfp_4_bw
 """
 
+import argparse
 import os
+import sys
 import base64
 from pathlib import Path
 
+import profiling
+from embed_posters import SHARED_FILE, replace_capture
+
+
+# Paths
+POSTER_DIR = Path(__file__).parent / 'assets' / 'posters-small-bw-outline'
+
+# Posters to embed (in order): poster_kfp_1_bw ... poster_kfp_4_bw
+POSTER_FILES = [
+    'kung-fu-panda-1-poster-bw-outline-webp.webp',
+    'kung-fu-panda-2-poster-bw-outline-webp.webp',
+    'kung-fu-panda-3-poster-bw-outline-webp.webp',
+    'kung-fu-panda-4-poster-bw-outline-webp.webp'
+]
+
+
+def embed_bw_outline_poster(number, poster_dir=POSTER_DIR, shared_file=SHARED_FILE):
+    """Re-embed a single BW outline poster (poster_kfp_<number>_bw), leaving the other blocks alone
+    
+    The blocks must already exist; run without arguments once to add them.
+    
+    Args:
+        number: Poster number (1-4)
+        poster_dir: Directory with the WebP posters
+        shared_file: Template with the capture blocks
+    
+    Returns:
+        True if the block was updated
+    """
+    if not 1 <= number <= len(POSTER_FILES):
+        print(f"❌ No poster {number} (1-{len(POSTER_FILES)})")
+        return False
+    poster_path = Path(poster_dir) / POSTER_FILES[number - 1]
+    if not poster_path.exists() or not Path(shared_file).exists():
+        print(f"❌ File not found: {poster_path if not poster_path.exists() else shared_file}")
+        return False
+    
+    with open(poster_path, 'rb') as f:
+        base64_data = base64.b64encode(f.read()).decode('utf-8')
+    with open(shared_file, 'r') as f:
+        content = f.read()
+    
+    content, found = replace_capture(content, f'poster_kfp_{number}_bw', f'data:image/webp;base64,{base64_data}')
+    if not found:
+        print(f"❌ No poster_kfp_{number}_bw block in {shared_file}")
+        return False
+    with open(shared_file, 'w') as f:
+        f.write(content)
+    print(f"✅ Embedded kung-fu-panda-{number}-poster-bw-outline ({len(base64_data):,} bytes base64)")
+    return True
+
 
 def embed_bw_outline_posters():
     """Read BW outline poster images and embed them as base64 into shared-posters.liquid"""
     
-    # Paths
-    project_root = Path(__file__).parent
-    poster_dir = project_root / 'assets' / 'posters-small-bw-outline'
-    shared_file = project_root / 'templates' / 'shared-posters.liquid'
-    
-    # Define posters to embed (in order)
-    poster_files = [
-        'kung-fu-panda-1-poster-bw-outline-webp.webp',
-        'kung-fu-panda-2-poster-bw-outline-webp.webp',
-        'kung-fu-panda-3-poster-bw-outline-webp.webp',
-        'kung-fu-panda-4-poster-bw-outline-webp.webp'
-    ]
+    poster_dir = POSTER_DIR
+    shared_file = SHARED_FILE
+    poster_files = POSTER_FILES
     
     # Read and encode poster images
     posters = {}
@@ -69,9 +114,7 @@ def embed_bw_outline_posters():
         # Update existing blocks
         print("\n🔄 Updating existing BW outline poster blocks...")
         for i in range(1, 5):
-            pattern = rf'({{%- capture poster_kfp_{i}_bw -%}})[\s\S]*?({{%- endcapture -%}})'
-            replacement = rf'\1\ndata:image/webp;base64,{posters[i]}\n\2'
-            content = re.sub(pattern, replacement, content)
+            content, _ = replace_capture(content, f'poster_kfp_{i}_bw', f'data:image/webp;base64,{posters[i]}')
     else:
         # Add new blocks at the end
         print("\n➕ Adding new BW outline poster blocks...")
@@ -113,8 +156,21 @@ def embed_bw_outline_posters():
     return True
 
 
-if __name__ == '__main__':
-    success = embed_bw_outline_posters()
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Embed the BW outline posters into shared-posters.liquid')
+    parser.add_argument('poster', nargs='?', type=int, choices=range(1, len(POSTER_FILES) + 1), metavar='N',
+                        help=f'Only re-embed this poster (1-{len(POSTER_FILES)})')
+    args = parser.parse_args(argv)
+
+    if args.poster is not None:
+        success = embed_bw_outline_poster(args.poster)
+    else:
+        success = embed_bw_outline_posters()
     if not success:
         print("\n❌ Failed to embed BW outline posters. Please check the error messages above.")
-        exit(1)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(profiling.run_main(main))
@@ -5,53 +5,82 @@ This script creates theme-specific API endpoint files for TRMNL
 Features quote history tracking to prevent repeats within 30 days
 """
 
+import argparse
 import json
+import os
 import random
+import threading
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 
+import history_store
+import instrumentation
+import precompress
+import profiling
+import publish_util
+import search_index
+import weighted_selection
+from compiled_catalog import CompiledCatalog, is_compiled
+from quote_record import Quote
+from text_fit import fit_quote_layouts
+
+
+# Catalog and output locations
+QUOTES_FILE = Path(__file__).parent / 'quotes.json'
+OUTPUT_ROOT = Path(__file__).parent
 
 # Constants for quote history tracking
 HISTORY_FILE = Path(__file__).parent / '.quote-history.json'
 DAYS_BEFORE_REUSE = 30  # Don't reuse quotes within 30 days
 
+# Optional weights file for weighted selection (uniform when None)
+WEIGHTS_FILE = None
+
 
-def load_quote_history():
+def load_quote_history(history_file=None):
     """Load quote history from file
     
+    Args:
+        history_file: History path (default: HISTORY_FILE)
+    
     Returns:
         Dictionary with 'quotes' list containing recently used quotes
     """
-    if not HISTORY_FILE.exists():
+    history_file = Path(history_file or HISTORY_FILE)
+    if not history_file.exists():
         return {'quotes': []}
     
     try:
-        with open(HISTORY_FILE, 'r', encoding='utf-8') as f:
+        with open(history_file, 'r', encoding='utf-8') as f:
             return json.load(f)
     except (json.JSONDecodeError, IOError):
         return {'quotes': []}
 
 
-def save_quote_history(history):
+def save_quote_history(history, history_file=None):
     """Save quote history to file
     
     Args:
         history: Dictionary with 'quotes' list
+        history_file: History path (default: HISTORY_FILE)
     """
-    with open(HISTORY_FILE, 'w', encoding='utf-8') as f:
+    with open(history_file or HISTORY_FILE, 'w', encoding='utf-8') as f:
         json.dump(history, f, indent=2, ensure_ascii=False)
 
 
-def cleanup_old_history(history):
+def cleanup_old_history(history, days_before_reuse=None):
     """Remove quotes older than DAYS_BEFORE_REUSE from history
     
     Args:
         history: Dictionary with 'quotes' list
+        days_before_reuse: Reuse window in days (default: DAYS_BEFORE_REUSE)
     
     Returns:
         Cleaned history dictionary
     """
-    cutoff_date = datetime.now(timezone.utc) - timedelta(days=DAYS_BEFORE_REUSE)
+    if days_before_reuse is None:
+        days_before_reuse = DAYS_BEFORE_REUSE
+    cutoff_date = datetime.now(timezone.utc) - timedelta(days=days_before_reuse)
     
     cleaned_quotes = []
     for entry in history.get('quotes', []):
@@ -78,87 +107,279 @@ def get_recently_used_quote_ids(history):
     return {entry['id'] for entry in history.get('quotes', []) if 'id' in entry}
 
 
-def load_quotes():
-    """Load all quotes from quotes.json"""
-    quotes_file = Path(__file__).parent / "quotes.json"
+# Last loaded catalog, reused while the file is unchanged
+_catalog_cache = {}
+# Guards _catalog_cache and _theme_indexes (multi_tenant.py generates on a thread pool)
+_cache_lock = threading.Lock()
+
+
+def load_quotes(quotes_file=None):
+    """Load all quotes from quotes.json
+    
+    Quotes are immutable Quote records, so the loaded catalog is cached and
+    shared between calls until the file changes. A compiled catalog (see
+    compiled_catalog.py) is memory-mapped instead of parsed, so it opens in
+    constant time and only chosen quotes are decoded.
+    
+    Args:
+        quotes_file: Catalog path (default: QUOTES_FILE)
+    
+    Returns:
+        Sequence of Quote records
+    """
+    quotes_file = Path(quotes_file or QUOTES_FILE)
     
     if not quotes_file.exists():
-        return [{
-            "error": "quotes.json not found",
-            "text": "There are no accidents...",
-            "author": "Master Oogway",
-            "movie": "Kung Fu Panda",
-            "theme": "Wisdom"
-        }]
+        return (Quote(
+            id=None,
+            error="quotes.json not found",
+            text="There are no accidents...",
+            author="Master Oogway",
+            movie="Kung Fu Panda",
+            theme="Wisdom",
+        ),)
+    
+    stat = os.stat(quotes_file)
+    key = (str(quotes_file), stat.st_size, stat.st_mtime_ns)
+    with _cache_lock:
+        catalog = _catalog_cache.get(key)
+    if catalog is None:
+        if is_compiled(quotes_file):
+            catalog = CompiledCatalog(quotes_file)
+        else:
+            with open(quotes_file, 'r', encoding='utf-8') as f:
+                catalog = tuple(Quote.from_dict(q) for q in json.load(f))
+        with _cache_lock:
+            _catalog_cache.clear()
+            _catalog_cache[key] = catalog
+    return catalog
+
+
+# Theme indexes of recently used catalogs (see theme_index())
+_theme_indexes = {}
+MAX_THEME_INDEXES = 32
+
+
+def theme_index(quotes):
+    """Quotes grouped by theme, as the generator picks from them
+    
+    A compiled catalog stores this index; for a loaded catalog (a tuple) it
+    is built once and reused while the catalog is cached.
+    
+    Args:
+        quotes: Catalog or subset of Quote records
+    
+    Returns:
+        Dictionary of lowercase theme name -> sequence of Quote records, in
+        catalog order
+    """
+    if isinstance(quotes, CompiledCatalog):
+        return {name.lower(): quotes.theme(name) for name in quotes.themes}
+    
+    with _cache_lock:
+        entry = _theme_indexes.get(id(quotes))
+    if entry is not None and entry[0] is quotes:
+        return entry[1]
+    
+    index = {}
+    for quote in quotes:
+        if quote.theme:
+            index.setdefault(quote.theme.lower(), []).append(quote)
+    index = {theme: tuple(pool) for theme, pool in index.items()}
+    
+    # Lists can change after the call, so only immutable catalogs are cached
+    if isinstance(quotes, tuple):
+        with _cache_lock:
+            while len(_theme_indexes) >= MAX_THEME_INDEXES:
+                _theme_indexes.pop(next(iter(_theme_indexes)))
+            _theme_indexes[id(quotes)] = (quotes, index)
+    return index
+
+
+def catalog_key(quotes_file=None):
+    """Identifies a catalog file's current contents (path, size, mtime)"""
+    quotes_file = Path(quotes_file or QUOTES_FILE)
+    if not quotes_file.exists():
+        return (str(quotes_file), None)
+    stat = os.stat(quotes_file)
+    return (str(quotes_file), stat.st_size, stat.st_mtime_ns)
+
+
+def choose_weighted_quote(quotes, theme_label, history, recently_used_ids, weights_file=None, pool_key=None):
+    """Pick a quote using a weights file (see weighted_selection.py)
+    
+    The pool's alias table is built once per catalog, theme and weights file
+    and then only updated for the quotes whose weight changed.
+    
+    Args:
+        quotes: Theme pool (recently used quotes included)
+        theme_label: Theme name used to cache the pool's table
+        history: Cleaned history, for recent author counts
+        recently_used_ids: Quote IDs to exclude
+        weights_file: Weights path (default: WEIGHTS_FILE)
+        pool_key: Identifies the catalog the pool came from (default: QUOTES_FILE)
+    
+    Returns:
+        Quote record, or None if every available quote has weight 0
+    """
+    rules, rules_key = weighted_selection.cached_weight_rules(weights_file or WEIGHTS_FILE)
+    key = (pool_key or catalog_key(), theme_label, rules_key)
+    selector = weighted_selection.selector_for(key, quotes, rules)
+    
+    author_counts = {}
+    for entry in history.get('quotes', []):
+        author_counts[entry.get('author')] = author_counts.get(entry.get('author'), 0) + 1
+    selector.update(recently_used_ids, author_counts)
     
-    with open(quotes_file, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    try:
+        return quotes[selector.choice()]
+    except IndexError:
+        print("⚠️  All available quotes have weight 0, picking uniformly")
+        return None
 
 
-def generate_random_quote(theme_filter=None):
+def generate_random_quote(theme_filter=None, quotes=None, history_file=None, days_before_reuse=None,
+                          weights_file=None, pool_key=None, by_theme=None):
     """Generate a random quote, optionally filtered by theme
     Tracks quote history to prevent repeats within 30 days
     
+    The keyword arguments default to the module settings; multi_tenant.py
+    passes its own so tenants can be generated side by side.
+    
     Args:
         theme_filter: Theme to filter by (e.g., 'wisdom', 'humor'), or None for all quotes
+        quotes: Catalog to pick from (default: load_quotes())
+        history_file: History path (default: HISTORY_FILE)
+        days_before_reuse: Reuse window in days (default: DAYS_BEFORE_REUSE)
+        weights_file: Weights file for weighted selection (default: WEIGHTS_FILE)
+        pool_key: Identifies `quotes` for caching selection tables (required with
+            weights when `quotes` is given)
+        by_theme: Theme index of `quotes` kept by the caller (default: theme_index())
     
     Returns:
-        Dictionary containing quote data with timestamp
+        New dictionary with the quote's fields, timestamp and layouts
+        (the catalog record itself is never modified)
     """
-    all_quotes = load_quotes()
-    
-    # Load and cleanup history
-    history = load_quote_history()
-    history = cleanup_old_history(history)
-    recently_used_ids = get_recently_used_quote_ids(history)
-    
-    # Filter by theme if specified
-    if theme_filter and theme_filter.lower() != 'all':
-        filtered_quotes = [q for q in all_quotes if q.get('theme', '').lower() == theme_filter.lower()]
-        if not filtered_quotes:
-            print(f"⚠️  No quotes found for theme '{theme_filter}', using all quotes")
-            filtered_quotes = all_quotes
-        quotes = filtered_quotes
-    else:
-        quotes = all_quotes
-    
-    # Filter out recently used quotes
-    available_quotes = [q for q in quotes if q.get('id') not in recently_used_ids]
+    theme_label = (theme_filter or 'all').lower()
+    
+    history_file = history_file or HISTORY_FILE
+    
+    # A .db history file is a SQLite store (see history_store.py) that
+    # returns only the picks inside the reuse window
+    use_store = history_store.is_sqlite_path(history_file)
+    if days_before_reuse is None:
+        days_before_reuse = DAYS_BEFORE_REUSE
+    
+    with instrumentation.span('load', theme=theme_label) as span:
+        all_quotes = load_quotes() if quotes is None else quotes
+        if use_store:
+            with history_store.HistoryStore(history_file) as store:
+                history = store.recent(days_before_reuse)
+        else:
+            history = load_quote_history(history_file)
+        # Sizes cost a stat() each, so only when metrics are recorded
+        if instrumentation.is_enabled():
+            catalog_bytes = instrumentation.file_size(QUOTES_FILE) if quotes is None else 0
+            span['bytes'] = catalog_bytes + instrumentation.file_size(history_file)
+        span['items'] = len(all_quotes)
+    
+    # Cleanup history
+    with instrumentation.span('cleanup', theme=theme_label) as span:
+        if not use_store:
+            history = cleanup_old_history(history, days_before_reuse)
+        recently_used_ids = get_recently_used_quote_ids(history)
+        span['items'] = len(history['quotes'])
+    
+    with instrumentation.span('filter', theme=theme_label) as span:
+        compiled = isinstance(all_quotes, CompiledCatalog)
+        
+        # Filter by theme if specified, from the theme index instead of
+        # scanning every quote
+        if theme_filter and theme_filter.lower() != 'all':
+            if by_theme is None:
+                by_theme = theme_index(all_quotes)
+            filtered_quotes = by_theme.get(theme_filter.lower()) or []
+            if not filtered_quotes:
+                print(f"⚠️  No quotes found for theme '{theme_filter}', using all quotes")
+                filtered_quotes = all_quotes
+            quotes = filtered_quotes
+        else:
+            quotes = all_quotes
+        
+        # Filter out recently used quotes (a compiled catalog only counts them
+        # here and skips them while picking)
+        if compiled:
+            available_quotes = quotes
+            available_count = quotes.count_excluding(recently_used_ids)
+        else:
+            available_quotes = [q for q in quotes if q.id not in recently_used_ids]
+            available_count = len(available_quotes)
+        span['items'] = available_count
+    
+    instrumentation.set_gauge('quote_pool_size', len(quotes), theme=theme_label)
+    instrumentation.set_gauge('quote_pool_available', available_count, theme=theme_label)
+    instrumentation.set_gauge('quote_pool_available_ratio', available_count / len(quotes) if quotes else 0.0,
+                              theme=theme_label)
+    instrumentation.inc('quote_pool_resets_total', 0, theme=theme_label)
     
     # Fallback: If all quotes have been used recently, reset and use all quotes
-    if not available_quotes:
+    reset = not available_count
+    if reset:
         print(f"ℹ️  All quotes in this theme have been used recently. Resetting history.")
+        instrumentation.inc('quote_pool_resets_total', theme=theme_label)
         available_quotes = quotes
+        recently_used_ids = set()
         # Clear history for this theme
         history = {'quotes': []}
     
-    # Select random quote from available ones
-    quote = random.choice(available_quotes)
-    
-    # Add timestamp
-    quote['updated_on'] = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+    with instrumentation.span('select', theme=theme_label):
+        # Select random quote from available ones
+        quote = None
+        if weights_file or WEIGHTS_FILE:
+            quote = choose_weighted_quote(quotes, theme_label, history, recently_used_ids, weights_file, pool_key)
+        if quote is None and compiled:
+            quote = quotes.choice_excluding(recently_used_ids)
+        elif quote is None:
+            quote = random.choice(available_quotes)
+        
+        # Output payload: a new dictionary with the timestamp and the
+        # precomputed font size class and line breaks for each template layout
+        updated_on = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+        payload = quote.to_payload(updated_on=updated_on, layouts=fit_quote_layouts(quote.text))
     
     # Record this quote in history
     history_entry = {
-        'id': quote.get('id'),
-        'text': quote.get('text'),
-        'author': quote.get('author'),
-        'movie': quote.get('movie'),
-        'theme': quote.get('theme'),
-        'selected_on': quote['updated_on']
+        'id': quote.id,
+        'text': quote.text,
+        'author': quote.author,
+        'movie': quote.movie,
+        'theme': quote.theme,
+        'selected_on': updated_on
     }
     history['quotes'].append(history_entry)
-    save_quote_history(history)
-    
-    return quote
+    with instrumentation.span('history_save', theme=theme_label) as span:
+        if use_store:
+            with history_store.HistoryStore(history_file) as store:
+                store.add(history_entry, reset_endpoint=theme_label if reset else None)
+        else:
+            save_quote_history(history, history_file)
+        if instrumentation.is_enabled():
+            span['bytes'] = instrumentation.file_size(history_file)
+        span['items'] = len(history['quotes'])
+    
+    return payload
 
 
-def save_random_quote(theme=None, output_file=None):
+def save_random_quote(theme=None, output_file=None, output_root=None, verbose=True, fields=None, **options):
     """Generate quote and save to API endpoint
     
     Args:
         theme: Theme to filter by (e.g., 'wisdom', 'humor', 'all')
         output_file: Custom output path (auto-generated if None)
+        output_root: Directory output_file is relative to (default: OUTPUT_ROOT)
+        verbose: Print the saved quote
+        fields: Extra payload fields (e.g. the region of a regional endpoint)
+        **options: Passed to generate_random_quote() (quotes, history_file, ...)
     
     Returns:
         The generated quote dictionary
@@ -168,29 +389,83 @@ def save_random_quote(theme=None, output_file=None):
         theme_suffix = theme if theme and theme != 'all' else 'all'
         output_file = f"api/random-quote-{theme_suffix}.json"
     
-    quote = generate_random_quote(theme_filter=theme)
+    quote = generate_random_quote(theme_filter=theme, **options)
+    if fields:
+        quote.update(fields)
     
     # Create api directory if it doesn't exist
-    output_path = Path(__file__).parent / output_file
+    output_path = Path(output_root or OUTPUT_ROOT) / output_file
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(quote, f, indent=2, ensure_ascii=False)
+    theme_label = (theme or 'all').lower()
+    with instrumentation.span('endpoint_write', theme=theme_label) as span:
+        # Minified, with .gz/.br sidecars so servers never compress per request
+        span['bytes'] = precompress.write_json(output_path, quote)
     
-    print(f"✓ Quote saved to {output_file}")
-    print(f"  Theme: {quote.get('theme', 'Unknown')}")
-    print(f"  Text: {quote['text'][:50]}...")
-    print(f"  Author: {quote['author']}")
+    if verbose:
+        print(f"✓ Quote saved to {output_file}")
+        print(f"  Theme: {quote.get('theme', 'Unknown')}")
+        print(f"  Text: {quote['text'][:50]}...")
+        print(f"  Author: {quote['author']}")
     return quote
 
 
+def publish_catalog_sidecars():
+    """Write minified .gz/.br copies of the catalog linked from index.html
+    
+    Sidecars that already match the catalog are left alone.
+    
+    Returns:
+        Bytes written, or 0 if unchanged or for a compiled or missing catalog
+    """
+    if not QUOTES_FILE.exists() or is_compiled(QUOTES_FILE):
+        return 0
+    with open(QUOTES_FILE, 'r', encoding='utf-8') as f:
+        data = precompress.minify_json(json.load(f))
+    return precompress.write_sidecars(OUTPUT_ROOT / QUOTES_FILE.name, data, skip_unchanged=True)
+
+
+def publish_search_index():
+    """Rebuild the sharded search index under api/search if the catalog changed
+    
+    Returns:
+        Publish stats (see search_index.publish()), or None if the index is
+        current or there is no catalog
+    """
+    if not QUOTES_FILE.exists():
+        return None
+    return search_index.publish(
+        load_quotes(),
+        OUTPUT_ROOT / 'api' / 'search',
+        digest=publish_util.catalog_digest(QUOTES_FILE),
+    )
+
+
+def publish_catalog_pages():
+    """Republish the paged catalog under api/catalog if the catalog changed
+    
+    Returns:
+        Publish stats (see catalog_pages.publish()), or None if the pages are
+        current or there is no catalog
+    """
+    import catalog_pages  # Uses theme_index() from this module
+    
+    if not QUOTES_FILE.exists():
+        return None
+    return catalog_pages.publish(
+        load_quotes(),
+        OUTPUT_ROOT / 'api' / 'catalog',
+        digest=publish_util.catalog_digest(QUOTES_FILE),
+    )
+
+
 def generate_all_theme_files():
     """Generate a random quote file for each theme + 'all' themes"""
     all_quotes = load_quotes()
+    publish_catalog_sidecars()
     
     # Get unique themes from quotes
-    themes = sorted(set(q.get('theme', '').lower() for q in all_quotes if q.get('theme')))
-    themes = ['all'] + themes  # Add 'all' option first
+    themes = ['all'] + sorted(theme_index(all_quotes))  # Add 'all' option first
     
     print("\n🎬 Generating quote files for all themes...\n")
     
@@ -209,14 +484,51 @@ def generate_all_theme_files():
     return generated_files
 
 
-if __name__ == "__main__":
-    import sys
-    
-    # Check for command line arguments
-    if len(sys.argv) > 1:
-        theme_arg = sys.argv[1]
-        print(f"Generating quote for theme: {theme_arg}")
-        save_random_quote(theme=theme_arg)
+def main(argv=None):
+    global QUOTES_FILE, WEIGHTS_FILE, HISTORY_FILE
+    
+    parser = argparse.ArgumentParser(description='Generate random Kung Fu Panda quote endpoints')
+    parser.add_argument('theme', nargs='?', help='Only generate this theme (default: all theme files)')
+    parser.add_argument('--catalog', type=Path,
+                        help='Quote catalog: a JSON file or a compiled catalog from compiled_catalog.py '
+                             '(default: quotes.json)')
+    parser.add_argument('--weights', type=Path,
+                        help='Weight quotes by author, movie, theme and recency (see weighted_selection.py)')
+    parser.add_argument('--history', type=Path,
+                        help='History file: JSON, or a SQLite database with a .db suffix (see history_store.py) '
+                             '(default: .quote-history.json)')
+    parser.add_argument('--metrics-dir', default=os.environ.get('QUOTE_METRICS_DIR'),
+                        help='Record stage timings and pool metrics as JSON lines + Prometheus textfile '
+                             'in this directory (default: $QUOTE_METRICS_DIR, disabled if unset)')
+    args = parser.parse_args(argv)
+    
+    if args.catalog:
+        QUOTES_FILE = args.catalog
+    if args.weights:
+        WEIGHTS_FILE = args.weights
+    if args.history:
+        HISTORY_FILE = args.history
+    
+    if args.metrics_dir:
+        instrumentation.enable()
+    
+    if args.theme:
+        print(f"Generating quote for theme: {args.theme}")
+        save_random_quote(theme=args.theme)
     else:
         # Generate all theme files by default
         generate_all_theme_files()
+        stats = publish_search_index()
+        if stats:
+            print(f"\n🔍 Search index rebuilt: {stats['written']:,} of {stats['files']:,} files written")
+        stats = publish_catalog_pages()
+        if stats:
+            print(f"📚 Paged catalog rebuilt: {stats['written']:,} of {stats['files']:,} files written")
+    
+    if args.metrics_dir:
+        jsonl_path, prom_path = instrumentation.export(args.metrics_dir)
+        print(f"\n📈 Metrics written to {jsonl_path} and {prom_path}")
+
+
+if __name__ == "__main__":
+    profiling.run_main(main)
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Rotation analytics over the quote history
+
+Reads a history in one streaming pass and reports how the rotation has
+actually behaved:
+
+    - exposure: how often each quote was shown, and which were never shown
+    - repeat gaps: days between two shows of the same quote (and how many
+      repeats came inside the reuse window, i.e. after a reset)
+    - author and movie balance: share of shows vs. share of the catalog
+    - pool exhaustion: for 'all' and every theme, when the quotes still
+      available run out at the recent pick rate, which triggers a reset
+
+Histories are streamed (json_stream.iter_records for .quote-history.json, a
+cursor for a SQLite history from history_store.py), so memory grows with
+the number of distinct quotes and gap lengths, not with the number of picks.
+Multi-year histories of many tenants are read the same way.
+
+The forecast starts at the last pick (or --as-of). The rate is the number
+of picks per day of each pool over the last reuse window (or the whole
+history, if it is shorter). Quotes come back into a pool when their last
+show leaves the window. A pool whose rate times the window stays below its
+size never runs out.
+
+Usage:
+    python3 history_analytics.py                              # .quote-history.json
+    python3 history_analytics.py .quote-history.db --days-before-reuse 14
+    python3 history_analytics.py --tenants tenants.json       # Every tenant's history and catalog subset
+    python3 history_analytics.py --output analytics.json
+"""
+
+import argparse
+import json
+import sys
+from collections import Counter, deque
+from datetime import timedelta
+from pathlib import Path
+
+import generate_random_quote as gq
+import history_store
+import multi_tenant
+import profiling
+from json_stream import iter_records
+
+
+DAY_SECONDS = 86400
+GAP_PERCENTILES = (('min', 0.0), ('p5', 0.05), ('median', 0.5), ('p95', 0.95), ('max', 1.0))
+TOP_QUOTES = 5
+
+
+def iter_history(history_file):
+    """Stream history entries from a JSON history or a SQLite store, oldest first for SQLite
+
+    Yields:
+        History entry dictionaries
+    """
+    if history_store.is_sqlite_path(history_file):
+        with history_store.HistoryStore(history_file) as store:
+            yield from store.iter_picks()
+        return
+    for key, entry in iter_records(history_file):
+        if key == 'quotes' and isinstance(entry, dict):
+            yield entry
+
+
+def last_reset(history_file):
+    """Time of the latest pool reset recorded by a SQLite history (None for JSON histories)"""
+    if not history_store.is_sqlite_path(history_file):
+        return None
+    with history_store.HistoryStore(history_file) as store:
+        resets = store.resets()
+    return history_store.parse_timestamp(resets[-1][1]) if resets else None
+
+
+def percentile_from_counts(counts, fraction):
+    """Value at a cumulative fraction of a {value: count} histogram (None if empty)"""
+    total = sum(counts.values())
+    if not total:
+        return None
+    rank = max(1, -(-fraction * total // 1))  # Nearest rank
+    seen = 0
+    for value in sorted(counts):
+        seen += counts[value]
+        if seen >= rank:
+            return value
+    return max(counts)
+
+
+class RotationStats:
+    """Single-pass accumulator over history entries"""
+
+    def __init__(self, days_before_reuse=gq.DAYS_BEFORE_REUSE):
+        self.window = timedelta(days=days_before_reuse)
+        self.picks = 0
+        self.skipped = 0
+        self.out_of_order = 0
+        self.first = self.last = None
+        self.exposure = Counter()
+        self.last_seen = {}
+        self.gaps = Counter()  # Whole days between two shows of a quote -> repeats
+        self.authors = Counter()
+        self.movies = Counter()
+        # Pick times inside the window before the latest pick, per pool ('all' + themes)
+        self.recent = {}
+
+    def add(self, entry):
+        """Count one history entry (entries without an id or a valid timestamp are skipped)"""
+        try:
+            moment = history_store.parse_timestamp(entry['selected_on'])
+            quote_id = entry['id']
+        except (KeyError, ValueError, AttributeError, TypeError):
+            self.skipped += 1
+            return
+        if quote_id is None:
+            self.skipped += 1
+            return
+
+        self.picks += 1
+        if self.last is not None and moment < self.last:
+            self.out_of_order += 1
+        self.first = moment if self.first is None else min(self.first, moment)
+        self.last = moment if self.last is None else max(self.last, moment)
+
+        self.exposure[quote_id] += 1
+        previous = self.last_seen.get(quote_id)
+        if previous is not None and moment >= previous:
+            self.gaps[int((moment - previous).total_seconds() // DAY_SECONDS)] += 1
+        if previous is None or moment > previous:
+            self.last_seen[quote_id] = moment
+        self.authors[entry.get('author')] += 1
+        self.movies[entry.get('movie')] += 1
+
+        cutoff = self.last - self.window
+        for pool in ('all', (entry.get('theme') or '').lower()):
+            if not pool:
+                continue
+            times = self.recent.setdefault(pool, deque())
+            times.append(moment)
+            while times and times[0] <= cutoff:
+                times.popleft()
+
+    def rate(self, pool, as_of):
+        """Picks per day from a pool over the last window (or the whole history if shorter)"""
+        times = self.recent.get(pool, ())
+        cutoff = as_of - self.window
+        count = sum(1 for moment in times if cutoff < moment <= as_of)
+        # Picks on both the first and last day count, so a short history spans one more day
+        span = min(self.window, as_of - self.first + timedelta(days=1)) if self.first else self.window
+        return count / max(span.total_seconds() / DAY_SECONDS, 1)
+
+
+def forecast_exhaustion(pool_size, expiries, rate, window_days):
+    """Days until every quote of a pool is inside the reuse window
+
+    Args:
+        pool_size: Quotes in the pool
+        expiries: Days from now until each currently used quote leaves the window
+        rate: Picks per day from the pool
+        window_days: Reuse window in days
+
+    Returns:
+        Days (0.0 if already exhausted), or None if the pool never runs out at this rate
+    """
+    in_window = len(expiries)
+    if in_window >= pool_size:
+        return 0.0
+    if rate <= 0:
+        return None
+    start = 0.0
+    # Between two expiries the used count grows by `rate` per day; new picks
+    # only start to expire after a full window, so the count is final by then
+    for end in sorted(e for e in expiries if e < window_days) + [window_days]:
+        days = (pool_size - in_window) / rate
+        if start <= days <= end:
+            return round(days, 2)
+        in_window -= 1
+        start = end
+    return None
+
+
+def balance(shown, catalog):
+    """Share of shows vs. share of the catalog per name, most over-shown first"""
+    total_shown = sum(shown.values()) or 1
+    total_catalog = sum(catalog.values()) or 1
+    rows = []
+    for name in set(catalog) | set(shown):
+        shown_share = shown.get(name, 0) / total_shown
+        catalog_share = catalog.get(name, 0) / total_catalog
+        rows.append({
+            'name': name,
+            'shows': shown.get(name, 0),
+            'shown_share': round(shown_share, 4),
+            'catalog_share': round(catalog_share, 4),
+            'ratio': round(shown_share / catalog_share, 2) if catalog_share else None,
+        })
+    rows.sort(key=lambda r: (-(r['ratio'] if r['ratio'] is not None else float('inf')), str(r['name'])))
+    return rows
+
+
+def summarize(stats, quotes, as_of=None, reset_at=None):
+    """Report dictionary for one history
+
+    Args:
+        stats: Filled RotationStats
+        quotes: Catalog (or tenant subset) the history was picked from
+        as_of: Aware datetime the forecast starts from (default: the latest pick)
+        reset_at: Latest pool reset; earlier picks no longer block quotes
+
+    Returns:
+        Dictionary with 'picks', 'exposure', 'gaps', 'authors', 'movies' and 'pools'
+    """
+    as_of = as_of or stats.last
+    window_days = stats.window.days
+    catalog_ids = [q.id for q in quotes]
+    counts = [stats.exposure.get(quote_id, 0) for quote_id in catalog_ids]
+    by_id = {q.id: q for q in quotes}
+
+    gaps = {name: percentile_from_counts(stats.gaps, fraction) for name, fraction in GAP_PERCENTILES}
+    repeats = sum(stats.gaps.values())
+    early = sum(count for gap, count in stats.gaps.items() if gap < window_days)
+
+    report = {
+        'picks': stats.picks,
+        'skipped': stats.skipped,
+        'out_of_order': stats.out_of_order,
+        'first': stats.first.isoformat() if stats.first else None,
+        'last': stats.last.isoformat() if stats.last else None,
+        'as_of': as_of.isoformat() if as_of else None,
+        'days_before_reuse': window_days,
+        'exposure': {
+            'quotes': len(catalog_ids),
+            'never_shown': sum(1 for c in counts if c == 0),
+            'min': min(counts, default=0),
+            'median': sorted(counts)[len(counts) // 2] if counts else 0,
+            'max': max(counts, default=0),
+            'top': [{'id': quote_id, 'shows': shows, 'text': by_id[quote_id].text[:60] if quote_id in by_id else None}
+                    for quote_id, shows in stats.exposure.most_common(TOP_QUOTES)],
+            'not_in_catalog': sum(1 for quote_id in stats.exposure if quote_id not in by_id),
+        },
+        'gaps': dict(gaps, repeats=repeats, within_window=early,
+                     histogram={str(gap): count for gap, count in sorted(stats.gaps.items())}),
+        'authors': balance(stats.authors, Counter(q.author for q in quotes)),
+        'movies': balance(stats.movies, Counter(q.movie for q in quotes)),
+        'pools': {},
+    }
+    if as_of is None:
+        return report
+
+    cutoff = as_of - stats.window
+    if reset_at is not None:
+        cutoff = max(cutoff, reset_at - timedelta(microseconds=1))
+    pools = {'all': quotes}
+    pools.update(sorted(gq.theme_index(tuple(quotes)).items()))
+    for name, pool in pools.items():
+        expiries = [(stats.last_seen[q.id] + stats.window - as_of).total_seconds() / DAY_SECONDS
+                    for q in pool if q.id in stats.last_seen and cutoff < stats.last_seen[q.id] <= as_of]
+        rate = stats.rate(name, as_of)
+        days = forecast_exhaustion(len(pool), expiries, rate, window_days)
+        report['pools'][name] = {
+            'size': len(pool),
+            'available': len(pool) - len(expiries),
+            'picks_per_day': round(rate, 3),
+            'exhausted_in_days': days,
+            'exhausted_on': (as_of + timedelta(days=days)).date().isoformat() if days is not None else None,
+        }
+    return report
+
+
+def analyze(history_file, quotes, days_before_reuse=gq.DAYS_BEFORE_REUSE, as_of=None):
+    """Stream one history and summarize it against its catalog"""
+    stats = RotationStats(days_before_reuse)
+    for entry in iter_history(history_file):
+        stats.add(entry)
+    return summarize(stats, quotes, as_of, last_reset(history_file))
+
+
+def print_report(name, report, top=TOP_QUOTES):
+    """Print one history's report"""
+    print(f"\n📊 {name}: {report['picks']:,} picks from {report['first'] or '-'} to {report['last'] or '-'}")
+    if report['skipped'] or report['out_of_order']:
+        print(f"   ⚠️  {report['skipped']} invalid entries skipped, {report['out_of_order']} out of order")
+
+    exposure = report['exposure']
+    print(f"   Exposure: {exposure['never_shown']} of {exposure['quotes']} quotes never shown, "
+          f"shows per quote {exposure['min']}-{exposure['max']} (median {exposure['median']})")
+    for quote in exposure['top'][:top]:
+        print(f"     #{quote['id']:<5} {quote['shows']:>4}x  {quote['text'] or '(not in catalog)'}")
+
+    gaps = report['gaps']
+    if gaps['repeats']:
+        print(f"   Repeat gaps (days): min {gaps['min']}, p5 {gaps['p5']}, median {gaps['median']}, "
+              f"p95 {gaps['p95']}, max {gaps['max']}; {gaps['within_window']} of {gaps['repeats']} "
+              f"repeats inside the {report['days_before_reuse']}-day window")
+
+    for field in ('authors', 'movies'):
+        rows = [r for r in report[field] if r['ratio'] is not None]
+        if rows:
+            high, low = rows[0], rows[-1]
+            print(f"   {field.title()}: most over-shown {high['name']} ({high['ratio']:.2f}x catalog share), "
+                  f"most under-shown {low['name']} ({low['ratio']:.2f}x)")
+
+    if report['pools']:
+        print(f"   {'Pool':<12} {'Size':>5} {'Available':>10} {'Picks/day':>10}  Exhausted")
+        for name, pool in report['pools'].items():
+            when = (f"in {pool['exhausted_in_days']:.1f} days ({pool['exhausted_on']})"
+                    if pool['exhausted_in_days'] is not None else 'never at this rate')
+            print(f"   {name:<12} {pool['size']:>5} {pool['available']:>10} {pool['picks_per_day']:>10.2f}  {when}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Exposure, repeat gaps, balance and pool exhaustion from the history')
+    parser.add_argument('history', nargs='*', type=Path,
+                        help='History files: JSON or SQLite (default: .quote-history.json)')
+    parser.add_argument('--tenants', type=Path, help='Analyze every tenant of a multi_tenant.py config')
+    parser.add_argument('--catalog', type=Path, help='Quote catalog (default: quotes.json)')
+    parser.add_argument('--days-before-reuse', type=int, default=gq.DAYS_BEFORE_REUSE,
+                        help=f'Reuse window in days (default: {gq.DAYS_BEFORE_REUSE})')
+    parser.add_argument('--as-of', help='Forecast from this ISO 8601 time (default: the latest pick)')
+    parser.add_argument('--output', type=Path, help='Write the reports as JSON')
+    args = parser.parse_args(argv)
+
+    try:
+        as_of = history_store.parse_timestamp(args.as_of) if args.as_of else None
+        # (name, history file, quotes, days before reuse)
+        jobs = []
+        if args.tenants:
+            config = multi_tenant.load_config(args.tenants)
+            index = multi_tenant.CatalogIndex(gq.load_quotes(config['catalog']))
+            for tenant in config['tenants']:
+                jobs.append((tenant['name'], Path(tenant['output_dir']) / '.quote-history.json',
+                             index.subset(tenant.get('filter', {})),
+                             tenant.get('days_before_reuse', gq.DAYS_BEFORE_REUSE)))
+        else:
+            quotes = tuple(gq.load_quotes(args.catalog))
+            for history_file in args.history or [gq.HISTORY_FILE]:
+                jobs.append((str(history_file), history_file, quotes, args.days_before_reuse))
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+
+    reports = {}
+    for name, history_file, quotes, days in jobs:
+        if not Path(history_file).exists():
+            print(f"⚠️  {name}: no history at {history_file}")
+            continue
+        reports[name] = analyze(history_file, quotes, days, as_of)
+        print_report(name, reports[name])
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(reports, indent=2, default=str) + '\n', encoding='utf-8')
+        print(f"\n📄 Report written to {args.output}")
+    return 0 if reports else 1
+
+
+if __name__ == "__main__":
+    sys.exit(profiling.run_main(main))
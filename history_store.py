@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+SQLite quote history with indexed queries
+
+.quote-history.json is rewritten and fully scanned on every run, and it only
+keeps the current reuse window. Pointing the generator at a .db history file
+instead (python3 generate_random_quote.py --history .quote-history.db) keeps
+every pick in a local SQLite database:
+
+    history(id, text, author, movie, theme, selected_on)   One row per pick
+    resets(endpoint, reset_on)                             Pool-exhaustion resets
+
+Indexes on (theme, selected_on) and (id, selected_on) answer "was id X used
+in the last 30 days?" and "what was shown for theme Y last week?" without a
+scan. Timestamps are stored as fixed-width UTC ISO 8601 text
+(2024-01-05T06:00:00.000000Z), so text order is time order.
+
+A reset does not delete anything: the reuse window simply starts at the
+pick that followed the latest reset, which gives the same picks as clearing
+the JSON history.
+
+The database runs in WAL mode, so a generator writing a pick does not block
+other processes reading it (a server, a report, another tenant), and
+writers wait for each other instead of failing.
+
+Usage:
+    python3 history_store.py migrate                     # .quote-history.json -> .quote-history.db
+    python3 history_store.py query --theme wisdom --days 7
+    python3 history_store.py query --id 5 --days 30
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+
+DEFAULT_DB = Path(__file__).parent / '.quote-history.db'
+DEFAULT_JSON = Path(__file__).parent / '.quote-history.json'
+
+SQLITE_SUFFIXES = ('.db', '.sqlite', '.sqlite3')
+
+# Seconds a connection waits for another writer before giving up
+BUSY_TIMEOUT = 30
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER,
+    text TEXT,
+    author TEXT,
+    movie TEXT,
+    theme TEXT COLLATE NOCASE,
+    selected_on TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS history_id_selected_on ON history (id, selected_on);
+CREATE INDEX IF NOT EXISTS history_theme_selected_on ON history (theme, selected_on);
+CREATE INDEX IF NOT EXISTS history_selected_on ON history (selected_on);
+
+CREATE TABLE IF NOT EXISTS resets (
+    endpoint TEXT,
+    reset_on TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS resets_reset_on ON resets (reset_on);
+'''
+
+COLUMNS = ('id', 'text', 'author', 'movie', 'theme', 'selected_on')
+
+
+def is_sqlite_path(path):
+    """Whether a history path names a SQLite database (by suffix)"""
+    return Path(path).suffix.lower() in SQLITE_SUFFIXES
+
+
+def format_timestamp(moment):
+    """Fixed-width UTC text for a datetime, sortable as text"""
+    return moment.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+def parse_timestamp(value):
+    """Aware datetime from an ISO 8601 timestamp ('Z' allowed)
+
+    Raises:
+        ValueError: If the value is not a timestamp
+    """
+    moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment
+
+
+class HistoryStore:
+    """Quote history in a SQLite database (one connection, one thread)"""
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit: every statement is its own short transaction; writes
+        # that belong together take the write lock with BEGIN IMMEDIATE
+        self.connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, entry, reset_endpoint=None):
+        """Record one pick (a history entry dictionary)
+
+        Args:
+            entry: History entry with 'selected_on'
+            reset_endpoint: Endpoint whose pool was exhausted just before this
+                pick; the reuse window restarts with this pick
+
+        Returns:
+            True if added, False if this id was already recorded at that time
+        """
+        selected_on = format_timestamp(parse_timestamp(entry['selected_on']))
+        row = [entry.get(column) for column in COLUMNS[:-1]] + [selected_on]
+        with self.connection:
+            self.connection.execute('BEGIN IMMEDIATE')
+            if reset_endpoint is not None:
+                self.connection.execute('INSERT INTO resets (endpoint, reset_on) VALUES (?, ?)',
+                                        (reset_endpoint, selected_on))
+            cursor = self.connection.execute(
+                f"INSERT OR IGNORE INTO history ({', '.join(COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)", row)
+        return cursor.rowcount == 1
+
+    def window(self, days_before_reuse, now=None):
+        """Bounds of the reuse window: picks after the cutoff and at or after the latest reset
+
+        Returns:
+            Tuple of (cutoff, latest reset or '') timestamps
+        """
+        now = now or datetime.now(timezone.utc)
+        cutoff = format_timestamp(now - timedelta(days=days_before_reuse))
+        last_reset = self.connection.execute('SELECT MAX(reset_on) FROM resets').fetchone()[0]
+        return cutoff, last_reset or ''
+
+    def recent(self, days_before_reuse, now=None):
+        """Picks inside the reuse window, oldest first
+
+        Returns:
+            History dictionary ({'quotes': [...]}) like cleanup_old_history()
+        """
+        rows = self.connection.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM history WHERE selected_on > ? AND selected_on >= ? "
+            "ORDER BY selected_on", self.window(days_before_reuse, now))
+        return {'quotes': [dict(row) for row in rows]}
+
+    def recently_used_ids(self, days_before_reuse, now=None):
+        """Ids picked inside the reuse window"""
+        rows = self.connection.execute(
+            'SELECT DISTINCT id FROM history WHERE selected_on > ? AND selected_on >= ?',
+            self.window(days_before_reuse, now))
+        return {row[0] for row in rows}
+
+    def was_used(self, quote_id, days_before_reuse, now=None):
+        """Whether a quote was picked inside the reuse window"""
+        row = self.connection.execute(
+            'SELECT 1 FROM history WHERE id = ? AND selected_on > ? AND selected_on >= ? LIMIT 1',
+            (quote_id, *self.window(days_before_reuse, now))).fetchone()
+        return row is not None
+
+    def shown(self, theme=None, quote_id=None, since=None, until=None):
+        """Picks filtered by quote theme (case-insensitive), id and time range, oldest first
+
+        Args:
+            theme: Quote theme
+            quote_id: Quote id
+            since: Earliest datetime (inclusive)
+            until: Latest datetime (exclusive)
+        """
+        conditions, params = [], []
+        if theme is not None:
+            conditions.append('theme = ?')
+            params.append(theme)
+        if quote_id is not None:
+            conditions.append('id = ?')
+            params.append(quote_id)
+        if since is not None:
+            conditions.append('selected_on >= ?')
+            params.append(format_timestamp(since))
+        if until is not None:
+            conditions.append('selected_on < ?')
+            params.append(format_timestamp(until))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        rows = self.connection.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM history {where} ORDER BY selected_on", params)
+        return [dict(row) for row in rows]
+
+    def iter_picks(self):
+        """Every pick, oldest first, read from the cursor one row at a time"""
+        rows = self.connection.execute(f"SELECT {', '.join(COLUMNS)} FROM history ORDER BY selected_on")
+        for row in rows:
+            yield dict(row)
+
+    def resets(self, since=None):
+        """Recorded resets as (endpoint, reset_on) tuples, oldest first"""
+        rows = self.connection.execute(
+            'SELECT endpoint, reset_on FROM resets WHERE reset_on >= ? ORDER BY reset_on',
+            (format_timestamp(since) if since else '',))
+        return [tuple(row) for row in rows]
+
+    def prune(self, before):
+        """Delete picks and resets older than a datetime
+
+        Returns:
+            Number of picks deleted
+        """
+        cutoff = format_timestamp(before)
+        with self.connection:
+            self.connection.execute('BEGIN IMMEDIATE')
+            deleted = self.connection.execute('DELETE FROM history WHERE selected_on < ?', (cutoff,)).rowcount
+            self.connection.execute('DELETE FROM resets WHERE reset_on < ?', (cutoff,))
+        return deleted
+
+    def migrate_json(self, json_file=DEFAULT_JSON):
+        """Import a .quote-history.json file
+
+        Safe to run more than once: picks already in the database are skipped.
+
+        Returns:
+            Tuple of (imported, skipped) entry counts; entries without a valid
+            timestamp count as skipped
+        """
+        with open(json_file, 'r', encoding='utf-8') as f:
+            entries = json.load(f).get('quotes', [])
+
+        rows = []
+        for entry in entries:
+            try:
+                selected_on = format_timestamp(parse_timestamp(entry['selected_on']))
+            except (KeyError, ValueError, AttributeError, TypeError):
+                continue
+            rows.append([entry.get(column) for column in COLUMNS[:-1]] + [selected_on])
+
+        with self.connection:
+            self.connection.execute('BEGIN IMMEDIATE')
+            before = self.connection.total_changes
+            self.connection.executemany(
+                f"INSERT OR IGNORE INTO history ({', '.join(COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)", rows)
+            imported = self.connection.total_changes - before
+        return imported, len(entries) - imported
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='SQLite quote history: migrate and query')
+    parser.add_argument('--db', type=Path, default=DEFAULT_DB, help='History database (default: .quote-history.db)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    migrate = subparsers.add_parser('migrate', help='Import a JSON history file')
+    migrate.add_argument('json_file', nargs='?', type=Path, default=DEFAULT_JSON,
+                         help='JSON history (default: .quote-history.json)')
+
+    query = subparsers.add_parser('query', help='List picks')
+    query.add_argument('--theme', help='Quote theme')
+    query.add_argument('--id', type=int, help='Quote id')
+    query.add_argument('--days', type=int, help='Only the last N days')
+    args = parser.parse_args(argv)
+
+    if args.command == 'migrate':
+        if not args.json_file.exists():
+            print(f"❌ History not found: {args.json_file}")
+            return 1
+        with HistoryStore(args.db) as store:
+            imported, skipped = store.migrate_json(args.json_file)
+        print(f"✅ Imported {imported} picks into {args.db} ({skipped} skipped)")
+        print(f"   Generate with: python3 generate_random_quote.py --history {args.db}")
+        return 0
+
+    if not args.db.exists():
+        print(f"❌ History database not found: {args.db}")
+        return 1
+    since = datetime.now(timezone.utc) - timedelta(days=args.days) if args.days is not None else None
+    with HistoryStore(args.db) as store:
+        picks = store.shown(theme=args.theme, quote_id=args.id, since=since)
+    print(f"📜 {len(picks)} picks")
+    for pick in picks:
+        print(f"   {pick['selected_on']}  #{pick['id']} [{pick['theme']}] {pick['text'][:60]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Ingest quote sources into one normalized catalog
+
+Streams any number of source files (quotes.json and quotes-store/*.json by
+default) record by record, maps their schemas onto the canonical
+quotes.json record, assigns stable ids and writes the merged catalog.
+
+Supported source schemas:
+    quotes.json / q3.json: [{"id", "text", "author", "movie", "theme"}]
+    q1.json:               [{"quote", "character", "movie"}]
+    q2.json:               {"<movie>": [{"quote", "character"}]}
+
+Re-running only re-reads sources whose size or modification time changed;
+unchanged sources are merged from a per-source cache of normalized records.
+Ids are kept in a state file keyed by normalized text + author, so a quote
+keeps its id across runs and ids of removed quotes are never reused. Exact
+repeats (same normalized text and author) collapse onto the first source's
+record, so list curated sources first.
+
+Usage:
+    python3 ingest_quotes.py                       # Ingest default sources
+    python3 ingest_quotes.py dumps/*.json          # Ingest specific sources
+    python3 ingest_quotes.py --force               # Re-read every source
+    python3 ingest_quotes.py --dedupe              # Also merge near-duplicates (see dedupe_quotes.py)
+
+Output:
+    quotes-store/catalog.json (merged catalog, same format as quotes.json)
+    quotes-store/.ingest-state.json (id registry; commit it with the catalog,
+        since ids in histories and endpoints depend on it)
+    quotes-store/.ingest-cache/ (per-source cache; not committed)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+import dedupe_quotes
+from json_stream import iter_records
+
+
+PROJECT_ROOT = Path(__file__).parent
+DEFAULT_SOURCES = [PROJECT_ROOT / 'quotes.json'] + sorted((PROJECT_ROOT / 'quotes-store').glob('q*.json'))
+DEFAULT_OUTPUT = PROJECT_ROOT / 'quotes-store' / 'catalog.json'
+DEFAULT_STATE = PROJECT_ROOT / 'quotes-store' / '.ingest-state.json'
+CACHE_DIR_NAME = '.ingest-cache'
+DEFAULT_DEDUPE_REPORT = dedupe_quotes.DEFAULT_REPORT
+
+DEFAULT_THEME = 'Uncategorized'
+
+# Short character names used by community dumps -> names used in quotes.json
+AUTHOR_ALIASES = {
+    'oogway': 'Master Oogway',
+    'shifu': 'Master Shifu',
+    'shen': 'Lord Shen',
+    'chameleon': 'The Chameleon',
+    'the soothsayer': 'Soothsayer',
+}
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def canonical_author(name):
+    """Map a character name onto the name used in quotes.json"""
+    name = _WHITESPACE_RE.sub(' ', (name or '').strip())
+    return AUTHOR_ALIASES.get(name.lower(), name)
+
+
+def record_key(text, author):
+    """Identity of a quote for id assignment: case/whitespace-insensitive text + author"""
+    text = _WHITESPACE_RE.sub(' ', text.strip()).casefold()
+    return f"{text}|{author.casefold()}"
+
+
+def normalize_record(raw, context_key=None):
+    """Map a source record onto the canonical quote schema
+
+    Args:
+        raw: Record from a source file
+        context_key: Enclosing object key (the movie for q2-style sources)
+
+    Returns:
+        Dictionary with text/author/movie/theme (and the source 'id' if any),
+        or None if the record has no text
+    """
+    if not isinstance(raw, dict):
+        return None
+
+    text = raw.get('text') or raw.get('quote')
+    if not isinstance(text, str) or not text.strip():
+        return None
+
+    record = {
+        'text': _WHITESPACE_RE.sub(' ', text.strip()),
+        'author': canonical_author(raw.get('author') or raw.get('character') or 'Unknown'),
+        'movie': raw.get('movie') or context_key or 'Unknown',
+        'theme': raw.get('theme') or DEFAULT_THEME,
+    }
+    if isinstance(raw.get('id'), int):
+        record['source_id'] = raw['id']
+    return record
+
+
+def source_signature(path):
+    """Cheap change detector for a source file"""
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def cache_path(cache_dir, source):
+    """Per-source cache file of normalized records (JSON lines)"""
+    digest = hashlib.sha1(str(Path(source).resolve()).encode('utf-8')).hexdigest()[:12]
+    return cache_dir / f"{Path(source).stem}-{digest}.jsonl"
+
+
+def load_state(state_file):
+    """Load ingestion state (source signatures and the id map)"""
+    if not state_file.exists():
+        return {'sources': {}, 'ids': {}, 'next_id': 1}
+    with open(state_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_state(state, state_file):
+    """Save ingestion state"""
+    state_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(state_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False)
+
+
+def ingest_source(source, cache_file, state):
+    """Stream one source into its cache of normalized records with stable ids
+
+    Args:
+        source: Source file path
+        cache_file: Cache file to (re)write
+        state: Ingestion state; its id map is updated in place
+
+    Returns:
+        Number of records written to the cache
+    """
+    ids = state['ids']
+    taken = set(ids.values())
+    count = 0
+
+    temp_file = cache_file.with_suffix('.tmp')
+    with open(temp_file, 'w', encoding='utf-8') as out:
+        for context_key, raw in iter_records(source):
+            record = normalize_record(raw, context_key)
+            if record is None:
+                continue
+
+            key = record_key(record['text'], record['author'])
+            source_id = record.pop('source_id', None)
+            if key not in ids:
+                # Keep a source's own id when nothing else has claimed it
+                if source_id is not None and source_id not in taken:
+                    ids[key] = source_id
+                else:
+                    while state['next_id'] in taken:
+                        state['next_id'] += 1
+                    ids[key] = state['next_id']
+                taken.add(ids[key])
+                state['next_id'] = max(state['next_id'], ids[key] + 1)
+
+            out.write(json.dumps({'id': ids[key], **record}, ensure_ascii=False) + '\n')
+            count += 1
+
+    os.replace(temp_file, cache_file)
+    return count
+
+
+def iter_cached_records(cache_files):
+    """Stream normalized records from cache files, dropping exact duplicates
+
+    The first source to provide a quote wins, so list curated sources first.
+    """
+    seen = set()
+    for cache_file in cache_files:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                if record['id'] in seen:
+                    continue
+                seen.add(record['id'])
+                yield record
+
+
+def write_catalog(records, output_file):
+    """Stream records into a JSON array formatted like quotes.json
+
+    Returns:
+        Number of records written
+    """
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    temp_file = output_file.with_suffix('.tmp')
+    count = 0
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        f.write('[')
+        for record in records:
+            body = json.dumps(record, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+            f.write((',\n  ' if count else '\n  ') + body)
+            count += 1
+        f.write('\n]\n' if count else ']\n')
+    os.replace(temp_file, output_file)
+    return count
+
+
+def ingest(sources, output_file=DEFAULT_OUTPUT, state_file=DEFAULT_STATE, force=False,
+           dedupe_threshold=None, report_file=DEFAULT_DEDUPE_REPORT):
+    """Ingest sources into a merged catalog, re-reading only changed sources
+
+    Args:
+        sources: Source file paths, highest priority first
+        output_file: Merged catalog path
+        state_file: Ingestion state path (cache lives next to it)
+        force: Re-read every source even if unchanged
+        dedupe_threshold: Also merge near-duplicates at this similarity (None to skip)
+        report_file: Where to write the near-duplicate merge report
+
+    Returns:
+        Dictionary with 'processed', 'skipped' and 'written' counts
+    """
+    state = load_state(state_file)
+    cache_dir = state_file.parent / CACHE_DIR_NAME
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    processed, skipped = [], []
+    cache_files = []
+    for source in sources:
+        source_key = str(Path(source).resolve())
+        signature = source_signature(source)
+        cache_file = cache_path(cache_dir, source)
+        cache_files.append(cache_file)
+
+        if not force and state['sources'].get(source_key) == signature and cache_file.exists():
+            skipped.append(source)
+            continue
+
+        count = ingest_source(source, cache_file, state)
+        state['sources'][source_key] = signature
+        processed.append(source)
+        print(f"✓ Ingested {count:,} records from {source}")
+
+    # Nothing changed (and the same sources are listed): keep the existing catalog
+    source_list = [str(Path(s).resolve()) for s in sources]
+    if (not processed and output_file.exists() and state.get('output_sources') == source_list
+            and state.get('output_dedupe') == dedupe_threshold):
+        return {'processed': 0, 'skipped': len(skipped), 'written': None}
+
+    records = iter_cached_records(cache_files)
+    if dedupe_threshold is not None:
+        records, report = dedupe_quotes.dedupe(records, dedupe_threshold)
+        report_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"🔍 Merged {report['duplicates']:,} near-duplicates (report: {report_file})")
+
+    written = write_catalog(records, output_file)
+    state['output_sources'] = source_list
+    state['output_dedupe'] = dedupe_threshold
+    save_state(state, state_file)
+    return {'processed': len(processed), 'skipped': len(skipped), 'written': written}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Ingest quote sources into one normalized catalog')
+    parser.add_argument('sources', nargs='*', type=Path, help='Source files, highest priority first '
+                        '(default: quotes.json, quotes-store/q*.json)')
+    parser.add_argument('--output', type=Path, default=DEFAULT_OUTPUT, help='Merged catalog path')
+    parser.add_argument('--state', type=Path, default=DEFAULT_STATE, help='Ingestion state file')
+    parser.add_argument('--force', action='store_true', help='Re-read every source even if unchanged')
+    parser.add_argument('--dedupe', nargs='?', type=float, const=dedupe_quotes.DEFAULT_THRESHOLD,
+                        metavar='THRESHOLD', help='Merge near-duplicates (MinHash/LSH) at this shingle '
+                        f'similarity (default when given: {dedupe_quotes.DEFAULT_THRESHOLD})')
+    parser.add_argument('--report', type=Path, default=DEFAULT_DEDUPE_REPORT, help='Near-duplicate merge report path')
+    args = parser.parse_args(argv)
+
+    sources = args.sources or DEFAULT_SOURCES
+    missing = [s for s in sources if not Path(s).exists()]
+    if missing:
+        print(f"❌ Source not found: {', '.join(str(s) for s in missing)}")
+        return 1
+
+    result = ingest(sources, args.output, args.state, force=args.force,
+                    dedupe_threshold=args.dedupe, report_file=args.report)
+
+    if result['written'] is None:
+        print(f"✅ All {result['skipped']} sources unchanged, {args.output} is up to date")
+    else:
+        print(f"\n✅ Wrote {result['written']:,} quotes to {args.output} "
+              f"({result['processed']} sources processed, {result['skipped']} unchanged)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
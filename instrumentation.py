@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Opt-in timing instrumentation and metrics export for generation runs
+
+Spans time the stages of a generation run (load, cleanup, filter, select,
+history save, endpoint write) and carry a byte/item count. Counters and gauges
+track pool-exhaustion resets and per-theme pool sizes. Nothing is recorded
+unless enable() has been called, so the default run pays only for a function
+call per span.
+
+Metrics are exported as:
+    - JSON lines (one record per span/counter/gauge, appended per run)
+    - Prometheus textfile-collector format (rewritten atomically per run)
+
+Usage:
+    import instrumentation
+
+    instrumentation.enable()
+    with instrumentation.span('load', theme='wisdom') as s:
+        s['bytes'] = ...
+    instrumentation.inc('quote_pool_resets_total', theme='wisdom')
+    instrumentation.set_gauge('quote_pool_available', 12, theme='wisdom')
+    instrumentation.export('metrics/')
+
+    with instrumentation.labels(tenant='acme'):  # Added to everything recorded inside
+        ...
+
+Recording is thread-safe, and labels() is scoped per thread.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+JSONL_FILENAME = 'generation-metrics.jsonl'
+PROM_FILENAME = 'quote_generation.prom'
+
+# Counters that keep counting across runs in the Prometheus textfile
+PERSISTENT_COUNTERS = ('quote_pool_resets_total',)
+
+# One sample line of the text format, and one label inside its {...}
+SAMPLE_LINE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})?\s+(\S+)$')
+LABEL_PAIR = re.compile(r'\s*([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"\s*,?')
+LABEL_ESCAPES = re.compile(r'\\(.)')
+
+HELP = {
+    'quote_generation_span_duration_seconds': ('gauge', 'Duration of a generation stage in the last run'),
+    'quote_generation_span_bytes': ('gauge', 'Bytes read or written by a generation stage in the last run'),
+    'quote_generation_last_run_timestamp_seconds': ('gauge', 'Unix time the last generation run finished'),
+    'quote_pool_size': ('gauge', 'Quotes in the theme pool'),
+    'quote_pool_available': ('gauge', 'Quotes in the theme pool not used within the reuse window'),
+    'quote_pool_available_ratio': ('gauge', 'Share of the theme pool still available'),
+    'quote_pool_resets_total': ('counter', 'Times a theme pool was exhausted and history reset'),
+}
+
+
+class Metrics:
+    """Collected spans, counters and gauges for one run"""
+
+    def __init__(self):
+        self.started_at = datetime.now(timezone.utc)
+        self.spans = []
+        self.counters = {}
+        self.gauges = {}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, **labels):
+        """Time a block; the yielded dict accepts 'bytes' and 'items' counts"""
+        record = {'span': name, 'labels': labels, 'bytes': 0, 'items': 0}
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['duration'] = time.perf_counter() - start
+            with self.lock:
+                self.spans.append(record)
+
+    def inc(self, name, value=1, **labels):
+        """Increment a counter"""
+        key = (name, _label_key(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        """Set a gauge to its latest value"""
+        with self.lock:
+            self.gauges[(name, _label_key(labels))] = value
+
+
+def _label_key(labels):
+    """Hashable, ordered form of a label dict"""
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class _NullSpan:
+    """Span stand-in used while instrumentation is disabled"""
+
+    def __enter__(self):
+        return {}
+
+    def __exit__(self, *exc):
+        return False
+
+
+_metrics = None
+_NULL_SPAN = _NullSpan()
+_default_labels = ContextVar('instrumentation_labels', default={})
+
+
+def enable():
+    """Start recording metrics for this process"""
+    global _metrics
+    _metrics = Metrics()
+    return _metrics
+
+
+def disable():
+    """Stop recording and drop collected metrics"""
+    global _metrics
+    _metrics = None
+
+
+def is_enabled():
+    """Whether metrics are being recorded"""
+    return _metrics is not None
+
+
+@contextmanager
+def labels(**extra):
+    """Add labels to every span, counter and gauge recorded in this block"""
+    token = _default_labels.set({**_default_labels.get(), **extra})
+    try:
+        yield
+    finally:
+        _default_labels.reset(token)
+
+
+def span(name, **labels):
+    """Time a stage if instrumentation is enabled, otherwise do nothing"""
+    if _metrics is None:
+        return _NULL_SPAN
+    return _metrics.span(name, **{**_default_labels.get(), **labels})
+
+
+def inc(name, value=1, **labels):
+    """Increment a counter if instrumentation is enabled"""
+    if _metrics is not None:
+        _metrics.inc(name, value, **{**_default_labels.get(), **labels})
+
+
+def set_gauge(name, value, **labels):
+    """Set a gauge if instrumentation is enabled"""
+    if _metrics is not None:
+        _metrics.set_gauge(name, value, **{**_default_labels.get(), **labels})
+
+
+def file_size(path):
+    """Size of a file in bytes, or 0 if it does not exist"""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _format_labels(labels):
+    """Render labels as a Prometheus label set"""
+    if not labels:
+        return ''
+    escaped = (f'{k}="{_escape(v)}"' for k, v in labels)
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value):
+    """Render a sample value without losing precision"""
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value):
+    """Escape a label value for the Prometheus text format"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _unescape(value):
+    """Undo _escape()"""
+    return LABEL_ESCAPES.sub(lambda m: '\n' if m.group(1) == 'n' else m.group(1), value)
+
+
+def _parse_labels(text):
+    """Label key (see _label_key()) from the inside of a {...} label set
+
+    Returns:
+        Tuple of (name, value) pairs, or None if the text is not a valid label set
+    """
+    pairs, position = [], 0
+    while position < len(text):
+        match = LABEL_PAIR.match(text, position)
+        if not match:
+            return None
+        pairs.append((match.group(1), _unescape(match.group(2))))
+        position = match.end()
+    return tuple(sorted(pairs))
+
+
+def _read_previous_counters(prom_path):
+    """Read persistent counter values from an existing textfile
+
+    Returns:
+        Dictionary of (name, label key) -> value
+    """
+    previous = {}
+    if not prom_path.exists():
+        return previous
+    for line in prom_path.read_text(encoding='utf-8').splitlines():
+        match = SAMPLE_LINE.match(line)
+        if not match or match.group(1) not in PERSISTENT_COUNTERS:
+            continue
+        labels = _parse_labels(match.group(2) or '')
+        try:
+            value = float(match.group(3))
+        except ValueError:
+            continue
+        if labels is not None:
+            previous[(match.group(1), labels)] = value
+    return previous
+
+
+def write_jsonl(metrics, path):
+    """Append one JSON record per span, counter and gauge to a JSON-lines file"""
+    run = metrics.started_at.isoformat().replace('+00:00', 'Z')
+    with open(path, 'a', encoding='utf-8') as f:
+        for record in metrics.spans:
+            f.write(json.dumps({'run': run, 'type': 'span', **record}, ensure_ascii=False) + '\n')
+        for (name, labels), value in metrics.counters.items():
+            f.write(json.dumps({'run': run, 'type': 'counter', 'name': name, 'labels': dict(labels), 'value': value}) + '\n')
+        for (name, labels), value in metrics.gauges.items():
+            f.write(json.dumps({'run': run, 'type': 'gauge', 'name': name, 'labels': dict(labels), 'value': value}) + '\n')
+
+
+def write_prometheus(metrics, path):
+    """Rewrite a Prometheus textfile-collector file for this run
+
+    Span durations and bytes are summed per (span, theme). Persistent counters
+    add to the values already in the file, so they stay monotonic.
+    """
+    series = {}
+
+    for record in metrics.spans:
+        labels = _label_key({'span': record['span'], **record['labels']})
+        for name, value in (('quote_generation_span_duration_seconds', record['duration']),
+                            ('quote_generation_span_bytes', record['bytes'])):
+            series[(name, labels)] = series.get((name, labels), 0) + value
+
+    previous = _read_previous_counters(path)
+    counters = dict(metrics.counters)
+    for key, value in previous.items():
+        counters[key] = counters.get(key, 0) + value
+
+    series.update(counters)
+    series.update(metrics.gauges)
+    series[('quote_generation_last_run_timestamp_seconds', ())] = time.time()
+
+    lines = []
+    for name in sorted({name for name, _ in series}):
+        kind, help_text = HELP.get(name, ('gauge', name))
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for (series_name, labels), value in sorted(series.items()):
+            if series_name == name:
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+
+    # Write then rename so the node exporter never reads a partial file
+    temp_path = Path(str(path) + '.tmp')
+    temp_path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    os.replace(temp_path, path)
+
+
+def export(directory):
+    """Write collected metrics to directory as JSON lines and Prometheus textfile
+
+    Args:
+        directory: Output directory (created if missing)
+
+    Returns:
+        Tuple of (jsonl path, prom path), or None if instrumentation is disabled
+    """
+    if _metrics is None:
+        return None
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    jsonl_path = directory / JSONL_FILENAME
+    prom_path = directory / PROM_FILENAME
+    write_jsonl(_metrics, jsonl_path)
+    write_prometheus(_metrics, prom_path)
+    return jsonl_path, prom_path
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Incremental JSON reader for large quote and history documents
+
+Yields the objects inside a JSON document one at a time while reading the
+file in fixed-size chunks, so memory stays proportional to the largest single
+record instead of the whole document. Supported shapes:
+
+    [ {...}, {...} ]                          -> (None, {...}) per element
+    { "key": [ {...}, ... ], "key2": [...] }  -> ("key", {...}) per element
+    { "key": {...} }                          -> ("key", {...})
+
+Usage:
+    from json_stream import iter_records
+
+    for key, record in iter_records('quotes-store/q2.json'):
+        ...
+"""
+
+import json
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+WHITESPACE = ' \t\n\r'
+
+
+class StreamReader:
+    """Chunked reader that decodes one JSON value at a time"""
+
+    def __init__(self, f, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        """Read another chunk, dropping already consumed text"""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character without consuming it ('' at end)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char):
+        """Consume the given structural character"""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' but found '{found or 'end of file'}'")
+        self.pos += 1
+
+    def decode(self):
+        """Decode and consume the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def iter_array(self):
+        """Yield the elements of the array at the current position"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.decode()
+            separator = self.peek()
+            self.pos += 1
+            if separator == ']':
+                return
+            if separator != ',':
+                raise ValueError(f"Expected ',' or ']' but found '{separator or 'end of file'}'")
+
+
+def iter_records(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Stream (key, record) pairs from a JSON file
+
+    Args:
+        path: Path to the JSON document
+        chunk_size: Characters read per chunk
+
+    Yields:
+        Tuples of (enclosing object key or None, record)
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        reader = StreamReader(f, chunk_size)
+        start = reader.peek()
+
+        if start == '[':
+            for record in reader.iter_array():
+                yield None, record
+            return
+
+        if start != '{':
+            raise ValueError(f"{path}: expected a JSON array or object")
+
+        reader.pos += 1
+        if reader.peek() == '}':
+            return
+        while True:
+            key = reader.decode()
+            reader.expect(':')
+            if reader.peek() == '[':
+                for record in reader.iter_array():
+                    yield key, record
+            else:
+                yield key, reader.decode()
+            separator = reader.peek()
+            reader.pos += 1
+            if separator == '}':
+                return
+            if separator != ',':
+                raise ValueError(f"Expected ',' or '}}' but found '{separator or 'end of file'}'")
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Generate quote endpoints for many branded instances in one process
+
+Each fork normally runs its own generate_random_quote.py with its own
+.quote-history.json. This runs any number of tenants from one config: the
+catalog is loaded and indexed once, each tenant gets its subset of it, and
+tenants are generated in parallel on a thread pool. A tenant's themes run
+in order because they share the tenant's history file.
+
+Config (tenants.json, paths relative to the config file):
+
+    {
+      "catalog": "quotes.json",
+      "workers": 8,
+      "tenants": [
+        {
+          "name": "panda-wisdom",
+          "output_dir": "tenants/panda-wisdom",
+          "themes": ["wisdom", "growth"],
+          "days_before_reuse": 14,
+          "filter": {"authors": ["Master Oogway", "Master Shifu"]},
+          "weights": "weights/wisdom.json"
+        }
+      ]
+    }
+
+Only "name" and "output_dir" are required. "filter" selects the tenant's
+catalog subset by "themes", "authors", "movies" and/or "exclude_ids";
+"themes" lists the endpoints to write (default: every theme in the subset).
+An "all" endpoint is always written.
+
+Output per tenant:
+    <output_dir>/api/random-quote-<theme>.json (+ .gz/.br sidecars)
+    <output_dir>/.quote-history.json
+
+Usage:
+    python3 multi_tenant.py tenants.json
+    python3 multi_tenant.py tenants.json --tenant panda-wisdom --workers 4
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import generate_random_quote as gq
+import instrumentation
+import profiling
+
+
+DEFAULT_WORKERS = min(8, (os.cpu_count() or 1) * 2)
+FILTER_KEYS = ('themes', 'authors', 'movies', 'exclude_ids')
+
+
+class CatalogIndex:
+    """One loaded catalog and its theme index, shared by all tenants
+
+    The catalog is kept as loaded, so a compiled catalog stays memory-mapped
+    and tenants without a filter pick from it directly. Each filtered subset
+    and its theme index are built once and kept here for the process, however
+    many tenants there are.
+    """
+
+    def __init__(self, quotes):
+        self.quotes = quotes
+        self.by_theme = gq.theme_index(quotes)
+        self._subsets = {}
+        self._lock = threading.Lock()
+
+    def subset(self, spec):
+        """Quotes matching a tenant filter
+
+        Args:
+            spec: Dictionary with optional 'themes', 'authors', 'movies' and
+                'exclude_ids' lists (names are case-insensitive)
+
+        Returns:
+            The catalog itself without a filter, otherwise a tuple of Quote records
+        """
+        return self.subset_index(spec)[0]
+
+    def subset_index(self, spec):
+        """Quotes matching a tenant filter and their theme index
+
+        Returns:
+            Tuple of (quotes as from subset(), dict of theme -> quotes)
+        """
+        key = json.dumps(spec, sort_keys=True)
+        with self._lock:
+            entry = self._subsets.get(key)
+        if entry is not None:
+            return entry
+
+        if not any(spec.get(name) for name in FILTER_KEYS):
+            entry = (self.quotes, self.by_theme)
+        else:
+            quotes = self._filter(spec)
+            entry = (quotes, gq.theme_index(quotes))
+        with self._lock:
+            return self._subsets.setdefault(key, entry)
+
+    def _filter(self, spec):
+        if spec.get('themes'):
+            themes = sorted({theme.lower() for theme in spec['themes']})
+            quotes = [q for theme in themes for q in self.by_theme.get(theme, ())]
+        else:
+            quotes = self.quotes
+
+        authors = {a.lower() for a in spec.get('authors') or ()}
+        movies = {m.lower() for m in spec.get('movies') or ()}
+        excluded = set(spec.get('exclude_ids') or ())
+        return tuple(
+            q for q in quotes
+            if (not authors or q.author.lower() in authors)
+            and (not movies or q.movie.lower() in movies)
+            and q.id not in excluded
+        )
+
+
+def load_config(config_file):
+    """Load and validate a tenants config, resolving paths against its directory
+
+    Raises:
+        ValueError: If the config is malformed
+    """
+    config_file = Path(config_file)
+    with open(config_file, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    base = config_file.parent
+    tenants = config.get('tenants')
+    if not isinstance(tenants, list) or not tenants:
+        raise ValueError(f"{config_file}: 'tenants' must be a non-empty list")
+
+    names = set()
+    for tenant in tenants:
+        name = tenant.get('name')
+        if not name or not tenant.get('output_dir'):
+            raise ValueError(f"{config_file}: every tenant needs 'name' and 'output_dir'")
+        if name in names:
+            raise ValueError(f"{config_file}: duplicate tenant name '{name}'")
+        names.add(name)
+
+        unknown = set(tenant.get('filter', {})) - set(FILTER_KEYS)
+        if unknown:
+            raise ValueError(f"{config_file}: tenant '{name}' has unknown filter keys: {', '.join(sorted(unknown))}")
+        days = tenant.get('days_before_reuse', gq.DAYS_BEFORE_REUSE)
+        if not isinstance(days, int) or days < 0:
+            raise ValueError(f"{config_file}: tenant '{name}' days_before_reuse must be a non-negative integer")
+
+        tenant['output_dir'] = base / tenant['output_dir']
+        if tenant.get('weights'):
+            tenant['weights'] = base / tenant['weights']
+
+    config['catalog'] = base / config['catalog'] if config.get('catalog') else gq.QUOTES_FILE
+    return config
+
+
+def generate_tenant(tenant, index, pool_key):
+    """Write every endpoint of one tenant
+
+    Args:
+        tenant: Tenant config entry
+        index: Shared CatalogIndex
+        pool_key: Identifies the shared catalog for selection-table caching
+
+    Returns:
+        Dictionary with the tenant name, written themes and elapsed seconds
+    """
+    start = time.perf_counter()
+    quotes, by_theme = index.subset_index(tenant.get('filter', {}))
+    if not quotes:
+        raise ValueError(f"tenant '{tenant['name']}' filter matches no quotes")
+
+    themes = ['all'] + [t.lower() for t in tenant.get('themes') or sorted(by_theme) if t.lower() != 'all']
+
+    output_dir = Path(tenant['output_dir'])
+    output_dir.mkdir(parents=True, exist_ok=True)
+    options = {
+        'quotes': quotes,
+        'by_theme': by_theme,
+        'history_file': output_dir / '.quote-history.json',
+        'days_before_reuse': tenant.get('days_before_reuse', gq.DAYS_BEFORE_REUSE),
+        'weights_file': tenant.get('weights'),
+        'pool_key': ('tenant', tenant['name'], pool_key, json.dumps(tenant.get('filter', {}), sort_keys=True)),
+    }
+
+    with instrumentation.labels(tenant=tenant['name']):
+        for theme in themes:
+            gq.save_random_quote(theme=theme, output_root=output_dir, verbose=False, **options)
+
+    return {'name': tenant['name'], 'themes': themes, 'seconds': time.perf_counter() - start}
+
+
+def run_tenants(config, workers=DEFAULT_WORKERS, only=None):
+    """Generate all (or the selected) tenants in parallel
+
+    Args:
+        config: Loaded config (see load_config())
+        workers: Thread pool size
+        only: Tenant names to run (default: all)
+
+    Returns:
+        Tuple of (list of results, dict of tenant name -> error message)
+    """
+    tenants = [t for t in config['tenants'] if not only or t['name'] in only]
+
+    load_start = time.perf_counter()
+    index = CatalogIndex(gq.load_quotes(config['catalog']))
+    pool_key = gq.catalog_key(config['catalog'])
+    print(f"📚 Loaded {len(index.quotes):,} quotes once in {time.perf_counter() - load_start:.3f}s "
+          f"for {len(tenants)} tenants")
+
+    results, errors = [], {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(generate_tenant, t, index, pool_key): t['name'] for t in tenants}
+        for future, name in futures.items():
+            try:
+                results.append(future.result())
+            except Exception as e:
+                errors[name] = str(e)
+    return results, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate quote endpoints for many tenants in one process')
+    parser.add_argument('config', type=Path, help='Tenants config (JSON)')
+    parser.add_argument('--tenant', action='append', help='Only generate this tenant (repeatable)')
+    parser.add_argument('--workers', type=int, help=f'Parallel tenants (default: config "workers" or {DEFAULT_WORKERS})')
+    parser.add_argument('--metrics-dir', default=os.environ.get('QUOTE_METRICS_DIR'),
+                        help='Record stage timings and pool metrics, labeled by tenant, in this directory')
+    args = parser.parse_args(argv)
+
+    if not args.config.exists():
+        print(f"❌ Config not found: {args.config}")
+        return 1
+    try:
+        config = load_config(args.config)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    if args.metrics_dir:
+        instrumentation.enable()
+
+    start = time.perf_counter()
+    workers = args.workers or config.get('workers', DEFAULT_WORKERS)
+    results, errors = run_tenants(config, workers, args.tenant)
+
+    for result in results:
+        print(f"✓ {result['name']}: {len(result['themes'])} endpoints in {result['seconds']:.3f}s")
+    for name, error in errors.items():
+        print(f"❌ {name}: {error}")
+    print(f"\n✅ Generated {len(results)} tenants in {time.perf_counter() - start:.3f}s")
+
+    if args.metrics_dir:
+        jsonl_path, prom_path = instrumentation.export(args.metrics_dir)
+        print(f"\n📈 Metrics written to {jsonl_path} and {prom_path}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(profiling.run_main(main))
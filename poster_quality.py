@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Perceptual quality scoring for the poster size budget search
+
+The widest poster that fits TARGET_MAX_SIZE is not always the best one: a
+wide poster squeezed into the budget with a 4-color palette (or a low WebP
+quality) can look worse on e-ink than a slightly narrower clean one. Both
+resize scripts therefore search (width, setting) candidates and keep the
+one that looks most like the source:
+
+    1. For each setting (best quality first), find the widest width that fits
+       the budget, exactly like the width-only search did
+    2. Decode that candidate, scale it to the reference width (the widest
+       candidate width) and compare it with the source downscaled to the same
+       size: PSNR first, then SSIM
+    3. Keep the candidate with the highest SSIM
+
+Cheap checks run first so the search stays fast:
+    - Over budget: rejected from the file size, never decoded
+    - Same width as a better setting: dominated, never decoded
+    - PSNR more than PSNR_PRUNE_DB below the best so far: no SSIM
+    - A setting that fits at the widest width ends the search, since more
+      quantization cannot buy more width
+
+Both metrics are computed with numpy. Without numpy the scripts fall back to
+the width-only search at their default setting.
+
+Every run records the chosen candidate and the scored alternatives per
+poster in the build report (poster-report.json next to the posters), which
+compare_formats.py reads.
+"""
+
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # Width-only search; see search()
+    np = None
+
+
+REPORT_FILE = Path(__file__).parent / 'assets' / 'posters-small-bw-outline' / 'poster-report.json'
+
+# SSIM window (pixels) and stabilizing constants for 8-bit images
+SSIM_WINDOW = 7
+SSIM_C1 = (0.01 * 255) ** 2
+SSIM_C2 = (0.03 * 255) ** 2
+
+# Candidates this far below the best PSNR are not worth an SSIM pass
+PSNR_PRUNE_DB = 3.0
+
+
+def load_gray(image_or_path, size=None):
+    """Grayscale pixels as a float64 array
+
+    Args:
+        image_or_path: PIL image or image file path
+        size: (width, height) to scale to first (Lanczos)
+    """
+    from PIL import Image
+
+    if isinstance(image_or_path, (str, os.PathLike)):
+        with Image.open(image_or_path) as img:
+            return load_gray(img, size)
+    img = image_or_path.convert('L')
+    if size is not None and img.size != tuple(size):
+        img = img.resize(size, Image.Resampling.LANCZOS)
+    return np.asarray(img, dtype=np.float64)
+
+
+def psnr(reference, candidate):
+    """Peak signal-to-noise ratio in dB (inf for identical images)"""
+    mse = float(np.mean((reference - candidate) ** 2))
+    if mse == 0:
+        return float('inf')
+    return float(10 * np.log10(255 ** 2 / mse))
+
+
+def _box_mean(pixels, window):
+    """Mean over every window x window block (valid positions only)"""
+    sums = np.pad(pixels, ((1, 0), (1, 0))).cumsum(axis=0).cumsum(axis=1)
+    blocks = sums[window:, window:] - sums[:-window, window:] - sums[window:, :-window] + sums[:-window, :-window]
+    return blocks / (window * window)
+
+
+def ssim(reference, candidate, window=SSIM_WINDOW):
+    """Mean structural similarity of two grayscale images (1.0 = identical)
+
+    Uses a uniform window computed from summed-area tables, so the cost is a
+    few passes over the image whatever the window size.
+
+    Raises:
+        ValueError: If the images differ in size or are smaller than the window
+    """
+    if reference.shape != candidate.shape:
+        raise ValueError(f"image sizes differ: {reference.shape} vs {candidate.shape}")
+    if min(reference.shape) < window:
+        raise ValueError(f"images must be at least {window}x{window} pixels")
+
+    mu_r = _box_mean(reference, window)
+    mu_c = _box_mean(candidate, window)
+    var_r = _box_mean(reference * reference, window) - mu_r ** 2
+    var_c = _box_mean(candidate * candidate, window) - mu_c ** 2
+    covariance = _box_mean(reference * candidate, window) - mu_r * mu_c
+
+    numerator = (2 * mu_r * mu_c + SSIM_C1) * (2 * covariance + SSIM_C2)
+    denominator = (mu_r ** 2 + mu_c ** 2 + SSIM_C1) * (var_r + var_c + SSIM_C2)
+    return float(np.mean(numerator / denominator))
+
+
+def scaled_height(size, width):
+    """Height of an image of size (width, height) scaled to a width"""
+    return int(width * size[1] / size[0])
+
+
+def search(input_path, temp_output_path, target_size, encode, widths, settings, log=print):
+    """Find the best-looking (width, setting) candidate under a size budget
+
+    Args:
+        input_path: Source poster
+        temp_output_path: Scratch file each candidate is encoded to
+        target_size: Size budget in bytes
+        encode: Function (input_path, output_path, width, setting) -> file size
+        widths: Candidate widths, widest first
+        settings: Encoder settings (palette colors, WebP quality), best quality first
+        log: Function for progress lines
+
+    Returns:
+        Tuple of (best candidate dictionary or None, list of every candidate
+        tried); a candidate holds width, height, setting, bytes, status and,
+        when scored, psnr and ssim
+    """
+    from PIL import Image
+
+    with Image.open(input_path) as img:
+        source_size = img.size
+        reference_width = max(widths)
+        reference_size = (reference_width, scaled_height(source_size, reference_width))
+        # Without numpy: width-only search at the default setting
+        reference = load_gray(img, reference_size) if np is not None else None
+    if reference is None:
+        settings = settings[:1]
+
+    candidates = []
+    best = None
+    widest_fit = None
+    for setting in settings:
+        fit = None
+        for width in widths:
+            file_size = encode(input_path, temp_output_path, width, setting)
+            candidate = {'width': width, 'height': scaled_height(source_size, width),
+                         'setting': setting, 'bytes': file_size}
+            candidates.append(candidate)
+            if file_size > target_size:
+                candidate['status'] = 'over budget'
+                log(f"    {width:3d}px @ {setting:<3} -> {file_size / 1024:6.2f} KB ✗ (over budget)")
+                continue
+            fit = candidate
+            break
+        if fit is None:
+            continue
+
+        if widest_fit is not None and fit['width'] <= widest_fit:
+            # Same width as a better setting, with more quantization
+            fit['status'] = 'dominated'
+            log(f"    {fit['width']:3d}px @ {setting:<3} -> {fit['bytes'] / 1024:6.2f} KB - (no wider than a better setting)")
+            continue
+        widest_fit = fit['width']
+
+        if reference is None:
+            fit['status'] = 'chosen'
+            log(f"    {fit['width']:3d}px @ {setting:<3} -> {fit['bytes'] / 1024:6.2f} KB ✓")
+            return fit, candidates
+
+        pixels = load_gray(temp_output_path, reference_size)
+        fit['psnr'] = round(psnr(reference, pixels), 2)
+        if best is not None and fit['psnr'] < best['psnr'] - PSNR_PRUNE_DB:
+            fit['status'] = 'pruned'
+            log(f"    {fit['width']:3d}px @ {setting:<3} -> {fit['bytes'] / 1024:6.2f} KB, "
+                f"PSNR {fit['psnr']:5.2f} dB ✗ (pruned)")
+        else:
+            fit['ssim'] = round(ssim(reference, pixels), 4)
+            fit['status'] = 'scored'
+            log(f"    {fit['width']:3d}px @ {setting:<3} -> {fit['bytes'] / 1024:6.2f} KB, "
+                f"PSNR {fit['psnr']:5.2f} dB, SSIM {fit['ssim']:.4f}")
+            if best is None or fit['ssim'] > best['ssim']:
+                best = fit
+
+        if fit['width'] == widths[0]:
+            break  # Nothing wider left to trade quality for
+
+    if best is not None:
+        best['status'] = 'chosen'
+    return best, candidates
+
+
+def load_report(report_file=REPORT_FILE):
+    """Build report dictionary ({'formats': {...}} if there is none yet)"""
+    try:
+        with open(report_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'formats': {}}
+
+
+def write_report(image_format, posters, target_size, report_file=REPORT_FILE):
+    """Record one format's results in the build report, keeping the other formats
+
+    Args:
+        image_format: 'png' or 'webp'
+        posters: Source file name -> {'chosen': candidate, 'candidates': [...]}
+        target_size: Size budget in bytes
+        report_file: Report path
+
+    Returns:
+        Report path
+    """
+    report = load_report(report_file)
+    report.setdefault('formats', {})[image_format] = {
+        'generated_on': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+        'target_max_size': target_size,
+        'metric': 'ssim' if np is not None else None,
+        'posters': posters,
+    }
+    report_file = Path(report_file)
+    report_file.parent.mkdir(parents=True, exist_ok=True)
+    temp_file = report_file.with_name(report_file.name + '.tmp')
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
+    os.replace(temp_file, report_file)
+    return report_file
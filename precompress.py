@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Minified JSON with precompressed gzip and brotli sidecars
+
+Published JSON is written minified, and next to each file a .gz (gzip level
+9) and a .br (brotli quality 11) copy are written once per generation run,
+so servers that support precompressed files (serve_quotes.py, nginx
+gzip_static/brotli_static, Cloudflare, ...) never compress per request.
+
+Sidecars are deterministic (no gzip timestamp), so unchanged content gives
+byte-identical files and no spurious commits. Files under MIN_SIDECAR_SIZE
+get no sidecars (compression saves a few bytes at best there, and every
+sidecar is one more file to commit and deploy). Brotli needs the optional
+brotli package (pip install brotli); without it only .gz is written and any
+stale .br is removed.
+
+Usage:
+    python3 precompress.py quotes.json api/*.json   # Write sidecars for existing files
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # Optional: only the .gz sidecar is written without it
+    brotli = None
+
+
+# Content-Encoding -> sidecar suffix, in order of preference
+SIDECARS = {
+    'br': '.br',
+    'gzip': '.gz',
+}
+
+# Smaller files are served as-is
+MIN_SIDECAR_SIZE = 256
+
+
+def compress(data, encoding):
+    """Compress bytes at maximum level for a Content-Encoding"""
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if encoding == 'br':
+        return brotli.compress(data, quality=11)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def available_encodings():
+    """Encodings that can be produced with the installed packages"""
+    return [encoding for encoding in SIDECARS if encoding != 'br' or brotli is not None]
+
+
+def sidecar_path(path, encoding):
+    """Path of a file's precompressed copy"""
+    path = Path(path)
+    return path.with_name(path.name + SIDECARS[encoding])
+
+
+def _write_atomic(path, data):
+    temp_file = path.with_name(path.name + '.tmp')
+    with open(temp_file, 'wb') as f:
+        f.write(data)
+    os.replace(temp_file, path)
+
+
+def sidecars_current(path, data):
+    """Whether a file's sidecars already hold exactly data
+
+    Decompressing the .gz copy is far cheaper than recompressing (brotli at
+    quality 11 is slow on a large catalog).
+    """
+    if len(data) < MIN_SIDECAR_SIZE:
+        return not any(sidecar_path(path, encoding).exists() for encoding in SIDECARS)
+    gz_file = sidecar_path(path, 'gzip')
+    if not gz_file.exists():
+        return False
+    if brotli is not None and not sidecar_path(path, 'br').exists():
+        return False
+    try:
+        return gzip.decompress(gz_file.read_bytes()) == data
+    except (OSError, EOFError):
+        return False
+
+
+def write_sidecars(path, data=None, skip_unchanged=False):
+    """Write precompressed copies of a file
+
+    Args:
+        path: Published file
+        data: Bytes to compress (default: the file's contents)
+        skip_unchanged: Keep existing sidecars that already hold data
+
+    Returns:
+        Total bytes written
+    """
+    path = Path(path)
+    if data is None:
+        data = path.read_bytes()
+    if skip_unchanged and sidecars_current(path, data):
+        return 0
+
+    written = 0
+    encodings = available_encodings() if len(data) >= MIN_SIDECAR_SIZE else []
+    for encoding in SIDECARS:
+        target = sidecar_path(path, encoding)
+        if encoding not in encodings:
+            # An old sidecar would no longer match the file
+            if target.exists():
+                target.unlink()
+            continue
+        compressed = compress(data, encoding)
+        _write_atomic(target, compressed)
+        written += len(compressed)
+    return written
+
+
+def minify_json(obj):
+    """Compact UTF-8 JSON bytes"""
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def write_json(path, obj, skip_unchanged=False):
+    """Write minified JSON plus its compressed sidecars
+
+    Args:
+        path: Output file
+        obj: JSON-serializable object
+        skip_unchanged: Leave the file and its sidecars alone if they already hold obj
+
+    Returns:
+        Total bytes written (JSON + sidecars)
+    """
+    path = Path(path)
+    data = minify_json(obj)
+    if skip_unchanged and path.exists() and path.read_bytes() == data and sidecars_current(path, data):
+        return 0
+    _write_atomic(path, data)
+    return len(data) + write_sidecars(path, data)
+
+
+def remove_stale(directory, keep):
+    """Delete JSON files (and their sidecars) under a directory that are no longer published
+
+    Args:
+        directory: Published directory
+        keep: Paths relative to directory that are still published
+
+    Returns:
+        Number of files removed
+    """
+    directory = Path(directory)
+    removed = 0
+    for path in sorted(directory.rglob('*.json')):
+        if path.relative_to(directory).as_posix() in keep:
+            continue
+        for stale in [path] + [sidecar_path(path, encoding) for encoding in SIDECARS]:
+            if stale.exists():
+                stale.unlink()
+        removed += 1
+    return removed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write gzip/brotli sidecars for published files')
+    parser.add_argument('files', nargs='+', type=Path, help='Files to precompress')
+    args = parser.parse_args(argv)
+
+    if brotli is None:
+        print("⚠️  brotli not installed (pip install brotli), writing .gz sidecars only")
+
+    for path in args.files:
+        if not path.exists():
+            print(f"❌ File not found: {path}")
+            return 1
+        data = path.read_bytes()
+        if path.suffix == '.json':
+            # Sidecars carry the minified document
+            data = minify_json(json.loads(data))
+        if not write_sidecars(path, data):
+            print(f"✓ {path} ({path.stat().st_size} bytes, too small for sidecars)")
+            continue
+        sizes = ', '.join(
+            f"{encoding}: {sidecar_path(path, encoding).stat().st_size / 1024:.1f} KB"
+            for encoding in available_encodings()
+        )
+        print(f"✓ {path} ({path.stat().st_size / 1024:.1f} KB → {sizes})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Shared --profile option for the command line scripts
+
+Wraps a script's main() in cProfile and/or tracemalloc without changing the
+script's own arguments. Profile options are stripped from sys.argv before
+main() runs.
+
+Options:
+    --profile                   Profile the run (CPU time unless --profile-mode says otherwise)
+    --profile-mode MODE         cpu (default), memory or all; implies --profile
+    --profile-dir DIR           Where to write .prof / .tracemalloc files (default: profiles/)
+    --profile-top N             Number of hot functions/allocators to print (default: 20)
+
+Output:
+    profiles/<script>-<timestamp>.prof        cProfile stats (open with pstats or snakeviz)
+    profiles/<script>-<timestamp>.tracemalloc tracemalloc snapshot (tracemalloc.Snapshot.load)
+
+Time spent waiting on subprocesses (e.g. cwebp) shows up under
+subprocess.run/communicate in the CPU profile; the CPU time those children
+used is reported separately.
+
+Usage:
+    import profiling
+
+    if __name__ == "__main__":
+        profiling.run_main(main)
+"""
+
+import argparse
+import cProfile
+import io
+import pstats
+import resource
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+
+DEFAULT_PROFILE_DIR = Path(__file__).parent / 'profiles'
+DEFAULT_TOP = 20
+TRACEMALLOC_FRAMES = 10
+
+
+def parse_profile_args(argv):
+    """Split profile options from a script's own arguments
+
+    Args:
+        argv: Argument list without the program name
+
+    Returns:
+        Tuple of (profile options namespace, remaining arguments)
+    """
+    # --profile takes no value, so it never swallows a script's positional
+    # argument (generate_random_quote.py --profile wisdom)
+    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    parser.add_argument('--profile', action='store_true')
+    parser.add_argument('--profile-mode', choices=['cpu', 'memory', 'all'])
+    parser.add_argument('--profile-dir', type=Path, default=DEFAULT_PROFILE_DIR)
+    parser.add_argument('--profile-top', type=int, default=DEFAULT_TOP)
+    options, remaining = parser.parse_known_args(argv)
+    if options.profile_mode:
+        options.profile = True
+    else:
+        options.profile_mode = 'cpu'
+    return options, remaining
+
+
+def print_cpu_report(profiler, top, children_cpu):
+    """Print the top-N functions by cumulative and own time"""
+    for sort_key, title in (('cumulative', 'cumulative time'), ('tottime', 'own time')):
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stream)
+        stats.strip_dirs().sort_stats(sort_key).print_stats(top)
+        print(f"\n🔥 Top {top} functions by {title}:")
+        print(stream.getvalue().strip())
+
+    if children_cpu > 0:
+        print(f"\n🧵 Subprocess CPU time (e.g. cwebp): {children_cpu:.3f}s")
+
+
+def print_memory_report(snapshot, top):
+    """Print the top-N allocation sites still alive at the end of the run"""
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, cProfile.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    ])
+    print(f"\n🧠 Top {top} allocators:")
+    for index, stat in enumerate(snapshot.statistics('lineno')[:top], 1):
+        frame = stat.traceback[0]
+        print(f"  {index:2d}. {frame.filename}:{frame.lineno}: {stat.size / 1024:.1f} KB in {stat.count} blocks")
+
+
+def children_cpu_time():
+    """CPU seconds used by finished child processes"""
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run_main(main, argv=None):
+    """Run main(), profiling it if --profile was passed
+
+    Args:
+        main: The script's zero-argument entry point (reads sys.argv itself)
+        argv: Full argument list including program name (default: sys.argv)
+    """
+    argv = list(sys.argv if argv is None else argv)
+    options, remaining = parse_profile_args(argv[1:])
+    sys.argv = [argv[0]] + remaining
+
+    if not options.profile:
+        return main()
+
+    script = Path(argv[0]).stem or 'script'
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    options.profile_dir.mkdir(parents=True, exist_ok=True)
+    base = options.profile_dir / f"{script}-{stamp}"
+
+    profile_cpu = options.profile_mode in ('cpu', 'all')
+    profile_memory = options.profile_mode in ('memory', 'all')
+
+    profiler = cProfile.Profile() if profile_cpu else None
+    if profile_memory:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    children_before = children_cpu_time()
+    start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+
+    try:
+        return main()
+    finally:
+        if profiler:
+            profiler.disable()
+        elapsed = time.perf_counter() - start
+        children_cpu = children_cpu_time() - children_before
+
+        # Snapshot before reporting so pstats' own allocations are not counted
+        if profile_memory:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        print(f"\n⏱️  {script} ran in {elapsed:.3f}s")
+
+        if profiler:
+            profiler.dump_stats(f"{base}.prof")
+            print_cpu_report(profiler, options.profile_top, children_cpu)
+            print(f"\n📄 CPU profile written to {base}.prof")
+
+        if profile_memory:
+            snapshot.dump(f"{base}.tracemalloc")
+            print_memory_report(snapshot, options.profile_top)
+            print(f"\n📄 Peak traced memory: {peak / 1024:.1f} KB")
+            print(f"📄 Memory snapshot written to {base}.tracemalloc")
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Helpers shared by the static index publishers
+
+search_index.py and catalog_pages.py both publish a directory of JSON files
+with a manifest.json that records the digest of the catalog it was built
+from, so a run can skip the rebuild when the catalog did not change, and both
+name files after catalog values (authors, movies, themes).
+"""
+
+import hashlib
+import json
+import re
+import unicodedata
+from pathlib import Path
+
+
+def strip_marks(text):
+    """NFKD form of a text without combining marks (Unicode category M)
+
+    index.html does the same with text.normalize('NFKD').replace(/\\p{M}/gu, '').
+    """
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in text if not unicodedata.category(c).startswith('M'))
+
+
+def tokenize_key(value):
+    """Lowercase ASCII form of a value (accents removed)"""
+    return strip_marks(value).lower()
+
+
+def slugify(value):
+    """File-name-safe form of a catalog value"""
+    return re.sub(r'[^a-z0-9]+', '-', tokenize_key(value)).strip('-') or 'value'
+
+
+def catalog_digest(path):
+    """SHA-256 of a catalog file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_manifest(directory):
+    """Published manifest.json of a directory, or None if there is none"""
+    try:
+        with open(Path(directory) / 'manifest.json', 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Immutable quote records
+
+Catalog quotes are loaded once and may be shared between calls, themes and
+threads, so they are read-only NamedTuples (no per-record __dict__).
+Anything written to an endpoint is built as a new dictionary with
+to_payload(), never by changing the record.
+
+Usage:
+    from quote_record import Quote
+
+    quote = Quote.from_dict({'id': 1, 'text': '...', 'author': 'Po', ...})
+    payload = quote.to_payload(updated_on='2025-01-01T00:00:00Z')
+"""
+
+from typing import NamedTuple, Optional
+
+
+class Quote(NamedTuple):
+    """One catalog quote"""
+
+    id: Optional[int]
+    text: str
+    author: str
+    movie: str
+    theme: str
+    error: Optional[str] = None  # Set only on the placeholder used when the catalog is missing
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a record from a quotes.json entry (unknown fields are ignored)"""
+        return cls(
+            id=data.get('id'),
+            text=data.get('text', ''),
+            author=data.get('author', ''),
+            movie=data.get('movie', ''),
+            theme=data.get('theme', ''),
+            error=data.get('error'),
+        )
+
+    def to_dict(self):
+        """quotes.json representation"""
+        data = {'text': self.text, 'author': self.author, 'movie': self.movie, 'theme': self.theme}
+        if self.id is not None:
+            data = {'id': self.id, **data}
+        if self.error is not None:
+            data['error'] = self.error
+        return data
+
+    def to_payload(self, **fields):
+        """New endpoint dictionary: the quote's fields plus the given ones"""
+        return {**self.to_dict(), **fields}
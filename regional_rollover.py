@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Per-region quote endpoints that roll over at local midnight
+
+The daily workflow regenerates api/random-quote-<theme>.json at 06:00 UTC,
+which is mid-afternoon in Asia-Pacific. This keeps one endpoint set per
+region, each rolling over when the region's own day starts:
+
+    api/<region>/random-quote-<theme>.json (+ .gz/.br sidecars)
+
+Run it every hour. Each run computes the local date of every region and
+generates only the regions whose date changed since their last run; the
+rest are skipped without loading anything but the small state file. Each
+region keeps its own rotation history, and its endpoints carry the region,
+time zone and local date next to the usual UTC updated_on.
+
+Config (regions.json):
+
+    {
+      "regions": [
+        {"name": "asia-pacific", "timezone": "Asia/Tokyo"},
+        {"name": "americas", "timezone": "America/New_York", "days_before_reuse": 14}
+      ]
+    }
+
+State:
+    .regional/state.json                    Local date each region was last generated for
+    .regional/<region>.quote-history.json   Region's rotation history
+
+Usage:
+    python3 regional_rollover.py                         # Generate regions whose day started
+    python3 regional_rollover.py --dry-run               # Show due regions and next rollovers
+    python3 regional_rollover.py --force asia-pacific    # Regenerate a region now
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import generate_random_quote as gq
+import instrumentation
+import profiling
+
+
+REGIONS_FILE = Path(__file__).parent / 'regions.json'
+STATE_DIR = Path(__file__).parent / '.regional'
+
+REGION_NAME = re.compile(r'^[a-z0-9][a-z0-9-]*$')
+# Directories under api/ that belong to other publishers
+RESERVED_NAMES = {'search', 'catalog'}
+
+
+def load_regions(config_file=REGIONS_FILE):
+    """Load and validate the regions config
+
+    Raises:
+        ValueError: If the config is malformed or names an unknown time zone
+    """
+    with open(config_file, 'r', encoding='utf-8') as f:
+        regions = json.load(f).get('regions')
+    if not isinstance(regions, list) or not regions:
+        raise ValueError(f"{config_file}: 'regions' must be a non-empty list")
+
+    names = set()
+    for region in regions:
+        name = region.get('name')
+        if not isinstance(name, str) or not REGION_NAME.match(name) or name in RESERVED_NAMES:
+            raise ValueError(f"{config_file}: invalid region name {name!r} "
+                             f"(lowercase letters, digits and '-'; not {', '.join(sorted(RESERVED_NAMES))})")
+        if name in names:
+            raise ValueError(f"{config_file}: duplicate region name '{name}'")
+        names.add(name)
+        try:
+            ZoneInfo(region.get('timezone') or '')
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"{config_file}: region '{name}' has unknown timezone {region.get('timezone')!r}")
+        days = region.get('days_before_reuse', gq.DAYS_BEFORE_REUSE)
+        if not isinstance(days, int) or days < 0:
+            raise ValueError(f"{config_file}: region '{name}' days_before_reuse must be a non-negative integer")
+    return regions
+
+
+def load_state(state_dir=STATE_DIR):
+    """Region name -> state of its last run ({} if never run)"""
+    try:
+        with open(Path(state_dir) / 'state.json', 'r', encoding='utf-8') as f:
+            return json.load(f).get('regions', {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state, state_dir=STATE_DIR):
+    """Write the state file atomically"""
+    state_file = Path(state_dir) / 'state.json'
+    state_file.parent.mkdir(parents=True, exist_ok=True)
+    temp_file = state_file.with_name(state_file.name + '.tmp')
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump({'regions': state}, f, indent=2, sort_keys=True)
+    os.replace(temp_file, state_file)
+
+
+def local_date(timezone_name, now):
+    """ISO date in a time zone at an aware UTC datetime"""
+    return now.astimezone(ZoneInfo(timezone_name)).date().isoformat()
+
+
+def next_rollover(timezone_name, now):
+    """UTC datetime of the next local midnight in a time zone"""
+    zone = ZoneInfo(timezone_name)
+    tomorrow = now.astimezone(zone).date() + timedelta(days=1)
+    midnight = datetime(tomorrow.year, tomorrow.month, tomorrow.day, tzinfo=zone)
+    return midnight.astimezone(timezone.utc)
+
+
+def due_regions(regions, state, now):
+    """Regions whose local date differs from the date they were last generated for"""
+    return [r for r in regions if state.get(r['name'], {}).get('local_date') != local_date(r['timezone'], now)]
+
+
+def generate_region(region, now, output_root=None, state_dir=STATE_DIR):
+    """Write every endpoint of one region
+
+    Args:
+        region: Region config entry
+        now: Aware datetime of this run
+        output_root: Directory api/<region>/ is written under (default: gq.OUTPUT_ROOT)
+        state_dir: Directory for the region's history
+
+    Returns:
+        List of generated themes
+    """
+    name, zone = region['name'], region['timezone']
+    themes = ['all'] + sorted(gq.theme_index(gq.load_quotes()))
+    fields = {'region': name, 'timezone': zone, 'local_date': local_date(zone, now)}
+    options = {
+        'history_file': Path(state_dir) / f'{name}.quote-history.json',
+        'days_before_reuse': region.get('days_before_reuse', gq.DAYS_BEFORE_REUSE),
+    }
+
+    Path(state_dir).mkdir(parents=True, exist_ok=True)
+    with instrumentation.labels(region=name):
+        for theme in themes:
+            gq.save_random_quote(theme=theme, output_file=f'api/{name}/random-quote-{theme}.json',
+                                 output_root=output_root, verbose=False, fields=fields, **options)
+    return themes
+
+
+def run(regions, now=None, output_root=None, state_dir=STATE_DIR, force=()):
+    """Generate the regions whose day started since their last run
+
+    Args:
+        regions: Validated region entries (see load_regions())
+        now: Aware datetime of this run (default: current time)
+        output_root: Output directory (default: gq.OUTPUT_ROOT)
+        state_dir: State directory
+        force: Region names to generate even if not due
+
+    Returns:
+        Tuple of (generated region names, skipped region names)
+    """
+    now = now or datetime.now(timezone.utc)
+    state = load_state(state_dir)
+    due = {r['name'] for r in due_regions(regions, state, now)} | set(force)
+
+    generated, skipped = [], []
+    for region in regions:
+        name = region['name']
+        if name not in due:
+            skipped.append(name)
+            continue
+        generate_region(region, now, output_root, state_dir)
+        state[name] = {
+            'timezone': region['timezone'],
+            'local_date': local_date(region['timezone'], now),
+            'generated_at': now.astimezone(timezone.utc).isoformat().replace('+00:00', 'Z'),
+        }
+        # Saved per region, so a failure later in the run does not redo this one
+        save_state(state, state_dir)
+        generated.append(name)
+    return generated, skipped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate per-region endpoints that roll over at local midnight')
+    parser.add_argument('--config', type=Path, default=REGIONS_FILE, help='Regions config (default: regions.json)')
+    parser.add_argument('--force', action='append', default=[], help='Regenerate this region now (repeatable)')
+    parser.add_argument('--now', help='Treat this ISO 8601 time as the current time')
+    parser.add_argument('--dry-run', action='store_true', help='Only show which regions are due')
+    parser.add_argument('--metrics-dir', default=os.environ.get('QUOTE_METRICS_DIR'),
+                        help='Record stage timings and pool metrics, labeled by region, in this directory')
+    args = parser.parse_args(argv)
+
+    if not args.config.exists():
+        print(f"❌ Config not found: {args.config}")
+        return 1
+    try:
+        regions = load_regions(args.config)
+        now = datetime.fromisoformat(args.now.replace('Z', '+00:00')) if args.now else datetime.now(timezone.utc)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    if now.tzinfo is None:
+        now = now.replace(tzinfo=timezone.utc)
+    unknown = set(args.force) - {r['name'] for r in regions}
+    if unknown:
+        print(f"❌ Unknown regions: {', '.join(sorted(unknown))}")
+        return 1
+
+    if args.dry_run:
+        due = {r['name'] for r in due_regions(regions, load_state(), now)} | set(args.force)
+        for region in regions:
+            rollover = next_rollover(region['timezone'], now).strftime('%Y-%m-%d %H:%M UTC')
+            status = 'due' if region['name'] in due else 'current'
+            print(f"{'🕛' if status == 'due' else '✓'} {region['name']:<16} {region['timezone']:<22} "
+                  f"{local_date(region['timezone'], now)}  {status:<8} next rollover {rollover}")
+        return 0
+
+    if args.metrics_dir:
+        instrumentation.enable()
+
+    generated, skipped = run(regions, now, force=args.force)
+    timezones = {r['name']: r['timezone'] for r in regions}
+    for name in generated:
+        print(f"✓ {name}: rolled over to {local_date(timezones[name], now)}")
+    print(f"\n✅ Generated {len(generated)} regions, {len(skipped)} still current")
+
+    if args.metrics_dir:
+        jsonl_path, prom_path = instrumentation.export(args.metrics_dir)
+        print(f"\n📈 Metrics written to {jsonl_path} and {prom_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(profiling.run_main(main))
@@ -1,13 +1,17 @@
 #!/usr/bin/env python3
 """
 Resize poster images to be under 15KB while maintaining aspect ratio.
-This script iteratively finds the optimal size for each image.
+This script searches widths and palette sizes for the best-looking image
+under the budget (see poster_quality.py).
 """
 
 import os
 from PIL import Image
 import sys
 
+import poster_quality
+import profiling
+
 # Configuration
 SOURCE_DIR = "assets/posters-small-bw-outline"
 TARGET_MAX_SIZE = 15 * 1024  # 15KB in bytes
@@ -16,15 +20,19 @@ OUTPUT_SUFFIX = "-optimized"
 # Test widths to try (in descending order)
 TEST_WIDTHS = [200, 180, 160, 140, 120, 100, 90, 80, 70, 60, 50]
 
+# Palette sizes to try (best quality first); fewer colors buy more width
+PALETTE_COLORS = [256, 64, 16, 4]
+
 
 def get_file_size(filepath):
     """Get file size in bytes."""
     return os.path.getsize(filepath)
 
 
-def resize_image(input_path, output_path, target_width):
+def resize_image(input_path, output_path, target_width, colors=256):
     """
-    Resize image to target width while maintaining aspect ratio.
+    Resize image to target width while maintaining aspect ratio,
+    quantized to a palette of the given number of colors.
     Returns the output file size in bytes.
     """
     with Image.open(input_path) as img:
@@ -38,7 +46,7 @@ def resize_image(input_path, output_path, target_width):
         # Convert to grayscale or palette mode for better compression
         # Since these are BW outline images, use palette mode
         if resized.mode != 'P':
-            resized = resized.convert('P', palette=Image.ADAPTIVE, colors=256)
+            resized = resized.convert('P', palette=Image.ADAPTIVE, colors=colors)
         
         # Save with maximum PNG compression
         resized.save(output_path, 'PNG', optimize=True, compress_level=9)
@@ -48,31 +56,12 @@ def resize_image(input_path, output_path, target_width):
 
 def find_optimal_width(input_path, temp_output_path, target_size):
     """
-    Find the largest width that results in file size under target_size.
-    Returns optimal width and resulting file size.
+    Find the best-looking width and palette size with a file size under target_size.
+    Returns the chosen candidate (None if nothing fits) and every candidate tried.
     """
-    best_width = None
-    best_size = float('inf')
-    
-    print(f"\n  Testing widths for {os.path.basename(input_path)}:")
-    
-    for width in TEST_WIDTHS:
-        file_size = resize_image(input_path, temp_output_path, width)
-        size_kb = file_size / 1024
-        
-        print(f"    Width {width:3d}px -> {size_kb:6.2f} KB", end="")
-        
-        if file_size <= target_size:
-            print(" ✓ (under 15KB)")
-            if best_width is None or width > best_width:
-                best_width = width
-                best_size = file_size
-                # Found the optimal (we test in descending order, so first match is best)
-                break
-        else:
-            print(" ✗ (too large)")
-    
-    return best_width, best_size
+    print(f"\n  Testing widths and palettes for {os.path.basename(input_path)}:")
+    return poster_quality.search(input_path, temp_output_path, target_size,
+                                 resize_image, TEST_WIDTHS, PALETTE_COLORS)
 
 
 def process_images():
@@ -89,6 +78,7 @@ def process_images():
     print("=" * 60)
     
     results = []
+    report = {}
     
     for filename in sorted(png_files):
         input_path = os.path.join(SOURCE_DIR, filename)
@@ -104,13 +94,15 @@ def process_images():
         print(f"\n📸 {filename}")
         print(f"   Original: {original_size_kb:.2f} KB")
         
-        # Find optimal width
-        optimal_width, final_size = find_optimal_width(input_path, temp_output, TARGET_MAX_SIZE)
+        # Find the best-looking width and palette
+        chosen, candidates = find_optimal_width(input_path, temp_output, TARGET_MAX_SIZE)
+        report[filename] = {'chosen': chosen, 'candidates': candidates}
         
-        if optimal_width:
-            # Now create the final image at optimal width
-            print(f"\n   Creating final image at {optimal_width}px...")
-            resize_image(input_path, output_path, optimal_width)
+        if chosen:
+            optimal_width, colors = chosen['width'], chosen['setting']
+            # Now create the final image at the chosen width and palette
+            print(f"\n   Creating final image at {optimal_width}px, {colors} colors...")
+            resize_image(input_path, output_path, optimal_width, colors)
             final_size = get_file_size(output_path)
             
             # Clean up temp file
@@ -120,11 +112,13 @@ def process_images():
             final_size_kb = final_size / 1024
             reduction_pct = ((original_size - final_size) / original_size) * 100
             
-            print(f"\n   ✅ Optimized: {optimal_width}px wide -> {final_size_kb:.2f} KB ({reduction_pct:.1f}% reduction)")
+            print(f"\n   ✅ Optimized: {optimal_width}px wide, {colors} colors -> {final_size_kb:.2f} KB ({reduction_pct:.1f}% reduction)")
             
             results.append({
                 'filename': filename,
                 'optimal_width': optimal_width,
+                'colors': colors,
+                'ssim': chosen.get('ssim'),
                 'original_kb': original_size_kb,
                 'final_kb': final_size_kb,
                 'reduction_pct': reduction_pct
@@ -142,7 +136,9 @@ def process_images():
     if results:
         for result in results:
             print(f"\n{result['filename']}")
-            print(f"  Width:     {result['optimal_width']}px")
+            print(f"  Width:     {result['optimal_width']}px ({result['colors']} colors)")
+            if result['ssim'] is not None:
+                print(f"  SSIM:      {result['ssim']:.4f}")
             print(f"  Original:  {result['original_kb']:.2f} KB")
             print(f"  Optimized: {result['final_kb']:.2f} KB")
             print(f"  Saved:     {result['reduction_pct']:.1f}%")
@@ -156,9 +152,12 @@ def process_images():
         print(f"\nOptimized files saved with '{OUTPUT_SUFFIX}' suffix")
     else:
         print("No images were successfully optimized.")
+    
+    report_file = poster_quality.write_report('png', report, TARGET_MAX_SIZE)
+    print(f"📄 Build report: {report_file}")
 
 
-if __name__ == "__main__":
+def main():
     try:
         process_images()
     except KeyboardInterrupt:
@@ -167,3 +166,7 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"\n❌ Error: {e}")
         sys.exit(1)
+
+
+if __name__ == "__main__":
+    profiling.run_main(main)
@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 """
 Resize poster images to WebP format to be under 15KB while maintaining aspect ratio.
-This script uses cwebp for WebP conversion to achieve better compression than PNG.
+This script uses cwebp for WebP conversion to achieve better compression than PNG,
+and searches widths and quality settings for the best-looking image under the
+budget (see poster_quality.py).
 """
 
 import os
@@ -9,6 +11,9 @@ import subprocess
 from PIL import Image
 import sys
 
+import poster_quality
+import profiling
+
 # Configuration
 SOURCE_DIR = "assets/posters-small-bw-outline"
 TARGET_MAX_SIZE = 15 * 1024  # 15KB in bytes
@@ -17,6 +22,9 @@ OUTPUT_SUFFIX = "-webp"
 # Test widths to try (in descending order) - starting higher since WebP compresses better
 TEST_WIDTHS = [300, 280, 260, 240, 220, 200, 180, 160, 140, 120, 100, 90, 80, 70, 60, 50]
 
+# cwebp quality settings to try (best quality first); lower quality buys more width
+WEBP_QUALITIES = [80, 65, 50, 35]
+
 
 def get_file_size(filepath):
     """Get file size in bytes."""
@@ -73,31 +81,12 @@ def resize_and_convert_to_webp(input_path, output_path, target_width, quality=80
 
 def find_optimal_width(input_path, temp_output_path, target_size):
     """
-    Find the largest width that results in file size under target_size.
-    Returns optimal width and resulting file size.
+    Find the best-looking width and quality with a file size under target_size.
+    Returns the chosen candidate (None if nothing fits) and every candidate tried.
     """
-    best_width = None
-    best_size = float('inf')
-    
-    print(f"\n  Testing widths for {os.path.basename(input_path)}:")
-    
-    for width in TEST_WIDTHS:
-        file_size = resize_and_convert_to_webp(input_path, temp_output_path, width)
-        size_kb = file_size / 1024
-        
-        print(f"    Width {width:3d}px -> {size_kb:6.2f} KB", end="")
-        
-        if file_size <= target_size:
-            print(" ✓ (under 15KB)")
-            if best_width is None or width > best_width:
-                best_width = width
-                best_size = file_size
-                # Found the optimal (we test in descending order, so first match is best)
-                break
-        else:
-            print(" ✗ (too large)")
-    
-    return best_width, best_size
+    print(f"\n  Testing widths and qualities for {os.path.basename(input_path)}:")
+    return poster_quality.search(input_path, temp_output_path, target_size,
+                                 resize_and_convert_to_webp, TEST_WIDTHS, WEBP_QUALITIES)
 
 
 def process_images():
@@ -115,6 +104,7 @@ def process_images():
     print("=" * 60)
     
     results = []
+    report = {}
     
     for filename in sorted(png_files):
         input_path = os.path.join(SOURCE_DIR, filename)
@@ -133,13 +123,15 @@ def process_images():
         print(f"\n📸 {filename}")
         print(f"   Original: {original_size_kb:.2f} KB ({original_dims})")
         
-        # Find optimal width
-        optimal_width, final_size = find_optimal_width(input_path, temp_output, TARGET_MAX_SIZE)
+        # Find the best-looking width and quality
+        chosen, candidates = find_optimal_width(input_path, temp_output, TARGET_MAX_SIZE)
+        report[filename] = {'chosen': chosen, 'candidates': candidates}
         
-        if optimal_width:
-            # Now create the final image at optimal width
-            print(f"\n   Creating final WebP at {optimal_width}px...")
-            resize_and_convert_to_webp(input_path, output_path, optimal_width)
+        if chosen:
+            optimal_width, quality = chosen['width'], chosen['setting']
+            # Now create the final image at the chosen width and quality
+            print(f"\n   Creating final WebP at {optimal_width}px, quality {quality}...")
+            resize_and_convert_to_webp(input_path, output_path, optimal_width, quality)
             final_size = get_file_size(output_path)
             
             # Clean up temp file
@@ -160,6 +152,8 @@ def process_images():
                 'filename': filename,
                 'optimal_width': optimal_width,
                 'optimal_height': final_height,
+                'quality': quality,
+                'ssim': chosen.get('ssim'),
                 'original_kb': original_size_kb,
                 'final_kb': final_size_kb,
                 'reduction_pct': reduction_pct
@@ -177,7 +171,9 @@ def process_images():
     if results:
         for result in results:
             print(f"\n{result['filename']}")
-            print(f"  Dimensions: {result['optimal_width']}x{result['optimal_height']}px")
+            print(f"  Dimensions: {result['optimal_width']}x{result['optimal_height']}px (quality {result['quality']})")
+            if result['ssim'] is not None:
+                print(f"  SSIM:       {result['ssim']:.4f}")
             print(f"  Original:   {result['original_kb']:.2f} KB")
             print(f"  Optimized:  {result['final_kb']:.2f} KB")
             print(f"  Saved:      {result['reduction_pct']:.1f}%")
@@ -189,17 +185,15 @@ def process_images():
         print(f"Average optimal width: {avg_width:.0f}px")
         print(f"Average size reduction: {avg_reduction:.1f}%")
         print(f"\nWebP files saved with '{OUTPUT_SUFFIX}' suffix")
-        
-        # Compare with PNG version
-        print("\n💡 Comparison with PNG optimization:")
-        print(f"   PNG optimal width: 100px")
-        print(f"   WebP optimal width: {avg_width:.0f}px")
-        print(f"   WebP improvement: {(avg_width / 100 - 1) * 100:.0f}% larger images!")
     else:
         print("No images were successfully optimized.")
+    
+    report_file = poster_quality.write_report('webp', report, TARGET_MAX_SIZE)
+    print(f"📄 Build report: {report_file}")
+    print("💡 Compare with PNG: python3 compare_formats.py")
 
 
-if __name__ == "__main__":
+def main():
     # Check if cwebp is available
     try:
         result = subprocess.run(['which', 'cwebp'], capture_output=True, text=True)
@@ -220,3 +214,7 @@ if __name__ == "__main__":
         import traceback
         traceback.print_exc()
         sys.exit(1)
+
+
+if __name__ == "__main__":
+    profiling.run_main(main)
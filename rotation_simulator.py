@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Long-horizon simulation of the daily quote rotation
+
+Replays the selection policy of generate_random_quote() over years of
+simulated days for thousands of independent seeds at once, without calling
+the real function (whose file I/O makes long replays take hours). Every
+simulated day runs the 'all' endpoint and then each theme, sharing one
+history, exactly like generate_all_theme_files():
+
+    - quotes picked within the reuse window are unavailable
+    - an exhausted pool resets the whole history
+    - picks are uniform, or weighted like --weights (including the recent
+      author decay, and the uniform fallback when every weight is 0)
+
+All seeds advance together as NumPy arrays, so one simulated day costs a
+handful of vectorized operations per endpoint. Runs are treated as
+happening at the same instant each day, so a quote picked exactly
+`window` days ago is available again.
+
+Reported per endpoint and window: resets per year, repeat gaps (minimum,
+5th percentile, median), the share of repeats inside the window (only
+possible after a reset) and the spread of per-quote exposure. For each
+endpoint the largest window with at most --max-resets resets per year is
+recommended.
+
+Requires numpy (pip install numpy).
+
+Usage:
+    python3 rotation_simulator.py                               # 5 years, 1000 seeds, common windows
+    python3 rotation_simulator.py --days 3650 --seeds 5000 --windows 7,14,21,30
+    python3 rotation_simulator.py --weights weights.json --output simulation.json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # Reported by main(); the rest of the repo does not need numpy
+    np = None
+
+import generate_random_quote as gq
+import weighted_selection
+
+
+DEFAULT_DAYS = 5 * 365
+DEFAULT_SEEDS = 1000
+DEFAULT_WINDOWS = [7, 14, 21, 30, 45, 60]
+DEFAULT_MAX_RESETS = 1.0  # per year
+
+NEVER = -(1 << 40)  # "day" of a quote that was never shown / not in the history
+
+
+def build_endpoints(quotes):
+    """Endpoint name -> array of quote positions, in daily run order"""
+    themes = sorted({q.theme.lower() for q in quotes if q.theme})
+    endpoints = {'all': np.arange(len(quotes))}
+    for theme in themes:
+        endpoints[theme] = np.array([i for i, q in enumerate(quotes) if q.theme.lower() == theme])
+    return endpoints
+
+
+def _percentile_from_counts(counts, fraction):
+    """Value at a cumulative fraction of a histogram (None if empty)"""
+    total = counts.sum()
+    if total == 0:
+        return None
+    return int(np.searchsorted(np.cumsum(counts), fraction * total))
+
+
+def simulate(quotes, days=DEFAULT_DAYS, seeds=DEFAULT_SEEDS, window=gq.DAYS_BEFORE_REUSE, rules=None, seed=0):
+    """Simulate the daily rotation for many seeds at once
+
+    Args:
+        quotes: Sequence of Quote records
+        days: Simulated days
+        seeds: Independent runs simulated side by side
+        window: Reuse window in days (DAYS_BEFORE_REUSE)
+        rules: Weight rules (see weighted_selection.py), or None for uniform picks
+        seed: Seed for the random generator
+
+    Returns:
+        Dictionary with per-endpoint statistics and per-quote exposure
+    """
+    rng = np.random.default_rng(seed)
+    n = len(quotes)
+    endpoints = build_endpoints(quotes)
+    rows = np.arange(seeds)
+
+    in_history_since = np.full((seeds, n), NEVER, dtype=np.int64)
+    last_shown = np.full((seeds, n), NEVER, dtype=np.int64)
+    shows = {name: np.zeros(n, dtype=np.int64) for name in endpoints}
+    resets = {name: np.zeros(seeds, dtype=np.int64) for name in endpoints}
+    gap_counts = {name: np.zeros(days + 1, dtype=np.int64) for name in endpoints}
+
+    weighted = rules is not None
+    if weighted:
+        base = np.array([weighted_selection.base_weight(q, rules) for q in quotes])
+        with np.errstate(divide='ignore'):
+            log_base = np.log(base)
+        decay = float(rules.get('recent_author_decay', 1.0))
+        authors = sorted({q.author for q in quotes})
+        author_of = np.array([authors.index(q.author) for q in quotes])
+        author_matrix = np.zeros((n, len(authors)))
+        author_matrix[np.arange(n), author_of] = 1.0
+
+    for day in range(days):
+        for name, pool in endpoints.items():
+            available = in_history_since[:, pool] <= day - window
+
+            # Exhausted pool: the whole history is reset
+            exhausted = ~available.any(axis=1)
+            if exhausted.any():
+                in_history_since[exhausted] = NEVER
+                available[exhausted] = True
+                resets[name] += exhausted
+
+            if weighted:
+                keys = log_base[pool] + rng.gumbel(size=available.shape)
+                if decay != 1.0:
+                    in_history = (in_history_since > day - window).astype(np.float64)
+                    recent = in_history @ author_matrix  # appearances per author
+                    with np.errstate(divide='ignore'):
+                        keys = keys + recent[:, author_of[pool]] * np.log(decay)
+                keys = np.where(available, keys, -np.inf)
+                choice = keys.argmax(axis=1)
+
+                # Every available quote has weight 0: uniform pick, like the generator
+                fallback = np.isneginf(keys[rows, choice])
+                if fallback.any():
+                    uniform = np.where(available[fallback], rng.random(available[fallback].shape), -1.0)
+                    choice[fallback] = uniform.argmax(axis=1)
+            else:
+                keys = np.where(available, rng.random(available.shape), -1.0)
+                choice = keys.argmax(axis=1)
+
+            picked = pool[choice]
+            previous = last_shown[rows, picked]
+            repeated = previous != NEVER
+            gap_counts[name] += np.bincount(np.minimum(day - previous[repeated], days), minlength=days + 1)
+            last_shown[rows, picked] = day
+            in_history_since[rows, picked] = day
+            shows[name] += np.bincount(picked, minlength=n)
+
+    years = days / 365
+    total_shows = sum(shows.values())
+    stats = {}
+    for name, pool in endpoints.items():
+        counts = gap_counts[name]
+        repeats = int(counts.sum())
+        exposure = shows[name][pool] / (seeds * years)
+        stats[name] = {
+            'pool_size': int(len(pool)),
+            'resets_per_year': float(resets[name].mean() / years),
+            'repeats': repeats,
+            'gap_min': int(np.flatnonzero(counts)[0]) if repeats else None,
+            'gap_p5': _percentile_from_counts(counts, 0.05),
+            'gap_median': _percentile_from_counts(counts, 0.5),
+            'repeats_within_window': float(counts[:window].sum() / repeats) if repeats else 0.0,
+            'exposure_min': float(exposure.min()),
+            'exposure_max': float(exposure.max()),
+        }
+
+    return {
+        'window': window,
+        'endpoints': stats,
+        'exposure': {
+            str(q.id): float(total_shows[i] / (seeds * years)) for i, q in enumerate(quotes)
+        },
+    }
+
+
+def recommend_windows(results, max_resets=DEFAULT_MAX_RESETS):
+    """Largest simulated window per endpoint with at most max_resets resets per year"""
+    recommended = {}
+    for result in sorted(results, key=lambda r: r['window']):
+        for name, stats in result['endpoints'].items():
+            if stats['resets_per_year'] <= max_resets:
+                recommended[name] = result['window']
+            else:
+                recommended.setdefault(name, None)
+    return recommended
+
+
+def print_result(result):
+    """Print one window's endpoint table"""
+    print(f"\n📅 Window: {result['window']} days")
+    print(f"{'Endpoint':<12} {'Pool':>5} {'Resets/yr':>10} {'Gap min':>8} {'Gap p5':>7} {'Gap p50':>8} "
+          f"{'In window':>10} {'Shows/yr min-max':>18}")
+    for name, s in result['endpoints'].items():
+        gap = lambda v: '-' if v is None else str(v)
+        print(f"{name:<12} {s['pool_size']:>5} {s['resets_per_year']:>10.2f} {gap(s['gap_min']):>8} "
+              f"{gap(s['gap_p5']):>7} {gap(s['gap_median']):>8} {s['repeats_within_window']:>9.1%} "
+              f"{s['exposure_min']:>8.2f}-{s['exposure_max']:<8.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Simulate the daily quote rotation over years and many seeds')
+    parser.add_argument('--catalog', type=Path, help='Quote catalog (default: quotes.json)')
+    parser.add_argument('--days', type=int, default=DEFAULT_DAYS, help=f'Simulated days (default: {DEFAULT_DAYS})')
+    parser.add_argument('--seeds', type=int, default=DEFAULT_SEEDS, help=f'Independent runs (default: {DEFAULT_SEEDS})')
+    parser.add_argument('--windows', default=','.join(map(str, DEFAULT_WINDOWS)),
+                        help='Comma-separated reuse windows in days to compare')
+    parser.add_argument('--weights', type=Path, help='Simulate weighted selection with this weights file')
+    parser.add_argument('--max-resets', type=float, default=DEFAULT_MAX_RESETS,
+                        help=f'Resets per year tolerated when recommending a window (default: {DEFAULT_MAX_RESETS})')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('--output', type=Path, help='Write the full results as JSON')
+    args = parser.parse_args(argv)
+
+    if np is None:
+        print("❌ numpy is required for the simulator: pip install numpy")
+        return 1
+
+    quotes = gq.load_quotes(args.catalog)
+    rules = weighted_selection.load_weight_rules(args.weights) if args.weights else None
+    windows = sorted({int(w) for w in args.windows.split(',') if w.strip()})
+
+    print(f"🎲 Simulating {args.days:,} days x {args.seeds:,} seeds over {len(quotes)} quotes "
+          f"({'weighted' if rules else 'uniform'} selection)")
+    results = []
+    for window in windows:
+        result = simulate(quotes, args.days, args.seeds, window, rules, args.seed)
+        results.append(result)
+        print_result(result)
+
+    recommended = recommend_windows(results, args.max_resets)
+    print(f"\n✅ Largest window with ≤ {args.max_resets:g} resets/year:")
+    for name, window in recommended.items():
+        print(f"   {name:<12} {window if window is not None else 'none of the simulated windows'}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'days': args.days, 'seeds': args.seeds, 'results': results, 'recommended': recommended}, f, indent=2)
+        print(f"\n📄 Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
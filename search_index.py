@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Full-text search over the quote catalog as sharded static files
+
+The generator publishes an inverted index under api/search/ that a static
+page can fetch piece by piece, so searching never downloads quotes.json:
+
+    api/search/manifest.json          Settings, shard list, facet values
+    api/search/terms/<prefix>.json    term -> quote ids, for terms starting with <prefix>
+    api/search/docs/<n>.json          id -> [text, author, movie, theme] for ids n*1000..n*1000+999
+    api/search/facets/<field>/<slug>.json   quote ids for one author, movie or theme
+
+Text is tokenized the same way in Python and in index.html: accents and
+apostrophes removed, lowercased, split on anything but letters and digits,
+tokens shorter than MIN_TOKEN_LENGTH and stopwords dropped. Id lists are
+sorted and delta-encoded ([3, 10, 12] is stored as [3, 7, 2]) to keep
+shards small. A query fetches one term shard per word, intersects the id
+lists and fetches only the doc shards of the page it shows; the last word
+also matches as a prefix, for search-as-you-type.
+
+The index is rebuilt only when the catalog's contents change (the manifest
+records their SHA-256), and shards whose contents did not change are not
+rewritten.
+
+serve_quotes.py answers /api/search?q=...&author=...&movie=...&theme=...
+from the same files with SearchIndex.
+
+Usage:
+    python3 search_index.py build                      # Publish api/search/ for quotes.json
+    python3 search_index.py build --catalog big.qcat --output /tmp/search
+    python3 search_index.py query "dragon warrior" --author Po
+"""
+
+import argparse
+import json
+import re
+import sys
+import threading
+from itertools import accumulate
+from pathlib import Path
+
+import precompress
+from publish_util import catalog_digest, read_manifest, slugify, strip_marks, tokenize_key
+
+
+INDEX_VERSION = 1
+DEFAULT_INDEX_DIR = Path(__file__).parent / 'api' / 'search'
+
+PREFIX_LENGTH = 2  # Term shards hold every term starting with the same characters
+MIN_TOKEN_LENGTH = 2
+DOC_SHARD_SIZE = 1000
+FACETS = ('author', 'movie', 'theme')
+
+STOPWORDS = frozenset('''
+    an and are as at be but by do for from has have he her him his if in is it its me my no not of on or our
+    so than that the their them then there they this to too us was we were what when who will with you your
+'''.split())
+
+# Shard files kept in memory by SearchIndex
+MAX_CACHED_SHARDS = 256
+
+DEFAULT_LIMIT = 20
+
+_WORD = re.compile(r'[a-z0-9]+')
+_APOSTROPHES = re.compile(r"['’]")
+
+
+def tokenize(text):
+    """Index terms of a text (stopwords included)"""
+    text = _APOSTROPHES.sub('', strip_marks(text).lower())
+    return [t for t in _WORD.findall(text) if len(t) >= MIN_TOKEN_LENGTH]
+
+
+def query_terms(query, stopwords):
+    """Terms of a search query without its stopwords
+
+    A last word that is still being typed (nothing follows it) is kept even
+    if it is a stopword, since it is matched as a prefix: "the" may be the
+    start of "theory".
+    """
+    text = _APOSTROPHES.sub('', strip_marks(query).lower())
+    words = _WORD.findall(text)
+    typing = bool(_WORD.search(text[-1:]))
+    return [
+        word for i, word in enumerate(words)
+        if len(word) >= MIN_TOKEN_LENGTH and (word not in stopwords or (typing and i == len(words) - 1))
+    ]
+
+
+def encode_postings(ids):
+    """Delta-encode a sorted list of ids"""
+    return [ids[0]] + [b - a for a, b in zip(ids, ids[1:])] if ids else []
+
+
+def decode_postings(deltas):
+    """Sorted ids from delta-encoded postings"""
+    return list(accumulate(deltas))
+
+
+def build_index(quotes, digest=None):
+    """Build every index file in memory
+
+    Args:
+        quotes: Iterable of Quote records (quotes without an id are skipped)
+        digest: Catalog digest to record in the manifest
+
+    Returns:
+        Dictionary of path relative to the index directory -> JSON object
+    """
+    postings = {}
+    facets = {field: {} for field in FACETS}
+    docs = {}
+    count = 0
+
+    for quote in quotes:
+        if quote.id is None:
+            continue
+        count += 1
+        docs.setdefault(quote.id // DOC_SHARD_SIZE, {})[str(quote.id)] = [
+            quote.text, quote.author, quote.movie, quote.theme]
+        for term in set(tokenize(quote.text)) - STOPWORDS:
+            postings.setdefault(term, []).append(quote.id)
+        for field in FACETS:
+            value = getattr(quote, field)
+            if value:
+                facets[field].setdefault(value, []).append(quote.id)
+
+    files = {}
+    shards = {}
+    for term, ids in postings.items():
+        shards.setdefault(term[:PREFIX_LENGTH], {})[term] = encode_postings(sorted(set(ids)))
+    for prefix, terms in shards.items():
+        files[f'terms/{prefix}.json'] = dict(sorted(terms.items()))
+    for shard, entries in docs.items():
+        files[f'docs/{shard}.json'] = entries
+
+    facet_manifest = {}
+    for field, values in facets.items():
+        facet_manifest[field] = {}
+        used = set()
+        for value in sorted(values):
+            ids = sorted(set(values[value]))
+            slug = base = slugify(value)
+            n = 2
+            while slug in used:  # Values that only differ in case or punctuation
+                slug, n = f'{base}-{n}', n + 1
+            used.add(slug)
+            path = f'facets/{field}/{slug}.json'
+            files[path] = encode_postings(ids)
+            facet_manifest[field][value] = {'count': len(ids), 'file': path}
+
+    files['manifest.json'] = {
+        'version': INDEX_VERSION,
+        'catalog': digest,
+        'quotes': count,
+        'terms': len(postings),
+        'prefix_length': PREFIX_LENGTH,
+        'min_token_length': MIN_TOKEN_LENGTH,
+        'doc_shard_size': DOC_SHARD_SIZE,
+        'stopwords': sorted(STOPWORDS),
+        'term_shards': sorted(shards),
+        'doc_shards': sorted(docs),
+        'facets': facet_manifest,
+    }
+    return files
+
+
+def publish(quotes, index_dir=DEFAULT_INDEX_DIR, digest=None, force=False):
+    """Write the index files, replacing a previously published index
+
+    Args:
+        quotes: Iterable of Quote records
+        index_dir: Output directory
+        digest: Catalog digest (see catalog_digest()); when it matches the
+            published manifest the index is left as is
+        force: Rebuild even if the digest matches (the digest is still recorded)
+
+    Returns:
+        Dictionary with 'files', 'written', 'removed' and 'bytes', or None if
+        the published index is already current
+    """
+    index_dir = Path(index_dir)
+    manifest = read_manifest(index_dir)
+    if not force and digest is not None and manifest and manifest.get('catalog') == digest \
+            and manifest.get('version') == INDEX_VERSION:
+        return None
+
+    files = build_index(quotes, digest)
+    written = total_bytes = 0
+    # The manifest goes last, so a reader never sees it point at missing shards
+    for relative in sorted(files, key=lambda p: p == 'manifest.json'):
+        path = index_dir / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        size = precompress.write_json(path, files[relative], skip_unchanged=True)
+        if size:
+            written += 1
+            total_bytes += size
+
+    removed = precompress.remove_stale(index_dir, files)
+    return {'files': len(files), 'written': written, 'removed': removed, 'bytes': total_bytes}
+
+
+class SearchIndex:
+    """Queries a published index, loading shards on demand
+
+    Shards are cached (up to MAX_CACHED_SHARDS) and dropped whenever the
+    manifest changes, so a long-running server picks up a rebuilt index.
+    Safe to share between threads.
+    """
+
+    def __init__(self, index_dir=DEFAULT_INDEX_DIR):
+        self.index_dir = Path(index_dir)
+        self.manifest = None
+        self._manifest_stamp = None
+        self._files = {}
+        self._facet_sets = {}
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        """Reload the manifest if it changed
+
+        Raises:
+            FileNotFoundError: If no index is published
+        """
+        stat = (self.index_dir / 'manifest.json').stat()
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        if stamp != self._manifest_stamp:
+            manifest = read_manifest(self.index_dir)
+            if manifest is None:
+                raise FileNotFoundError(f"no search index in {self.index_dir}")
+            self.manifest, self._manifest_stamp = manifest, stamp
+            self._files = {}
+            self._facet_sets = {}
+
+    def _load(self, relative):
+        """Cached contents of one shard file"""
+        data = self._files.pop(relative, None)
+        if data is None:
+            with open(self.index_dir / relative, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            while len(self._files) >= MAX_CACHED_SHARDS:
+                self._files.pop(next(iter(self._files)))
+        self._files[relative] = data
+        return data
+
+    def postings(self, term, prefix=False):
+        """Ids of quotes containing term (or, with prefix, any term starting with it)"""
+        key = term[:self.manifest['prefix_length']]
+        if key not in self.manifest['term_shards']:
+            return set()
+        shard = self._load(f'terms/{key}.json')
+        if not prefix:
+            return set(decode_postings(shard.get(term, ())))
+        ids = set()
+        for candidate, deltas in shard.items():
+            if candidate.startswith(term):
+                ids.update(decode_postings(deltas))
+        return ids
+
+    def _facet_set(self, entry):
+        """Decoded ids of one facet value (kept until the manifest changes)"""
+        ids = self._facet_sets.get(entry['file'])
+        if ids is None:
+            with open(self.index_dir / entry['file'], 'r', encoding='utf-8') as f:
+                ids = self._facet_sets[entry['file']] = frozenset(decode_postings(json.load(f)))
+        return ids
+
+    def facet_ids(self, field, value):
+        """Ids of quotes with a facet value (case-insensitive)"""
+        values = self.manifest['facets'].get(field, {})
+        wanted = tokenize_key(value)
+        for name, entry in values.items():
+            if tokenize_key(name) == wanted:
+                return set(self._facet_set(entry))
+        return set()
+
+    def document(self, quote_id):
+        """Quote dictionary for an id"""
+        shard = self._load(f"docs/{quote_id // self.manifest['doc_shard_size']}.json")
+        text, author, movie, theme = shard[str(quote_id)]
+        return {'id': quote_id, 'text': text, 'author': author, 'movie': movie, 'theme': theme}
+
+    def search(self, query='', limit=DEFAULT_LIMIT, offset=0, **filters):
+        """Quotes matching every word of query and every facet filter
+
+        Args:
+            query: Words to find; the last one also matches as a prefix
+            limit: Results to return
+            offset: Results to skip
+            **filters: author, movie and/or theme values
+
+        Returns:
+            Dictionary with 'total', the page of 'results' (by id) and
+            per-facet counts over all matches
+
+        Raises:
+            ValueError: For an unknown filter
+            FileNotFoundError: If no index is published
+        """
+        unknown = set(filters) - set(FACETS)
+        if unknown:
+            raise ValueError(f"unknown filters: {', '.join(sorted(unknown))}")
+
+        with self._lock:
+            self._refresh()
+            stopwords = set(self.manifest['stopwords'])
+            terms = query_terms(query, stopwords)
+
+            sets = [self.postings(term, prefix=i == len(terms) - 1) for i, term in enumerate(terms)]
+            sets += [self.facet_ids(field, value) for field, value in filters.items() if value]
+            matches = set.intersection(*sorted(sets, key=len)) if sets else set()
+            ordered = sorted(matches)
+
+            facet_counts = {}
+            if matches:
+                for field, values in self.manifest['facets'].items():
+                    counts = {}
+                    for name, entry in values.items():
+                        n = len(matches.intersection(self._facet_set(entry)))
+                        if n:
+                            counts[name] = n
+                    facet_counts[field] = counts
+
+            return {
+                'query': query,
+                'filters': {field: value for field, value in filters.items() if value},
+                'total': len(ordered),
+                'offset': offset,
+                'limit': limit,
+                'results': [self.document(i) for i in ordered[offset:offset + limit]],
+                'facets': facet_counts,
+            }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build or query the sharded quote search index')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help='Publish the index for a catalog')
+    build.add_argument('--catalog', type=Path, help='Quote catalog (default: quotes.json)')
+    build.add_argument('--output', type=Path, default=DEFAULT_INDEX_DIR, help='Index directory (default: api/search)')
+    build.add_argument('--force', action='store_true', help='Rebuild even if the catalog did not change')
+
+    query = subparsers.add_parser('query', help='Search a published index')
+    query.add_argument('query', nargs='?', default='', help='Words to search for')
+    for field in FACETS:
+        query.add_argument(f'--{field}', help=f'Only quotes with this {field}')
+    query.add_argument('--limit', type=int, default=DEFAULT_LIMIT, help=f'Results to show (default: {DEFAULT_LIMIT})')
+    query.add_argument('--index', type=Path, default=DEFAULT_INDEX_DIR, help='Index directory (default: api/search)')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        import generate_random_quote as gq
+
+        catalog = args.catalog or gq.QUOTES_FILE
+        if not Path(catalog).exists():
+            print(f"❌ Catalog not found: {catalog}")
+            return 1
+        stats = publish(gq.load_quotes(catalog), args.output, catalog_digest(catalog), force=args.force)
+        if stats is None:
+            print(f"✓ Search index in {args.output} is current")
+        else:
+            print(f"✅ Search index: {stats['files']:,} files in {args.output} "
+                  f"({stats['written']:,} written, {stats['removed']:,} removed, {stats['bytes'] / 1024:.1f} KB)")
+        return 0
+
+    index = SearchIndex(args.index)
+    filters = {field: getattr(args, field) for field in FACETS if getattr(args, field)}
+    try:
+        result = index.search(args.query, limit=args.limit, **filters)
+    except FileNotFoundError:
+        print(f"❌ No search index in {args.index}: run python3 search_index.py build")
+        return 1
+
+    print(f"🔍 {result['total']:,} quotes match")
+    for quote in result['results']:
+        print(f"   #{quote['id']} \"{quote['text']}\" — {quote['author']} ({quote['movie']}, {quote['theme']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
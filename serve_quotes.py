@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Local server for the published quote files
+
+Serves the project directory like GitHub Pages does, but answers requests
+for files with precompressed sidecars (see precompress.py) with the .br or
+.gz copy when the client's Accept-Encoding allows it, so nothing is
+compressed per request.
+
+It also answers search queries from the published index (see
+search_index.py):
+
+    /api/search?q=inner+peace&author=Master+Shifu&limit=10&offset=0
+
+Usage:
+    python3 serve_quotes.py                 # http://localhost:8000/
+    python3 serve_quotes.py --port 8080 --bind 0.0.0.0
+
+    curl -H 'Accept-Encoding: br, gzip' http://localhost:8000/api/random-quote-all.json
+    curl 'http://localhost:8000/api/search?q=dragon+warrior&theme=iconic'
+"""
+
+import argparse
+import os
+import sys
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import precompress
+import search_index
+
+
+DEFAULT_ROOT = Path(__file__).parent
+DEFAULT_PORT = 8000
+
+SEARCH_PATH = '/api/search'
+MAX_SEARCH_LIMIT = 100
+
+
+def parse_accept_encoding(header):
+    """Map of encoding -> quality value from an Accept-Encoding header"""
+    accepted = {}
+    for item in (header or '').split(','):
+        name, _, params = item.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+def negotiate_encoding(header, available):
+    """Best of the available encodings the client accepts, or None for identity
+
+    Args:
+        header: Accept-Encoding header value
+        available: Encodings with a sidecar, in order of preference
+    """
+    accepted = parse_accept_encoding(header)
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = accepted.get(encoding, accepted.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class PrecompressedHandler(SimpleHTTPRequestHandler):
+    """Static file handler that prefers up-to-date .br/.gz sidecars"""
+
+    # Whether the response depends on Accept-Encoding (set per request)
+    vary_encoding = False
+
+    def __init__(self, *args, search=None, **kwargs):
+        # Set before the base class handles the request
+        self.search = search
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == SEARCH_PATH:
+            self.send_search(parse_qs(url.query))
+            return
+        super().do_GET()
+
+    def send_json(self, status, obj):
+        """Send a minified JSON response"""
+        body = precompress.minify_json(obj)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_search(self, params):
+        """Answer a search query from the published index"""
+        params = {key: values[-1] for key, values in params.items()}
+        if self.search is None:
+            self.send_json(404, {'error': 'search is disabled'})
+            return
+        try:
+            limit = min(max(int(params.get('limit', search_index.DEFAULT_LIMIT)), 0), MAX_SEARCH_LIMIT)
+            offset = max(int(params.get('offset', 0)), 0)
+        except ValueError:
+            self.send_json(400, {'error': 'limit and offset must be integers'})
+            return
+
+        filters = {field: params[field] for field in search_index.FACETS if params.get(field)}
+        try:
+            result = self.search.search(params.get('q', ''), limit, offset, **filters)
+        except FileNotFoundError:
+            self.send_json(503, {'error': 'search index not built: run python3 search_index.py build'})
+            return
+        self.send_json(200, result)
+
+    def sidecar_for(self, path):
+        """(encoding, sidecar path) to serve for a file, or None"""
+        self.vary_encoding = False
+        if not os.path.isfile(path):
+            return None
+        source_mtime = os.stat(path).st_mtime
+        available = []
+        for encoding in precompress.SIDECARS:
+            sidecar = precompress.sidecar_path(path, encoding)
+            # A sidecar older than its file may be stale: fall back to the file
+            if sidecar.is_file() and sidecar.stat().st_mtime >= source_mtime:
+                available.append(encoding)
+        self.vary_encoding = bool(available)
+        encoding = negotiate_encoding(self.headers.get('Accept-Encoding'), available)
+        if encoding is None:
+            return None
+        return encoding, precompress.sidecar_path(path, encoding)
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        match = self.sidecar_for(path)
+        if match is None:
+            return super().send_head()
+
+        encoding, sidecar = match
+        f = open(sidecar, 'rb')
+        try:
+            stat = os.fstat(f.fileno())
+            self.send_response(200)
+            self.send_header('Content-Type', self.guess_type(path))
+            self.send_header('Content-Encoding', encoding)
+            self.send_header('Content-Length', str(stat.st_size))
+            self.send_header('Last-Modified', self.date_time_string(stat.st_mtime))
+            self.end_headers()
+            return f
+        except Exception:
+            f.close()
+            raise
+
+    def end_headers(self):
+        # Caches must not hand a compressed copy to a client that did not ask for it
+        if self.vary_encoding:
+            self.send_header('Vary', 'Accept-Encoding')
+            self.vary_encoding = False
+        super().end_headers()
+
+
+def make_server(root=DEFAULT_ROOT, port=DEFAULT_PORT, bind='127.0.0.1', index_dir=None):
+    """Threaded HTTP server for a directory
+
+    Args:
+        root: Directory to serve
+        port: Port (0 picks a free one)
+        bind: Address to bind
+        index_dir: Search index directory (default: <root>/api/search)
+    """
+    search = search_index.SearchIndex(index_dir or Path(root) / 'api' / 'search')
+    handler = partial(PrecompressedHandler, directory=str(root), search=search)
+    return ThreadingHTTPServer((bind, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve published quote files with precompressed sidecars')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port (default: {DEFAULT_PORT})')
+    parser.add_argument('--bind', default='127.0.0.1', help='Address to bind (default: 127.0.0.1)')
+    parser.add_argument('--root', type=Path, default=DEFAULT_ROOT, help='Directory to serve')
+    args = parser.parse_args(argv)
+
+    server = make_server(args.root, args.port, args.bind)
+    print(f"🥋 Serving {args.root} on http://{args.bind}:{server.server_address[1]}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
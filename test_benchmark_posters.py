@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test suite for the poster benchmark gate
+
+Tests verify:
+1. Slower or lower-scoring posters are reported as regressions
+2. Faster or better-scoring posters, and new posters, are not
+3. --metrics limits the gate to time or quality
+4. Quality is only compared between runs scored with the same metric
+5. A run without a baseline reports it and passes
+"""
+
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+# Add current directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+import benchmark_posters
+from benchmark_posters import compare_with_baseline
+
+
+KEY = 'png/raw/kung-fu-panda-1-poster-bw-outline.png'
+
+
+def result(**overrides):
+    """Benchmark result for one poster"""
+    values = {
+        'encoder': 'png', 'source': 'raw', 'poster': 'kung-fu-panda-1-poster-bw-outline.png',
+        'target_max_size': 15360, 'encode_time': 1.0, 'encoder_calls': 15, 'peak_rss': 50_000_000,
+        'final_width': 160, 'final_bytes': 14773, 'final_setting': 16, 'final_ssim': 0.91, 'metric': 'ssim',
+    }
+    values.update(overrides)
+    return values
+
+
+class TestBenchmarkPosters(unittest.TestCase):
+    """Test suite for compare_with_baseline() and the baseline handling"""
+
+    def setUp(self):
+        """Create a temporary directory"""
+        self.test_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_regressions(self):
+        """Test that slower encodes and lower SSIM are regressions"""
+        baseline = {KEY: result()}
+        regressions = compare_with_baseline({KEY: result(encode_time=1.5, final_ssim=0.85)}, baseline)
+        self.assertEqual(len(regressions), 2)
+        self.assertIn('slower 1.000s → 1.500s', regressions[0])
+        self.assertIn('lower SSIM 0.9100 → 0.8500', regressions[1])
+
+    def test_improvements_and_noise(self):
+        """Test that faster, better or barely slower posters pass"""
+        baseline = {KEY: result()}
+        for current in (result(encode_time=0.5, final_ssim=0.95),
+                        result(encode_time=1.2),                     # Inside TIME_TOLERANCE
+                        result(encode_time=1.0, final_width=200)):
+            with self.subTest(current=current):
+                self.assertEqual(compare_with_baseline({KEY: current}, baseline), [])
+
+        # Tiny posters: a 30 ms slowdown is noise even at +50%
+        self.assertEqual(compare_with_baseline({KEY: result(encode_time=0.09)},
+                                               {KEY: result(encode_time=0.06)}), [])
+
+    def test_size_budget_change_skips_quality(self):
+        """Test that quality is not compared once the size budget changed"""
+        baseline = {KEY: result(target_max_size=20480)}
+        self.assertEqual(compare_with_baseline({KEY: result(final_ssim=0.5)}, baseline), [])
+
+    def test_unscored_runs(self):
+        """Test that width is compared only when neither run was scored"""
+        unscored = dict(final_ssim=None, metric=None)
+        # Scored search chose 160px @ 16 colours over the fallback's 200px @ 4 colours
+        self.assertEqual(compare_with_baseline({KEY: result(final_width=160)},
+                                               {KEY: result(final_width=200, **unscored)}), [])
+        self.assertEqual(compare_with_baseline({KEY: result(final_width=200, **unscored)},
+                                               {KEY: result(final_width=160)}), [])
+
+        regressions = compare_with_baseline({KEY: result(final_width=160, **unscored)},
+                                            {KEY: result(final_width=200, **unscored)})
+        self.assertEqual(len(regressions), 1)
+        self.assertIn('narrower 200px → 160px', regressions[0])
+
+        # Nothing fits any more
+        regressions = compare_with_baseline({KEY: result(final_width=None, final_ssim=None)}, {KEY: result()})
+        self.assertIn('lower SSIM 0.9100 → 0.0000', regressions[0])
+
+    def test_metrics(self):
+        """Test that the gate only checks the requested metrics"""
+        baseline = {KEY: result()}
+        current = {KEY: result(encode_time=3.0, final_ssim=0.5)}
+        self.assertEqual(len(compare_with_baseline(current, baseline, ['quality'])), 1)
+        self.assertIn('lower SSIM', compare_with_baseline(current, baseline, ['quality'])[0])
+        self.assertIn('slower', compare_with_baseline(current, baseline, ['time'])[0])
+
+    def test_no_baseline(self):
+        """Test that new posters and a missing baseline file are not regressions"""
+        self.assertEqual(compare_with_baseline({KEY: result(encode_time=9.0)}, {}), [])
+
+        results = {KEY: result()}
+        with patch.object(benchmark_posters, 'collect_tasks', return_value=[('png', 'raw', 'poster')]), \
+                patch('multiprocessing.Pool') as pool, \
+                patch('sys.stdout'):
+            pool.return_value.__enter__.return_value.imap.return_value = iter(results.values())
+            code = benchmark_posters.main(['--encoders', 'png',
+                                           '--baseline', str(self.test_dir / 'missing.json'),
+                                           '--output', str(self.test_dir / 'latest.json')])
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads((self.test_dir / 'latest.json').read_text()), results)
+
+    def test_committed_baseline(self):
+        """Test that the committed PNG baseline covers every poster on disk"""
+        baseline = json.loads(benchmark_posters.BASELINE_FILE.read_text(encoding='utf-8'))
+        keys = {f'{encoder}/{source}/{Path(poster).name}'
+                for encoder, source, poster in benchmark_posters.collect_tasks(['png'])}
+        self.assertTrue(keys)
+        self.assertLessEqual(keys, set(baseline))
+
+
+if __name__ == '__main__':
+    # Run tests with verbose output
+    unittest.main(verbosity=2)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Test suite for paged catalog publishing
+
+Tests verify:
+1. Pages and theme shards cover the catalog, one page per id range
+2. Editing, adding or deleting quotes rewrites only the affected pages
+3. Unchanged catalogs are skipped and stale pages removed
+4. Compiled catalogs publish the same pages
+"""
+
+import json
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+# Add current directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+import catalog_pages
+import generate_random_quote as gq
+from compiled_catalog import CompiledCatalog, compile_catalog
+from quote_record import Quote
+
+
+PROJECT_ROOT = Path(__file__).parent
+THEMES = ['Wisdom', 'Humor', 'Growth']
+
+
+def make_quotes(count):
+    return tuple(
+        Quote(i + 1, f'Quote number {i + 1}', 'Po', 'Kung Fu Panda', THEMES[i % len(THEMES)])
+        for i in range(count)
+    )
+
+
+class TestCatalogPages(unittest.TestCase):
+    """Test suite for pages, theme shards and the manifest"""
+
+    def setUp(self):
+        """Create a temporary output directory"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.output_dir = self.test_dir / 'catalog'
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def read(self, relative):
+        with open(self.output_dir / relative, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_pages_cover_catalog(self):
+        """Test that pages and theme shards hold every quote once, in order"""
+        quotes = make_quotes(250)
+        catalog_pages.publish(quotes, self.output_dir, page_size=100)
+        manifest = self.read('manifest.json')
+
+        self.assertEqual([p['count'] for p in manifest['pages']], [99, 100, 51])
+        records = [r for page in manifest['pages'] for r in self.read(page['file'])]
+        self.assertEqual(records, [q.to_dict() for q in quotes])
+        self.assertEqual((manifest['pages'][1]['first_id'], manifest['pages'][1]['last_id']), (100, 199))
+
+        index = gq.theme_index(quotes)
+        self.assertEqual(sorted(manifest['themes']), sorted(index))
+        for theme, entry in manifest['themes'].items():
+            with self.subTest(theme=theme):
+                records = [r for page in entry['pages'] for r in self.read(page['file'])]
+                self.assertEqual(records, [q.to_dict() for q in index[theme]])
+                self.assertEqual(entry['count'], len(index[theme]))
+
+    def test_edit_rewrites_only_affected_pages(self):
+        """Test that one edited quote changes one page and one theme shard"""
+        quotes = make_quotes(300)
+        catalog_pages.publish(quotes, self.output_dir, page_size=50)
+        before = self.read('manifest.json')
+
+        edited = list(quotes)
+        edited[120] = edited[120]._replace(text='There are no accidents.')
+        stats = catalog_pages.publish(tuple(edited), self.output_dir, page_size=50)
+        self.assertEqual(stats['written'], 3)  # Catalog page, theme shard, manifest
+
+        after = self.read('manifest.json')
+        changed = [a['file'] for a, b in zip(after['pages'], before['pages']) if a['hash'] != b['hash']]
+        self.assertEqual(changed, ['pages/2.json'])
+
+        # New quotes only touch the last pages
+        stats = catalog_pages.publish(tuple(edited) + make_quotes(303)[300:], self.output_dir, page_size=50)
+        self.assertLessEqual(stats['written'], 1 + 1 + len(THEMES))
+
+        # Deleting a quote does not shift the pages after it
+        before = self.read('manifest.json')
+        del edited[10]
+        stats = catalog_pages.publish(tuple(edited) + make_quotes(303)[300:], self.output_dir, page_size=50)
+        self.assertEqual(stats['written'], 3)
+        after = self.read('manifest.json')
+        changed = [a['file'] for a, b in zip(after['pages'], before['pages']) if a['hash'] != b['hash']]
+        self.assertEqual(changed, ['pages/0.json'])
+        self.assertEqual(after['pages'][0]['count'], before['pages'][0]['count'] - 1)
+
+    def test_skip_and_remove_stale(self):
+        """Test that a current catalog is skipped and removed pages are deleted"""
+        quotes = make_quotes(150)
+        self.assertIsNotNone(catalog_pages.publish(quotes, self.output_dir, page_size=50, digest='abc'))
+        self.assertIsNone(catalog_pages.publish(quotes, self.output_dir, page_size=50, digest='abc'))
+        self.assertIsNotNone(catalog_pages.publish(quotes, self.output_dir, page_size=75, digest='abc'))
+        # A forced build rewrites but keeps the digest, so the next run is skipped again
+        self.assertIsNotNone(catalog_pages.publish(quotes, self.output_dir, page_size=75, digest='abc', force=True))
+        self.assertEqual(self.read('manifest.json')['catalog'], 'abc')
+        self.assertIsNone(catalog_pages.publish(quotes, self.output_dir, page_size=75, digest='abc'))
+
+        stats = catalog_pages.publish(quotes[:60], self.output_dir, page_size=75, digest='def')
+        self.assertGreater(stats['removed'], 0)
+        self.assertFalse((self.output_dir / 'pages' / '1.json').exists())
+        self.assertEqual(self.read('manifest.json')['quotes'], 60)
+
+        with self.assertRaises(ValueError):
+            catalog_pages.build_pages(quotes, page_size=0)
+
+    def test_compiled_catalog_pages(self):
+        """Test that a compiled catalog publishes the same pages as its JSON source"""
+        quotes = make_quotes(120)
+        catalog_file = self.test_dir / 'quotes.qcat'
+        compile_catalog([q.to_dict() for q in quotes], catalog_file)
+        with CompiledCatalog(catalog_file) as catalog:
+            compiled = catalog_pages.build_pages(catalog, page_size=40)
+        self.assertEqual(compiled, catalog_pages.build_pages(quotes, page_size=40))
+
+    def test_generator_publishes_pages(self):
+        """Test that the generator publishes the real catalog under api/catalog"""
+        with patch.object(gq, 'OUTPUT_ROOT', self.test_dir), patch('sys.stdout'):
+            self.assertIsNotNone(gq.publish_catalog_pages())
+            self.assertIsNone(gq.publish_catalog_pages())
+        manifest = json.loads((self.test_dir / 'api' / 'catalog' / 'manifest.json').read_text())
+        self.assertEqual(manifest['quotes'], len(gq.load_quotes()))
+        self.assertEqual(sum(t['count'] for t in manifest['themes'].values()), manifest['quotes'])
+
+
+if __name__ == '__main__':
+    # Run tests with verbose output
+    unittest.main(verbosity=2)
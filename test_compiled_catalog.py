@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test suite for the compiled binary quote catalog
+
+Tests verify:
+1. Compiled records round-trip the JSON catalog
+2. Theme views and id lookups match the JSON catalog
+3. Picks never return excluded quotes
+4. The generator uses a compiled catalog with history tracking intact
+"""
+
+import json
+import random
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+# Add current directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+import compiled_catalog
+import generate_random_quote as gq
+from compiled_catalog import CompiledCatalog, compile_catalog
+
+
+PROJECT_ROOT = Path(__file__).parent
+
+
+class TestCompiledCatalog(unittest.TestCase):
+    """Test suite for compiling and reading catalogs"""
+
+    def setUp(self):
+        """Compile quotes.json into a temporary directory"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        with open(PROJECT_ROOT / 'quotes.json', 'r', encoding='utf-8') as f:
+            self.quotes = json.load(f)
+        self.catalog_file = self.test_dir / 'quotes.qcat'
+        compile_catalog(self.quotes, self.catalog_file)
+        self.catalog = CompiledCatalog(self.catalog_file)
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        self.catalog.close()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_round_trip(self):
+        """Test that every quote reads back unchanged, ordered by id"""
+        self.assertTrue(compiled_catalog.is_compiled(self.catalog_file))
+        self.assertFalse(compiled_catalog.is_compiled(PROJECT_ROOT / 'quotes.json'))
+        self.assertEqual([q.to_dict() for q in self.catalog], sorted(self.quotes, key=lambda q: q['id']))
+        self.assertEqual(self.catalog[-1].id, max(q['id'] for q in self.quotes))
+
+    def test_theme_views_and_lookup(self):
+        """Test that theme views hold exactly that theme's quotes"""
+        themes = {q['theme'] for q in self.quotes}
+        self.assertEqual(set(self.catalog.themes), themes)
+        for theme in themes:
+            expected = sorted(q['id'] for q in self.quotes if q['theme'] == theme)
+            view = self.catalog.theme(theme.upper())
+            self.assertEqual([q.id for q in view], expected)
+            self.assertIn(expected[0], view)
+        self.assertIsNone(self.catalog.theme('nonexistent'))
+
+        self.assertEqual(self.catalog.get(self.quotes[0]['id']).to_dict(), self.quotes[0])
+        self.assertIsNone(self.catalog.get(10_000))
+
+    def test_choice_excluding(self):
+        """Test that excluded ids are never picked, down to the last quote"""
+        view = self.catalog.theme('wisdom')
+        ids = [q.id for q in view]
+        excluded = set(ids[:-1]) | {10_000}
+
+        self.assertEqual(view.count_excluding(excluded), 1)
+        rng = random.Random(0)
+        for _ in range(20):
+            self.assertEqual(view.choice_excluding(excluded, rng).id, ids[-1])
+        with self.assertRaises(IndexError):
+            view.choice_excluding(set(ids), rng)
+
+    def test_generator_with_compiled_catalog(self):
+        """Test that the generator avoids recent quotes and resets an exhausted theme"""
+        history_file = self.test_dir / '.quote-history.json'
+        with patch.object(gq, 'QUOTES_FILE', self.catalog_file), \
+                patch.object(gq, 'HISTORY_FILE', history_file), \
+                patch('sys.stdout'):
+            humor_ids = {q['id'] for q in self.quotes if q['theme'] == 'Humor'}
+            picked = [gq.generate_random_quote('humor')['id'] for _ in humor_ids]
+            self.assertEqual(set(picked), humor_ids)
+
+            quote = gq.generate_random_quote('humor')
+            self.assertIn(quote['id'], humor_ids)
+            self.assertEqual(len(gq.load_quote_history()['quotes']), 1)
+            self.assertIn('layouts', quote)
+
+
+if __name__ == '__main__':
+    # Run tests with verbose output
+    unittest.main(verbosity=2)
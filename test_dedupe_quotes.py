@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test suite for near-duplicate quote detection
+
+Tests verify:
+1. Punctuation, casing and accent variants are merged
+2. Distinct quotes are never merged
+3. The first record of each cluster is kept
+4. The merge report maps dropped ids onto kept ids
+5. Oversized LSH buckets still find pairs anywhere in the bucket
+"""
+
+import json
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+# Add current directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+import dedupe_quotes
+import ingest_quotes
+
+
+PROJECT_ROOT = Path(__file__).parent
+
+
+def quote(quote_id, text, author='Po'):
+    return {'id': quote_id, 'text': text, 'author': author, 'movie': 'Kung Fu Panda', 'theme': 'Wisdom'}
+
+
+class TestDedupeQuotes(unittest.TestCase):
+    """Test suite for MinHash/LSH clustering and the merge report"""
+
+    def test_normalize_text(self):
+        """Test that case, punctuation, apostrophes and accents are ignored"""
+        self.assertEqual(dedupe_quotes.normalize_text("  Don’t WORRY,  be   Happy! "), 'dont worry be happy')
+        self.assertEqual(dedupe_quotes.normalize_text('Café'), 'cafe')
+
+    def test_variants_are_merged_into_first_record(self):
+        """Test that near-identical quotes collapse onto the earliest one"""
+        records = [
+            quote(1, 'Skadoosh.'),
+            quote(2, 'Yesterday is history, tomorrow is a mystery, but today is a gift.', 'Master Oogway'),
+            quote(3, 'Skadoosh!'),
+            quote(4, 'Yesterday is history; tomorrow is a mystery, but today is a gift', 'Oogway'),
+        ]
+        kept, report = dedupe_quotes.dedupe(records)
+
+        self.assertEqual([q['id'] for q in kept], [1, 2])
+        self.assertEqual(report['id_map'], {'3': 1, '4': 2})
+        self.assertEqual(report['duplicates'], 2)
+        self.assertEqual(report['kept_records'], 2)
+
+    def test_near_duplicates_above_threshold(self):
+        """Test that a one-word edit is found by LSH and verified by Jaccard"""
+        text = 'If you only do what you can do, you will never be more than you are now.'
+        records = [quote(1, text), quote(2, text.replace('never', 'not ever'))]
+
+        _, strict = dedupe_quotes.dedupe(records, threshold=0.95)
+        self.assertEqual(strict['duplicates'], 0)
+
+        _, loose = dedupe_quotes.dedupe(records, threshold=0.7)
+        self.assertEqual(loose['id_map'], {'2': 1})
+        self.assertLess(loose['clusters'][0]['merged'][0]['similarity'], 1.0)
+
+    def test_large_bucket_pair_not_at_first_member(self):
+        """Test that a duplicate pair deep inside an oversized bucket is still found"""
+        catalog = json.loads((PROJECT_ROOT / 'quotes.json').read_text(encoding='utf-8'))
+        texts = [text for text in dict.fromkeys(q['text'] for q in catalog) if len(text.split()) >= 8][:20]
+        records = [quote(i + 1, text) for i, text in enumerate(texts)]
+        # One extra word: a near-duplicate, not an exact repeat
+        records.insert(12, quote(100, texts[10] + ' Indeed.'))
+
+        # Every record lands in the same bucket of every band
+        signature = (0,) * dedupe_quotes.NUM_PERMUTATIONS
+        with patch.object(dedupe_quotes.MinHasher, 'signature', return_value=signature), \
+                patch.object(dedupe_quotes, 'MAX_BUCKET_PAIRWISE', 5):
+            _, report = dedupe_quotes.dedupe(records)
+        self.assertEqual(report['id_map'], {'100': 11})
+
+    def test_distinct_quotes_are_kept(self):
+        """Test that every distinct quote in quotes.json survives"""
+        with open(PROJECT_ROOT / 'quotes.json', 'r', encoding='utf-8') as f:
+            catalog = json.load(f)
+        kept, report = dedupe_quotes.dedupe(catalog)
+
+        unique_texts = {dedupe_quotes.normalize_text(q['text']) for q in catalog}
+        self.assertEqual(len(kept), len(unique_texts))
+        for dropped_id, kept_id in report['id_map'].items():
+            self.assertLess(kept_id, int(dropped_id))
+
+    def test_ingest_with_dedupe(self):
+        """Test that ingestion can merge near-duplicates across sources"""
+        test_dir = Path(tempfile.mkdtemp())
+        try:
+            sources = []
+            for path in [PROJECT_ROOT / 'quotes.json'] + sorted((PROJECT_ROOT / 'quotes-store').glob('q*.json')):
+                shutil.copy(path, test_dir / path.name)
+                sources.append(test_dir / path.name)
+            output = test_dir / 'catalog.json'
+            report_file = test_dir / 'dedupe-report.json'
+
+            with patch('sys.stdout'):
+                plain = ingest_quotes.ingest(sources, output, test_dir / 'state.json')
+                deduped = ingest_quotes.ingest(sources, output, test_dir / 'state.json',
+                                               dedupe_threshold=0.8, report_file=report_file)
+
+            report = json.loads(report_file.read_text())
+            self.assertEqual(deduped['written'], plain['written'] - report['duplicates'])
+            texts = [dedupe_quotes.normalize_text(q['text']) for q in json.loads(output.read_text())]
+            self.assertEqual(len(texts), len(set(texts)))
+        finally:
+            shutil.rmtree(test_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    # Run tests with verbose output
+    unittest.main(verbosity=2)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Test suite for rotation analytics
+
+Tests verify:
+1. Histories are streamed, never loaded whole
+2. Exposure, repeat gaps and author/movie balance are counted per pick
+3. Pool exhaustion forecasts follow the pick rate and the reuse window
+4. SQLite histories and tenant configs give the same reports
+"""
+
+import json
+import unittest
+from datetime import datetime, timezone, timedelta
+import tempfile
+import shutil
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+# Add current directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+import history_analytics
+from history_analytics import RotationStats
+from history_store import HistoryStore
+from quote_record import Quote
+
+
+START = datetime(2024, 1, 1, 6, 0, tzinfo=timezone.utc)
+
+QUOTES = (
+    Quote(1, 'Inner peace.', 'Master Shifu', 'Kung Fu Panda', 'Wisdom'),
+    Quote(2, 'Skadoosh!', 'Po', 'Kung Fu Panda', 'Humor'),
+    Quote(3, 'There are no accidents.', 'Master Oogway', 'Kung Fu Panda', 'Wisdom'),
+    Quote(4, 'Your story may not have such a happy beginning.', 'Soothsayer', 'Kung Fu Panda 2', 'Wisdom'),
+)
+
+
+def entry(quote_id, day, hour=0):
+    """History entry for a catalog quote picked on a day after START"""
+    quote = QUOTES[quote_id - 1]
+    selected_on = (START + timedelta(days=day, hours=hour)).isoformat().replace('+00:00', 'Z')
+    return dict(quote.to_dict(), selected_on=selected_on)
+
+
+class TestHistoryAnalytics(unittest.TestCase):
+    """Test suite for streaming rotation analytics"""
+
+    def setUp(self):
+        """Create a temporary directory"""
+        self.test_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def write_history(self, entries, name='.quote-history.json'):
+        history_file = self.test_dir / name
+        history_file.write_text(json.dumps({'quotes': entries}), encoding='utf-8')
+        return history_file
+
+    def test_streams_history(self):
+        """Test that a large history is read without json.load"""
+        entries = [entry(1 + i % 4, i // 4, hour=i % 4) for i in range(4000)]
+        history_file = self.write_history(entries)
+        with patch('json.load', side_effect=AssertionError('history loaded whole')):
+            report = history_analytics.analyze(history_file, QUOTES, days_before_reuse=30)
+        self.assertEqual(report['picks'], 4000)
+        self.assertEqual(report['exposure']['min'], 1000)
+        self.assertEqual(report['gaps']['median'], 1)
+
+    def test_exposure_gaps_and_balance(self):
+        """Test per-quote counts, gap percentiles and author shares"""
+        stats = RotationStats(days_before_reuse=30)
+        for e in (entry(1, 0), entry(2, 0), entry(1, 10), entry(1, 50), {'id': 3}, {'selected_on': 'x'}):
+            stats.add(e)
+        report = history_analytics.summarize(stats, QUOTES)
+
+        self.assertEqual((report['picks'], report['skipped']), (4, 2))
+        self.assertEqual(report['exposure']['never_shown'], 2)
+        self.assertEqual(report['exposure']['top'][0], {'id': 1, 'shows': 3, 'text': 'Inner peace.'})
+        self.assertEqual((report['gaps']['min'], report['gaps']['max']), (10, 40))
+        self.assertEqual((report['gaps']['repeats'], report['gaps']['within_window']), (2, 1))
+
+        authors = {row['name']: row for row in report['authors']}
+        self.assertEqual(authors['Master Shifu']['shown_share'], 0.75)
+        self.assertEqual(authors['Master Shifu']['ratio'], 3.0)
+        self.assertEqual(authors['Master Oogway']['ratio'], 0.0)
+        self.assertEqual(report['authors'][0]['name'], 'Master Shifu')
+
+    def test_forecast_exhaustion(self):
+        """Test exhaustion days from pool size, rate and expiring picks"""
+        forecast = history_analytics.forecast_exhaustion
+        self.assertEqual(forecast(10, [], rate=1, window_days=30), 10)
+        self.assertIsNone(forecast(10, [], rate=1, window_days=5))   # Picks expire before the pool runs out
+        self.assertIsNone(forecast(10, [], rate=0, window_days=30))
+        self.assertEqual(forecast(3, [1, 2, 3], rate=1, window_days=30), 0)
+        # 2 of 3 used, both leave the window after half a day: 1 pick/day needs 3 days
+        self.assertEqual(forecast(3, [0.5, 0.5], rate=1, window_days=30), 3)
+
+    def test_pool_forecast_from_history(self):
+        """Test the per-pool forecast from a daily history"""
+        # Wisdom quotes 1, 3, 4 picked on days 0, 1, 2; Humor quote 2 on day 2
+        history_file = self.write_history([entry(1, 0), entry(3, 1), entry(4, 2), entry(2, 2)])
+        report = history_analytics.analyze(history_file, QUOTES, days_before_reuse=30)
+        pools = report['pools']
+
+        self.assertEqual(list(pools), ['all', 'humor', 'wisdom'])
+        self.assertEqual((pools['wisdom']['size'], pools['wisdom']['available']), (3, 0))
+        self.assertEqual(pools['wisdom']['exhausted_in_days'], 0)
+        self.assertEqual(pools['humor']['available'], 0)
+        self.assertEqual(pools['all']['picks_per_day'], round(4 / 3, 3))
+
+        # By day 6.5 only the day-2 pick is still inside a 5-day window
+        report = history_analytics.analyze(history_file, QUOTES, days_before_reuse=5,
+                                           as_of=START + timedelta(days=6, hours=12))
+        self.assertEqual(report['pools']['wisdom']['available'], 2)
+
+    def test_sqlite_history_and_reset(self):
+        """Test that a SQLite history gives the JSON report, and picks before a reset free their quotes"""
+        entries = [entry(1, 0), entry(3, 1), entry(4, 2), entry(1, 3)]
+        json_report = history_analytics.analyze(self.write_history(entries), QUOTES)
+
+        db_file = self.test_dir / 'history.db'
+        with HistoryStore(db_file) as store:
+            for e in entries[:3]:
+                store.add(e)
+            store.add(entries[3], reset_endpoint='wisdom')
+        db_report = history_analytics.analyze(db_file, QUOTES)
+
+        self.assertEqual(db_report['exposure'], json_report['exposure'])
+        self.assertEqual(db_report['gaps'], json_report['gaps'])
+        self.assertEqual(json_report['pools']['wisdom']['available'], 0)
+        self.assertEqual(db_report['pools']['wisdom']['available'], 2)
+
+    def test_tenants_and_output(self):
+        """Test that every tenant is analyzed against its own catalog subset"""
+        catalog = self.test_dir / 'quotes.json'
+        catalog.write_text(json.dumps([q.to_dict() for q in QUOTES]))
+        (self.test_dir / 'tenants.json').write_text(json.dumps({
+            'catalog': 'quotes.json',
+            'tenants': [
+                {'name': 'wisdom', 'output_dir': 'wisdom', 'filter': {'themes': ['wisdom']}},
+                {'name': 'everything', 'output_dir': 'everything', 'days_before_reuse': 7},
+            ],
+        }))
+        for name in ('wisdom', 'everything'):
+            (self.test_dir / name).mkdir()
+            history = self.test_dir / name / '.quote-history.json'
+            history.write_text(json.dumps({'quotes': [entry(1, 0), entry(3, 1)]}))
+
+        output = self.test_dir / 'analytics.json'
+        with patch('sys.stdout'):
+            code = history_analytics.main(['--tenants', str(self.test_dir / 'tenants.json'),
+                                           '--output', str(output)])
+        self.assertEqual(code, 0)
+        reports = json.loads(output.read_text())
+        self.assertEqual(reports['wisdom']['exposure']['quotes'], 3)
+        self.assertEqual(reports['everything']['exposure']['quotes'], 4)
+        self.assertEqual(reports['everything']['days_before_reuse'], 7)
+
+
+if __name__ == '__main__':
+    # Run tests with verbose output
+    unittest.main(verbosity=2)
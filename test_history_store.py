@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Test suite for the SQLite history store
+
+Tests verify:
+1. JSON history migrates once, skipping invalid entries
+2. Window, id and theme queries use the indexes and respect resets
+3. Readers are not blocked by a writer (WAL)
+4. The generator picks from a .db history like from the JSON file
+"""
+
+import json
+import sqlite3
+import unittest
+from datetime import datetime, timezone, timedelta
+import tempfile
+import shutil
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+# Add current directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+import generate_random_quote as gq
+import history_store
+from history_store import HistoryStore
+
+
+NOW = datetime.now(timezone.utc)
+
+
+def entry(quote_id, days_ago, theme='Wisdom'):
+    selected_on = (NOW - timedelta(days=days_ago)).isoformat().replace('+00:00', 'Z')
+    return {'id': quote_id, 'text': f'Quote {quote_id}', 'author': 'Master Oogway',
+            'movie': 'Kung Fu Panda', 'theme': theme, 'selected_on': selected_on}
+
+
+class TestHistoryStore(unittest.TestCase):
+    """Test suite for the SQLite history store"""
+
+    def setUp(self):
+        """Create a temporary directory with a store"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.db_file = self.test_dir / 'history.db'
+        self.store = HistoryStore(self.db_file)
+
+    def tearDown(self):
+        """Close the store and clean up"""
+        self.store.close()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_migrate_json(self):
+        """Test that migration imports valid entries once"""
+        json_file = self.test_dir / '.quote-history.json'
+        entries = [entry(1, 2), entry(2, 40), {'id': 3, 'selected_on': 'yesterday'}, {'id': 4}]
+        json_file.write_text(json.dumps({'quotes': entries}))
+
+        self.assertEqual(self.store.migrate_json(json_file), (2, 2))
+        self.assertEqual(self.store.migrate_json(json_file), (0, 4))
+        self.assertEqual([p['id'] for p in self.store.shown()], [2, 1])
+
+    def test_timestamps_sort_as_text(self):
+        """Test that timestamps with and without fractions are stored fixed-width"""
+        self.store.add(dict(entry(1, 0), selected_on='2024-01-05T06:00:00Z'))
+        self.store.add(dict(entry(2, 0), selected_on='2024-01-05T06:00:00.5+00:00'))
+        self.store.add(dict(entry(3, 0), selected_on='2024-01-05T05:59:59.999Z'))
+        picks = self.store.shown()
+        self.assertEqual([p['id'] for p in picks], [3, 1, 2])
+        self.assertEqual(picks[1]['selected_on'], '2024-01-05T06:00:00.000000Z')
+
+    def test_window_queries(self):
+        """Test recent picks, used ids and per-theme queries"""
+        for e in (entry(1, 40), entry(2, 10), entry(3, 1, theme='Humor'), entry(1, 5)):
+            self.store.add(e)
+
+        self.assertEqual(self.store.recently_used_ids(30), {1, 2, 3})
+        self.assertEqual(self.store.recently_used_ids(7), {1, 3})
+        self.assertTrue(self.store.was_used(2, 30))
+        self.assertFalse(self.store.was_used(2, 7))
+        self.assertEqual([p['id'] for p in self.store.recent(30)['quotes']], [2, 1, 3])
+
+        week = self.store.shown(theme='wisdom', since=NOW - timedelta(days=7))
+        self.assertEqual([p['id'] for p in week], [1])
+        self.assertEqual(len(self.store.shown(quote_id=1)), 2)
+
+    def test_queries_use_indexes(self):
+        """Test that id and theme lookups are index searches, not scans"""
+        for sql, index in (
+            ("SELECT 1 FROM history WHERE id = 1 AND selected_on > ''", 'history_id_selected_on'),
+            ("SELECT * FROM history WHERE theme = 'wisdom' AND selected_on >= ''", 'history_theme_selected_on'),
+        ):
+            with self.subTest(index=index):
+                plan = ' '.join(row[-1] for row in self.store.connection.execute('EXPLAIN QUERY PLAN ' + sql))
+                self.assertIn(index, plan)
+
+    def test_reset_restarts_window(self):
+        """Test that picks before a reset leave the reuse window"""
+        self.store.add(entry(1, 3))
+        self.store.add(entry(2, 2), reset_endpoint='wisdom')
+        self.store.add(entry(3, 1))
+        self.assertEqual(self.store.recently_used_ids(30), {2, 3})
+        self.assertEqual([r[0] for r in self.store.resets()], ['wisdom'])
+        self.assertEqual(len(self.store.shown()), 3)  # Nothing is deleted
+
+        self.assertEqual(self.store.prune(NOW - timedelta(days=2, hours=12)), 1)
+        self.assertEqual(len(self.store.shown()), 2)
+
+    def test_readers_not_blocked_by_writer(self):
+        """Test that WAL readers see the last commit while a write is open"""
+        self.store.add(entry(1, 1))
+        self.assertEqual(self.store.connection.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+
+        writer = sqlite3.connect(self.db_file, isolation_level=None)
+        try:
+            writer.execute('BEGIN IMMEDIATE')
+            writer.execute("INSERT INTO history (id, selected_on) VALUES (2, '2099-01-01T00:00:00.000000Z')")
+            with HistoryStore(self.db_file) as reader:
+                self.assertEqual([p['id'] for p in reader.shown()], [1])
+            writer.execute('COMMIT')
+        finally:
+            writer.close()
+        self.assertEqual([p['id'] for p in self.store.shown()], [1, 2])
+
+
+class TestGeneratorWithStore(unittest.TestCase):
+    """Test suite for generation with a SQLite history"""
+
+    def setUp(self):
+        """Point the generator at a temporary directory with a .db history"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.db_file = self.test_dir / '.quote-history.db'
+        self.patchers = [
+            patch.object(gq, 'HISTORY_FILE', self.db_file),
+            patch.object(gq, 'OUTPUT_ROOT', self.test_dir),
+            patch('sys.stdout'),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        for patcher in reversed(self.patchers):
+            patcher.stop()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_generation_with_store(self):
+        """Test that picks are recorded, not repeated, and reset when exhausted"""
+        pool = gq.theme_index(gq.load_quotes())['villainy']
+        picks = [gq.generate_random_quote('villainy')['id'] for _ in range(len(pool) + 1)]
+
+        self.assertEqual(len(set(picks[:len(pool)])), len(pool))
+        self.assertFalse(self.test_dir.joinpath('.quote-history.json').exists())
+        with HistoryStore(self.db_file) as store:
+            self.assertEqual([p['id'] for p in store.shown()], picks)
+            self.assertEqual([r[0] for r in store.resets()], ['villainy'])
+            self.assertEqual(store.recently_used_ids(gq.DAYS_BEFORE_REUSE), {picks[-1]})
+
+    def test_sqlite_suffixes(self):
+        """Test that only database suffixes select the store"""
+        self.assertTrue(history_store.is_sqlite_path('history.db'))
+        self.assertTrue(history_store.is_sqlite_path('history.SQLITE3'))
+        self.assertFalse(history_store.is_sqlite_path('.quote-history.json'))
+
+
+if __name__ == '__main__':
+    # Run tests with verbose output
+    unittest.main(verbosity=2)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Test suite for streaming quote ingestion
+
+Tests verify:
+1. The streaming reader matches json.load at any chunk size
+2. q1/q2/q3 schemas map onto the canonical record
+3. Ids stay stable across runs and source changes
+4. Unchanged sources are not re-read
+"""
+
+import json
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+# Add current directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+import ingest_quotes
+from json_stream import iter_records
+
+
+PROJECT_ROOT = Path(__file__).parent
+
+
+class TestJsonStream(unittest.TestCase):
+    """Test suite for the incremental JSON reader"""
+
+    def test_matches_json_load_at_small_chunk_sizes(self):
+        """Test that records survive being split across chunk boundaries"""
+        for path in [PROJECT_ROOT / 'quotes.json'] + sorted((PROJECT_ROOT / 'quotes-store').glob('q*.json')):
+            with open(path, 'r', encoding='utf-8') as f:
+                document = json.load(f)
+            if isinstance(document, dict):
+                expected = [(k, r) for k, records in document.items() for r in records]
+            else:
+                expected = [(None, r) for r in document]
+
+            for chunk_size in (1, 7, 4096):
+                with self.subTest(path=path.name, chunk_size=chunk_size):
+                    self.assertEqual(list(iter_records(path, chunk_size=chunk_size)), expected)
+
+    def test_numbers_split_across_chunks(self):
+        """Test that a number cut at a chunk boundary is not truncated"""
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            f.write('[12345, 67890]')
+        try:
+            self.assertEqual(list(iter_records(f.name, chunk_size=3)), [(None, 12345), (None, 67890)])
+        finally:
+            Path(f.name).unlink()
+
+
+class TestIngestQuotes(unittest.TestCase):
+    """Test suite for schema mapping and incremental ingestion"""
+
+    def setUp(self):
+        """Create a temporary directory with copies of the sources"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.sources = []
+        for path in [PROJECT_ROOT / 'quotes.json'] + sorted((PROJECT_ROOT / 'quotes-store').glob('q*.json')):
+            target = self.test_dir / path.name
+            shutil.copy(path, target)
+            self.sources.append(target)
+        self.output = self.test_dir / 'catalog.json'
+        self.state = self.test_dir / '.ingest-state.json'
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def run_ingest(self, sources=None, force=False):
+        with patch('sys.stdout'):
+            return ingest_quotes.ingest(sources or self.sources, self.output, self.state, force=force)
+
+    def load_catalog(self):
+        with open(self.output, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_normalize_community_schemas(self):
+        """Test that quote/character records map onto text/author"""
+        record = ingest_quotes.normalize_record({'quote': ' Skadoosh. ', 'character': 'Oogway'}, 'Kung Fu Panda')
+        self.assertEqual(record, {
+            'text': 'Skadoosh.',
+            'author': 'Master Oogway',
+            'movie': 'Kung Fu Panda',
+            'theme': ingest_quotes.DEFAULT_THEME,
+        })
+        self.assertIsNone(ingest_quotes.normalize_record({'character': 'Po'}))
+
+    def test_merged_catalog_keeps_canonical_quotes(self):
+        """Test that quotes.json records keep their ids, themes and fields"""
+        self.run_ingest()
+        catalog = self.load_catalog()
+        with open(PROJECT_ROOT / 'quotes.json', 'r', encoding='utf-8') as f:
+            canonical = json.load(f)
+
+        # Exact repeats inside quotes.json collapse onto their first id
+        by_id = {q['id']: q for q in catalog}
+        first_ids = {}
+        for quote in canonical:
+            first_ids.setdefault((quote['text'], quote['author']), quote['id'])
+        for quote in canonical:
+            kept = by_id[first_ids[(quote['text'], quote['author'])]]
+            self.assertEqual({**kept, 'id': quote['id']}, quote)
+        self.assertEqual(len({q['id'] for q in catalog}), len(catalog))
+        for quote in catalog:
+            self.assertEqual(set(quote), {'id', 'text', 'author', 'movie', 'theme'})
+
+    def test_ids_stable_across_runs(self):
+        """Test that re-ingesting with a new high-priority source keeps ids"""
+        self.run_ingest()
+        before = {(q['text'], q['author']): q['id'] for q in self.load_catalog()}
+
+        extra = self.test_dir / 'extra.json'
+        extra.write_text(json.dumps([{'quote': 'Brand new wisdom.', 'character': 'Po', 'movie': 'Kung Fu Panda 4'}]))
+        self.run_ingest([extra] + self.sources)
+
+        after = {(q['text'], q['author']): q['id'] for q in self.load_catalog()}
+        for key, quote_id in before.items():
+            self.assertEqual(after[key], quote_id)
+        self.assertGreater(after[('Brand new wisdom.', 'Po')], max(before.values()))
+
+    def test_only_changed_sources_are_processed(self):
+        """Test that a second run skips unchanged sources"""
+        first = self.run_ingest()
+        self.assertEqual(first['processed'], len(self.sources))
+
+        second = self.run_ingest()
+        self.assertEqual(second['processed'], 0)
+        self.assertIsNone(second['written'])
+
+        q1 = self.test_dir / 'q1.json'
+        records = json.loads(q1.read_text())
+        records.append({'quote': 'Inner peace.', 'character': 'Shifu', 'movie': 'Kung Fu Panda 2'})
+        q1.write_text(json.dumps(records))
+
+        third = self.run_ingest()
+        self.assertEqual(third['processed'], 1)
+        self.assertTrue(any(q['text'] == 'Inner peace.' and q['author'] == 'Master Shifu' for q in self.load_catalog()))
+
+
+if __name__ == '__main__':
+    # Run tests with verbose output
+    unittest.main(verbosity=2)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test suite for generation run instrumentation
+
+Tests verify:
+1. Nothing is recorded unless instrumentation is enabled
+2. Generation runs record a span for every stage
+3. Pool exhaustion resets are counted and persist across runs
+4. JSON-lines and Prometheus textfile exports
+5. Empty pools record a 0.0 available ratio
+6. Persisted counters keep label values with commas, quotes and escapes
+"""
+
+import json
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+from datetime import datetime, timezone
+from unittest.mock import patch
+import sys
+
+# Add current directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+import generate_random_quote as gq
+import instrumentation
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Test suite for spans, counters and metrics export"""
+
+    def setUp(self):
+        """Create a temporary directory for test files"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.history_patcher = patch.object(gq, 'HISTORY_FILE', self.test_dir / '.quote-history.json')
+        self.output_patcher = patch.object(gq, 'OUTPUT_ROOT', self.test_dir)
+        self.history_patcher.start()
+        self.output_patcher.start()
+
+    def tearDown(self):
+        """Disable instrumentation and clean up temporary directory"""
+        instrumentation.disable()
+        self.history_patcher.stop()
+        self.output_patcher.stop()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_disabled_by_default(self):
+        """Test that spans are no-ops while instrumentation is disabled"""
+        self.assertFalse(instrumentation.is_enabled())
+        with instrumentation.span('load') as span:
+            span['bytes'] = 10
+        self.assertIsNone(instrumentation.export(self.test_dir / 'metrics'))
+
+    def test_disabled_run_skips_file_sizes(self):
+        """Test that a run without instrumentation does not stat files for span sizes"""
+        with patch.object(instrumentation, 'file_size') as file_size, patch('sys.stdout'):
+            gq.save_random_quote(theme='wisdom')
+        file_size.assert_not_called()
+
+    def test_generation_records_every_stage(self):
+        """Test that a generation run records load through endpoint_write"""
+        metrics = instrumentation.enable()
+        gq.save_random_quote(theme='wisdom')
+
+        stages = [record['span'] for record in metrics.spans]
+        self.assertEqual(stages, ['load', 'cleanup', 'filter', 'select', 'history_save', 'endpoint_write'])
+        endpoint = metrics.spans[-1]
+        self.assertGreater(endpoint['bytes'], 0)
+        self.assertEqual(endpoint['labels'], {'theme': 'wisdom'})
+
+    def test_pool_reset_counter_persists(self):
+        """Test that resets are counted and accumulate in the textfile"""
+        now = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+        villainy = [q for q in gq.load_quotes() if q.theme == 'Villainy']
+        metrics_dir = self.test_dir / 'metrics'
+
+        for _ in range(2):
+            gq.save_quote_history({'quotes': [{'id': q.id, 'selected_on': now} for q in villainy]})
+            instrumentation.enable()
+            gq.generate_random_quote(theme_filter='villainy')
+            instrumentation.export(metrics_dir)
+
+        prom = (metrics_dir / instrumentation.PROM_FILENAME).read_text()
+        self.assertIn('quote_pool_resets_total{theme="villainy"} 2', prom)
+        self.assertIn('quote_pool_available{theme="villainy"} 0', prom)
+
+        lines = (metrics_dir / instrumentation.JSONL_FILENAME).read_text().splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertTrue(any(r['type'] == 'span' and r['span'] == 'history_save' for r in records))
+
+    def test_counter_labels_with_special_characters(self):
+        """Test that persisted counters keep labels containing commas, quotes and backslashes"""
+        metrics_dir = self.test_dir / 'metrics'
+        theme = 'kung, "fu"=panda \\ 2'
+        for _ in range(3):
+            instrumentation.enable()
+            with instrumentation.labels(tenant='dojo, "valley"'):
+                instrumentation.inc('quote_pool_resets_total', theme=theme)
+            instrumentation.export(metrics_dir)
+
+        prom = (metrics_dir / instrumentation.PROM_FILENAME).read_text()
+        series = [line for line in prom.splitlines() if line.startswith('quote_pool_resets_total')]
+        self.assertEqual(series, ['quote_pool_resets_total{tenant="dojo, \\"valley\\"",'
+                                  'theme="kung, \\"fu\\"=panda \\\\ 2"} 3'])
+        previous = instrumentation._read_previous_counters(metrics_dir / instrumentation.PROM_FILENAME)
+        self.assertEqual(previous, {('quote_pool_resets_total',
+                                     (('tenant', 'dojo, "valley"'), ('theme', theme))): 3})
+
+    def test_empty_pool_ratio(self):
+        """Test that an empty catalog records a 0.0 available ratio instead of dividing by zero"""
+        metrics = instrumentation.enable()
+        # Nothing to pick from, but the pool gauges are recorded first
+        with self.assertRaises(IndexError):
+            gq.generate_random_quote(quotes=[])
+        self.assertEqual(metrics.gauges[('quote_pool_size', (('theme', 'all'),))], 0)
+        self.assertEqual(metrics.gauges[('quote_pool_available_ratio', (('theme', 'all'),))], 0.0)
+
+
+if __name__ == '__main__':
+    # Run tests with verbose output
+    unittest.main(verbosity=2)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Test suite for multi-tenant generation
+
+Tests verify:
+1. Tenant configs are validated and paths resolved
+2. Catalog subsets follow the tenant filter
+3. Tenants get their own endpoints, history and reuse window
+4. The catalog is loaded once for all tenants
+5. Tenant threads share the selection caches safely
+6. A compiled catalog is not decoded, and subset indexes are built once per filter
+"""
+
+import json
+import unittest
+from datetime import datetime, timezone, timedelta
+import tempfile
+import shutil
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+# Add current directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+import generate_random_quote as gq
+from compiled_catalog import CompiledCatalog, compile_catalog
+import multi_tenant
+import weighted_selection
+from quote_record import Quote
+
+
+PROJECT_ROOT = Path(__file__).parent
+
+
+class TestMultiTenant(unittest.TestCase):
+    """Test suite for tenant configs and parallel generation"""
+
+    def setUp(self):
+        """Create a temporary directory with a tenants config"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.config_file = self.test_dir / 'tenants.json'
+        self.write_config([
+            {'name': 'oogway', 'output_dir': 'out/oogway', 'days_before_reuse': 7, 'themes': ['wisdom'],
+             'filter': {'authors': ['master oogway']}},
+            {'name': 'sequels', 'output_dir': 'out/sequels', 'themes': ['growth', 'wisdom'],
+             'filter': {'movies': ['Kung Fu Panda 2', 'Kung Fu Panda 3']}},
+        ])
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def write_config(self, tenants):
+        self.config_file.write_text(json.dumps({'catalog': str(PROJECT_ROOT / 'quotes.json'), 'tenants': tenants}))
+
+    def run_tenants(self):
+        config = multi_tenant.load_config(self.config_file)
+        with patch('sys.stdout'):
+            return multi_tenant.run_tenants(config, workers=2)
+
+    def test_invalid_configs(self):
+        """Test that missing fields, duplicates and bad filters are rejected"""
+        for tenants in (
+            [],
+            [{'name': 'a'}],
+            [{'name': 'a', 'output_dir': 'x'}, {'name': 'a', 'output_dir': 'y'}],
+            [{'name': 'a', 'output_dir': 'x', 'filter': {'colour': ['red']}}],
+            [{'name': 'a', 'output_dir': 'x', 'days_before_reuse': -1}],
+        ):
+            with self.subTest(tenants=tenants):
+                self.write_config(tenants)
+                with self.assertRaises(ValueError):
+                    multi_tenant.load_config(self.config_file)
+
+    def test_subset_filters(self):
+        """Test that theme, author, movie and id filters combine"""
+        index = multi_tenant.CatalogIndex(gq.load_quotes(PROJECT_ROOT / 'quotes.json'))
+        subset = index.subset({'themes': ['Wisdom'], 'authors': ['Master Oogway'], 'exclude_ids': [1]})
+        self.assertTrue(subset)
+        for quote in subset:
+            self.assertEqual((quote.theme, quote.author), ('Wisdom', 'Master Oogway'))
+            self.assertNotEqual(quote.id, 1)
+        self.assertEqual(index.subset({}), index.quotes)
+
+    def test_tenants_generate_independently(self):
+        """Test that each tenant writes its own endpoints and history"""
+        with patch.object(gq, 'load_quotes', wraps=gq.load_quotes) as load_quotes:
+            results, errors = self.run_tenants()
+        self.assertEqual(errors, {})
+        self.assertEqual(load_quotes.call_count, 1)
+
+        by_name = {r['name']: r for r in results}
+        self.assertEqual(by_name['sequels']['themes'], ['all', 'growth', 'wisdom'])
+
+        oogway_dir = self.test_dir / 'out' / 'oogway'
+        history = json.loads((oogway_dir / '.quote-history.json').read_text())
+        self.assertEqual(len(history['quotes']), len(by_name['oogway']['themes']))
+        self.assertTrue(all(entry['author'] == 'Master Oogway' for entry in history['quotes']))
+
+        sequels_dir = self.test_dir / 'out' / 'sequels'
+        growth = json.loads((sequels_dir / 'api' / 'random-quote-growth.json').read_text())
+        self.assertEqual(growth['theme'], 'Growth')
+        self.assertIn(growth['movie'], ('Kung Fu Panda 2', 'Kung Fu Panda 3'))
+
+    def test_tenant_reuse_window(self):
+        """Test that each tenant's window applies to its own history"""
+        results, _ = self.run_tenants()
+        endpoints = {r['name']: len(r['themes']) for r in results}
+
+        ten_days_ago = (datetime.now(timezone.utc) - timedelta(days=10)).isoformat().replace('+00:00', 'Z')
+        for name in endpoints:
+            history_file = self.test_dir / 'out' / name / '.quote-history.json'
+            history = gq.load_quote_history(history_file)
+            for entry in history['quotes']:
+                entry['selected_on'] = ten_days_ago
+            gq.save_quote_history(history, history_file)
+
+        self.run_tenants()
+        # oogway (7 days) forgot the first run, sequels (default 30 days) did not
+        oogway = gq.load_quote_history(self.test_dir / 'out' / 'oogway' / '.quote-history.json')
+        sequels = gq.load_quote_history(self.test_dir / 'out' / 'sequels' / '.quote-history.json')
+        self.assertEqual(len(oogway['quotes']), endpoints['oogway'])
+        self.assertEqual(len(sequels['quotes']), 2 * endpoints['sequels'])
+
+    def test_failing_tenant_does_not_stop_others(self):
+        """Test that a tenant whose filter matches nothing is reported"""
+        self.write_config([
+            {'name': 'empty', 'output_dir': 'out/empty', 'filter': {'authors': ['Nobody']}},
+            {'name': 'ok', 'output_dir': 'out/ok'},
+        ])
+        results, errors = self.run_tenants()
+        self.assertEqual([r['name'] for r in results], ['ok'])
+        self.assertIn('empty', errors)
+
+    def test_shared_caches_are_thread_safe(self):
+        """Test that tenant threads evicting from the shared caches do not collide"""
+        quotes = (Quote(1, 'Skadoosh!', 'Po', 'Kung Fu Panda', 'Humor'),)
+        errors = []
+
+        class SwitchingDict(dict):
+            """Dict that lets other threads run between picking and evicting the oldest key"""
+            def pop(self, key, *default):
+                time.sleep(0.0001)
+                return super().pop(key, *default)
+
+        def worker(number):
+            try:
+                for i in range(50):
+                    weighted_selection.selector_for((number, i), quotes, {})
+                    gq.theme_index(tuple(quotes))
+            except Exception as e:
+                errors.append(repr(e))
+
+        with patch.object(weighted_selection, '_selectors', SwitchingDict()), \
+                patch.object(weighted_selection, 'MAX_CACHED_SELECTORS', 2), \
+                patch.object(gq, '_theme_indexes', SwitchingDict()), \
+                patch.object(gq, 'MAX_THEME_INDEXES', 2):
+            threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(errors, [])
+            self.assertLessEqual(len(weighted_selection._selectors), 2)
+            self.assertLessEqual(len(gq._theme_indexes), 2)
+
+    def test_compiled_catalog_kept_mapped(self):
+        """Test that an unfiltered tenant picks from the compiled catalog without decoding it"""
+        records = json.loads((PROJECT_ROOT / 'quotes.json').read_text(encoding='utf-8'))
+        compile_catalog(records, self.test_dir / 'quotes.qcat')
+        with CompiledCatalog(self.test_dir / 'quotes.qcat') as catalog, \
+                patch.object(CompiledCatalog, 'record', wraps=catalog.record) as record:
+            index = multi_tenant.CatalogIndex(catalog)
+            quotes, by_theme = index.subset_index({})
+            self.assertIs(quotes, catalog)
+            self.assertEqual(sorted(by_theme), sorted(t.lower() for t in catalog.themes))
+            self.assertEqual(record.call_count, 0)
+
+            wisdom = index.subset({'themes': ['wisdom']})
+            self.assertEqual(record.call_count, len(wisdom))
+
+    def test_subset_index_built_once(self):
+        """Test that subset theme indexes outlive the generator's bounded cache"""
+        index = multi_tenant.CatalogIndex(gq.load_quotes(PROJECT_ROOT / 'quotes.json'))
+        specs = [{'exclude_ids': [quote_id]} for quote_id in range(1, 6)]
+        with patch.object(gq, 'MAX_THEME_INDEXES', 1), \
+                patch.object(gq, 'theme_index', wraps=gq.theme_index) as theme_index:
+            first = [index.subset_index(spec) for spec in specs]
+            second = [index.subset_index(dict(spec)) for spec in specs]
+        self.assertEqual(theme_index.call_count, len(specs))
+        for (quotes, by_theme), (again, again_by_theme) in zip(first, second):
+            self.assertIs(quotes, again)
+            self.assertIs(by_theme, again_by_theme)
+
+
+if __name__ == '__main__':
+    # Run tests with verbose output
+    unittest.main(verbosity=2)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Test suite for perceptual poster quality scoring
+
+Tests verify:
+1. SSIM and PSNR rank degraded images below clean ones
+2. The budget search keeps the best-looking candidate, not the widest
+3. Over-budget, dominated and clearly worse candidates are pruned early
+4. The build report keeps every format and feeds compare_formats.py
+"""
+
+import json
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+# Add current directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+import poster_quality
+
+try:
+    from PIL import Image, ImageDraw
+except ImportError:  # Both poster scripts need Pillow
+    Image = None
+
+
+def make_poster(path, size=(300, 450)):
+    """Synthetic poster: a gradient with outlined shapes"""
+    img = Image.linear_gradient('L').resize(size).convert('RGB')
+    draw = ImageDraw.Draw(img)
+    for i in range(8):
+        draw.ellipse((20 + i * 30, 40 + i * 40, 120 + i * 20, 160 + i * 30), outline=(0, 0, 0), width=3)
+        draw.line((0, i * 55, size[0], size[1] - i * 40), fill=(255, 255, 255), width=2)
+    img.save(path)
+
+
+def fake_encoder(sizes):
+    """Encoder writing a real quantized PNG but reporting a size from a table
+
+    Args:
+        sizes: (width, colors) -> reported size in bytes (default: 1)
+    """
+    calls = []
+
+    def encode(input_path, output_path, width, colors):
+        calls.append((width, colors))
+        with Image.open(input_path) as img:
+            height = poster_quality.scaled_height(img.size, width)
+            resized = img.resize((width, height), Image.Resampling.LANCZOS)
+            resized.convert('P', palette=Image.ADAPTIVE, colors=colors).save(output_path, 'PNG')
+        return sizes.get((width, colors), 1)
+
+    encode.calls = calls
+    return encode
+
+
+@unittest.skipUnless(poster_quality.np is not None and Image is not None, 'numpy and Pillow required')
+class TestPosterQuality(unittest.TestCase):
+    """Test suite for metrics and the budget search"""
+
+    def setUp(self):
+        """Create a temporary directory with a synthetic poster"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.poster = self.test_dir / 'poster.png'
+        self.temp_output = str(self.test_dir / 'candidate.png.tmp')
+        make_poster(self.poster)
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_metrics(self):
+        """Test that both metrics fall as the image degrades"""
+        np = poster_quality.np
+        reference = poster_quality.load_gray(self.poster)
+        self.assertEqual(poster_quality.ssim(reference, reference), 1.0)
+        self.assertEqual(poster_quality.psnr(reference, reference), float('inf'))
+
+        noise = np.random.default_rng(0).normal(0, 1, reference.shape)
+        slight, heavy = np.clip(reference + 5 * noise, 0, 255), np.clip(reference + 40 * noise, 0, 255)
+        self.assertGreater(poster_quality.ssim(reference, slight), poster_quality.ssim(reference, heavy))
+        self.assertGreater(poster_quality.psnr(reference, slight), poster_quality.psnr(reference, heavy))
+
+        with self.assertRaises(ValueError):
+            poster_quality.ssim(reference, reference[1:])
+
+    def test_box_mean_matches_direct_mean(self):
+        """Test the summed-area window means against a direct computation"""
+        pixels = poster_quality.np.random.default_rng(1).uniform(0, 255, (12, 9))
+        means = poster_quality._box_mean(pixels, 7)
+        self.assertEqual(means.shape, (6, 3))
+        self.assertAlmostEqual(means[2, 1], pixels[2:9, 1:8].mean())
+
+    def test_picks_best_looking_candidate(self):
+        """Test that a clean narrower candidate beats a wider 2-color one"""
+        encode = fake_encoder({(300, 256): 99, (200, 256): 99})
+        chosen, candidates = poster_quality.search(
+            self.poster, self.temp_output, 50, encode, [300, 200, 100], [256, 2], log=lambda line: None)
+
+        self.assertEqual((chosen['width'], chosen['setting']), (100, 256))
+        two_colors = next(c for c in candidates if c['setting'] == 2)
+        self.assertEqual(two_colors['width'], 300)
+        self.assertLess(two_colors['psnr'], chosen['psnr'])
+        self.assertEqual([c['status'] for c in candidates if c['width'] == 300], ['over budget', 'pruned'])
+
+    def test_pruning(self):
+        """Test that dominated settings are not scored and a fit at full width ends the search"""
+        encode = fake_encoder({(300, 256): 99})
+        chosen, candidates = poster_quality.search(
+            self.poster, self.temp_output, 50, encode, [300, 200], [256, 64, 16, 4], log=lambda line: None)
+
+        # 64 colors fit at 300px, so 16 and 4 colors are never encoded
+        self.assertEqual(encode.calls, [(300, 256), (200, 256), (300, 64)])
+        self.assertEqual(chosen['status'], 'chosen')
+
+        encode = fake_encoder({(300, 256): 99, (300, 64): 99})
+        _, candidates = poster_quality.search(
+            self.poster, self.temp_output, 50, encode, [300, 200], [256, 64], log=lambda line: None)
+        self.assertEqual(candidates[-1]['status'], 'dominated')
+        self.assertNotIn('psnr', candidates[-1])
+
+    def test_width_only_without_numpy(self):
+        """Test the fallback to the widest fit at the default setting"""
+        encode = fake_encoder({(300, 256): 99})
+        with patch.object(poster_quality, 'np', None):
+            chosen, candidates = poster_quality.search(
+                self.poster, self.temp_output, 50, encode, [300, 200, 100], [256, 2], log=lambda line: None)
+        self.assertEqual((chosen['width'], chosen['setting']), (200, 256))
+        self.assertEqual(encode.calls, [(300, 256), (200, 256)])
+
+    def test_png_script_stays_under_budget(self):
+        """Test the PNG script's search on the synthetic poster"""
+        import resize_posters_optimized
+
+        with patch('sys.stdout'):
+            chosen, candidates = resize_posters_optimized.find_optimal_width(
+                str(self.poster), self.temp_output, 6 * 1024)
+        self.assertLessEqual(chosen['bytes'], 6 * 1024)
+        self.assertIn(chosen['setting'], resize_posters_optimized.PALETTE_COLORS)
+        self.assertEqual(max(c['ssim'] for c in candidates if 'ssim' in c), chosen['ssim'])
+
+    def test_report_and_comparison(self):
+        """Test that each format's results are kept and paired by poster"""
+        import compare_formats
+
+        report_file = self.test_dir / 'poster-report.json'
+        png = {'width': 100, 'height': 149, 'setting': 256, 'bytes': 13000, 'ssim': 0.75}
+        webp = {'width': 160, 'height': 238, 'setting': 65, 'bytes': 14000, 'ssim': 0.91}
+        poster_quality.write_report('png', {'kfp1.png': {'chosen': png, 'candidates': [png]},
+                                            'kfp2.png': {'chosen': None, 'candidates': []}},
+                                    15 * 1024, report_file)
+        poster_quality.write_report('webp', {'kfp1.png': {'chosen': webp, 'candidates': [webp]}},
+                                    15 * 1024, report_file)
+
+        report = json.loads(report_file.read_text())
+        self.assertEqual(sorted(report['formats']), ['png', 'webp'])
+        self.assertEqual(compare_formats.compare(report), [('kfp1.png', png, webp)])
+        with patch('sys.stdout'):
+            self.assertEqual(compare_formats.main(report_file), 0)
+            self.assertEqual(compare_formats.main(self.test_dir / 'missing.json'), 1)
+
+
+if __name__ == '__main__':
+    # Run tests with verbose output
+    unittest.main(verbosity=2)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test suite for precompressed JSON output and the local server
+
+Tests verify:
+1. Endpoints are minified and their sidecars decompress to the same bytes
+2. Unchanged catalog sidecars are not rewritten
+3. Files too small to benefit get no sidecars, and stale ones are removed
+4. Accept-Encoding negotiation honors quality values
+5. The server answers with the sidecar only when the client accepts it
+"""
+
+import gzip
+import json
+import threading
+import unittest
+import urllib.request
+import tempfile
+import shutil
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+# Add current directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+import generate_random_quote as gq
+import precompress
+import serve_quotes
+
+
+PROJECT_ROOT = Path(__file__).parent
+
+
+class TestPrecompress(unittest.TestCase):
+    """Test suite for minified output and sidecars"""
+
+    def setUp(self):
+        """Point the generator at a temporary output directory"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.patchers = [
+            patch.object(gq, 'HISTORY_FILE', self.test_dir / '.quote-history.json'),
+            patch.object(gq, 'OUTPUT_ROOT', self.test_dir),
+            patch('sys.stdout'),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        for patcher in reversed(self.patchers):
+            patcher.stop()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_endpoint_is_minified_with_sidecars(self):
+        """Test that the endpoint and its sidecars hold the same minified JSON"""
+        quote = gq.save_random_quote(theme='wisdom')
+        endpoint = self.test_dir / 'api' / 'random-quote-wisdom.json'
+
+        data = endpoint.read_bytes()
+        self.assertEqual(json.loads(data), quote)
+        self.assertNotIn(b'\n', data)
+        self.assertEqual(gzip.decompress(precompress.sidecar_path(endpoint, 'gzip').read_bytes()), data)
+        if precompress.brotli is not None:
+            br = precompress.sidecar_path(endpoint, 'br').read_bytes()
+            self.assertEqual(precompress.brotli.decompress(br), data)
+
+    def test_catalog_sidecars_only_written_when_changed(self):
+        """Test that catalog sidecars are deterministic and skipped when current"""
+        first = gq.publish_catalog_sidecars()
+        self.assertGreater(first, 0)
+        gz_file = precompress.sidecar_path(self.test_dir / 'quotes.json', 'gzip')
+        catalog = json.loads(gzip.decompress(gz_file.read_bytes()))
+        self.assertEqual(len(catalog), len(gq.load_quotes()))
+
+        self.assertEqual(gq.publish_catalog_sidecars(), 0)
+        self.assertEqual(precompress.compress(b'same', 'gzip'), precompress.compress(b'same', 'gzip'))
+
+    def test_small_file_has_no_sidecars(self):
+        """Test that a tiny document is published without sidecars"""
+        path = self.test_dir / 'shard.json'
+        precompress.write_json(path, {'panda': [1, 2]})
+        self.assertFalse(precompress.sidecar_path(path, 'gzip').exists())
+        self.assertEqual(precompress.write_json(path, {'panda': [1, 2]}, skip_unchanged=True), 0)
+
+        # A document that shrinks below the minimum drops its old sidecars
+        precompress.write_json(path, {'panda': list(range(200))})
+        self.assertTrue(precompress.sidecar_path(path, 'gzip').exists())
+        precompress.write_json(path, {'panda': [1]}, skip_unchanged=True)
+        for encoding in precompress.SIDECARS:
+            self.assertFalse(precompress.sidecar_path(path, encoding).exists())
+
+    def test_negotiate_encoding(self):
+        """Test that quality values and wildcards are honored"""
+        available = ['br', 'gzip']
+        self.assertEqual(serve_quotes.negotiate_encoding('gzip, deflate, br', available), 'br')
+        self.assertEqual(serve_quotes.negotiate_encoding('br;q=0.5, gzip', available), 'gzip')
+        self.assertEqual(serve_quotes.negotiate_encoding('br;q=0, *', ['br', 'gzip']), 'gzip')
+        self.assertEqual(serve_quotes.negotiate_encoding('gzip', ['br']), None)
+        self.assertEqual(serve_quotes.negotiate_encoding(None, available), None)
+
+
+class TestServeQuotes(unittest.TestCase):
+    """Test suite for serving sidecars over HTTP"""
+
+    def setUp(self):
+        """Serve a temporary directory with one precompressed file"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.document = {'quotes': [{'text': 'There are no accidents.', 'author': 'Master Oogway'}] * 20}
+        precompress.write_json(self.test_dir / 'quote.json', self.document)
+
+        self.server = serve_quotes.make_server(self.test_dir, port=0)
+        self.server.RequestHandlerClass.log_message = lambda *args: None
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/quote.json"
+
+    def tearDown(self):
+        """Stop the server and clean up"""
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def fetch(self, accept_encoding=None):
+        request = urllib.request.Request(self.url)
+        if accept_encoding:
+            request.add_header('Accept-Encoding', accept_encoding)
+        with urllib.request.urlopen(request) as response:
+            return response.headers, response.read()
+
+    def test_gzip_sidecar_served(self):
+        """Test that a gzip-accepting client gets the .gz copy"""
+        headers, body = self.fetch('gzip')
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertEqual(headers['Vary'], 'Accept-Encoding')
+        self.assertEqual(headers['Content-Type'], 'application/json')
+        self.assertEqual(json.loads(gzip.decompress(body)), self.document)
+
+    def test_identity_without_accept_encoding(self):
+        """Test that other clients get the plain file"""
+        headers, body = self.fetch()
+        self.assertIsNone(headers['Content-Encoding'])
+        self.assertEqual(headers['Vary'], 'Accept-Encoding')
+        self.assertEqual(json.loads(body), self.document)
+
+
+if __name__ == '__main__':
+    # Run tests with verbose output
+    unittest.main(verbosity=2)
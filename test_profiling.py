@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test suite for the shared --profile option
+
+Tests verify:
+1. Profile options are stripped from the script's arguments
+2. --profile never consumes a positional argument
+3. run_main() hands main() the remaining arguments and writes profiles
+"""
+
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+# Add current directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+import profiling
+
+
+class TestProfiling(unittest.TestCase):
+    """Test suite for parse_profile_args() and run_main()"""
+
+    def setUp(self):
+        """Create a temporary directory and keep sys.argv"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.argv = patch.object(sys, 'argv', list(sys.argv))
+        self.argv.start()
+
+    def tearDown(self):
+        """Restore sys.argv and clean up temporary directory"""
+        self.argv.stop()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_strips_profile_options(self):
+        """Test that profile options are removed and the rest kept in order"""
+        options, remaining = profiling.parse_profile_args(
+            ['--all', '--profile-mode', 'memory', '--profile-top', '5', '--profile-dir', 'out', '--history', 'h.db'])
+        self.assertTrue(options.profile)
+        self.assertEqual((options.profile_mode, options.profile_top, options.profile_dir), ('memory', 5, Path('out')))
+        self.assertEqual(remaining, ['--all', '--history', 'h.db'])
+
+        options, remaining = profiling.parse_profile_args(['--all'])
+        self.assertFalse(options.profile)
+        self.assertEqual(remaining, ['--all'])
+
+    def test_profile_before_positional(self):
+        """Test that --profile leaves a following theme argument to the script"""
+        for argv in (['--profile', 'wisdom'], ['wisdom', '--profile']):
+            with self.subTest(argv=argv):
+                options, remaining = profiling.parse_profile_args(argv)
+                self.assertTrue(options.profile)
+                self.assertEqual(options.profile_mode, 'cpu')
+                self.assertEqual(remaining, ['wisdom'])
+
+    def test_invalid_mode(self):
+        """Test that an unknown profile mode is rejected"""
+        with patch('sys.stderr'), self.assertRaises(SystemExit):
+            profiling.parse_profile_args(['--profile-mode', 'wisdom'])
+
+    def test_run_main_without_profile(self):
+        """Test that main() sees only its own arguments and its return value is kept"""
+        seen = []
+
+        def main():
+            seen.append(list(sys.argv))
+            return 3
+
+        self.assertEqual(profiling.run_main(main, ['generate_random_quote.py', 'wisdom']), 3)
+        self.assertEqual(seen, [['generate_random_quote.py', 'wisdom']])
+        self.assertFalse(self.test_dir.joinpath('profiles').exists())
+
+    def test_run_main_writes_profiles(self):
+        """Test that a profiled run writes the CPU profile and memory snapshot"""
+        seen = []
+
+        def main():
+            seen.append(list(sys.argv))
+            return 0
+
+        with patch('sys.stdout'):
+            code = profiling.run_main(main, ['generate_random_quote.py', '--profile', 'wisdom',
+                                             '--profile-mode', 'all', '--profile-dir', str(self.test_dir)])
+        self.assertEqual(code, 0)
+        self.assertEqual(seen, [['generate_random_quote.py', 'wisdom']])
+        suffixes = sorted(path.suffix for path in self.test_dir.iterdir())
+        self.assertEqual(suffixes, ['.prof', '.tracemalloc'])
+        self.assertTrue(all(path.name.startswith('generate_random_quote-') for path in self.test_dir.iterdir()))
+
+
+if __name__ == '__main__':
+    # Run tests with verbose output
+    unittest.main(verbosity=2)
@@ -8,6 +8,7 @@ Tests verify:
 3. Quote filtering (excluding recently used quotes)
 4. Fallback behavior when all quotes are used
 5. Timestamp validation
+6. The shared catalog is never modified
 """
 
 import json
@@ -267,6 +268,23 @@ class TestQuoteHistoryIntegration(unittest.TestCase):
         final_loaded = gq.load_quote_history()
         self.assertEqual(len(final_loaded['quotes']), 1)
 
+    def test_shared_catalog_is_not_modified(self):
+        """Test that generating quotes leaves the cached catalog unchanged"""
+        catalog = gq.load_quotes()
+        snapshot = [q.to_dict() for q in catalog]
+        
+        with patch('sys.stdout'):
+            quote = gq.generate_random_quote('humor')
+            gq.generate_random_quote()
+        
+        # The catalog is loaded once and shared, and records are read-only
+        self.assertIs(gq.load_quotes(), catalog)
+        self.assertEqual([q.to_dict() for q in catalog], snapshot)
+        self.assertIn('updated_on', quote)
+        self.assertNotIn('updated_on', catalog[0]._fields)
+        with self.assertRaises(AttributeError):
+            catalog[0].text = 'changed'
+
 
 if __name__ == '__main__':
     # Run tests with verbose output
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test suite for regional rollover
+
+Tests verify:
+1. Region configs are validated (names, time zones)
+2. Local dates and next rollovers follow each time zone, including DST
+3. Only regions whose local day started are generated
+4. Regional endpoints carry the region, time zone and local date
+"""
+
+import json
+import unittest
+from datetime import datetime, timezone
+import tempfile
+import shutil
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+# Add current directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+import generate_random_quote as gq
+import regional_rollover
+
+
+REGIONS = [
+    {'name': 'americas', 'timezone': 'America/New_York'},
+    {'name': 'asia-pacific', 'timezone': 'Asia/Tokyo', 'days_before_reuse': 7},
+]
+
+
+def utc(text):
+    return datetime.fromisoformat(text).replace(tzinfo=timezone.utc)
+
+
+class TestRegionalRollover(unittest.TestCase):
+    """Test suite for per-region rollover"""
+
+    def setUp(self):
+        """Create temporary output and state directories"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.state_dir = self.test_dir / '.regional'
+        self.stdout = patch('sys.stdout')
+        self.stdout.start()
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        self.stdout.stop()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def run_at(self, moment, force=()):
+        return regional_rollover.run(REGIONS, utc(moment), self.test_dir, self.state_dir, force)
+
+    def test_invalid_configs(self):
+        """Test that bad names, duplicates and unknown time zones are rejected"""
+        config_file = self.test_dir / 'regions.json'
+        for regions in (
+            [],
+            [{'name': 'Asia Pacific', 'timezone': 'Asia/Tokyo'}],
+            [{'name': 'search', 'timezone': 'Asia/Tokyo'}],
+            [{'name': 'apac', 'timezone': 'Asia/Tokyo'}, {'name': 'apac', 'timezone': 'UTC'}],
+            [{'name': 'apac', 'timezone': 'Mars/Olympus_Mons'}],
+            [{'name': 'apac', 'timezone': 'Asia/Tokyo', 'days_before_reuse': -1}],
+        ):
+            with self.subTest(regions=regions):
+                config_file.write_text(json.dumps({'regions': regions}))
+                with self.assertRaises(ValueError):
+                    regional_rollover.load_regions(config_file)
+
+        self.assertEqual(len(regional_rollover.load_regions(Path(__file__).parent / 'regions.json')), 4)
+
+    def test_local_dates_and_rollovers(self):
+        """Test local dates and the next local midnight across a DST change"""
+        now = utc('2026-10-19T14:30:00')
+        self.assertEqual(regional_rollover.local_date('Asia/Tokyo', now), '2026-10-19')
+        self.assertEqual(regional_rollover.next_rollover('Asia/Tokyo', now), utc('2026-10-19T15:00:00'))
+
+        # New York switches to daylight time on 2026-03-08
+        self.assertEqual(regional_rollover.next_rollover('America/New_York', utc('2026-03-07T12:00:00')),
+                         utc('2026-03-08T05:00:00'))
+        self.assertEqual(regional_rollover.next_rollover('America/New_York', utc('2026-03-08T12:00:00')),
+                         utc('2026-03-09T04:00:00'))
+
+    def test_only_due_regions_generated(self):
+        """Test that each region rolls over once, at its own midnight"""
+        self.assertEqual(self.run_at('2026-10-19T14:30:00'), (['americas', 'asia-pacific'], []))
+        self.assertEqual(self.run_at('2026-10-19T14:45:00'), ([], ['americas', 'asia-pacific']))
+
+        # Midnight in Tokyo; still afternoon in New York
+        self.assertEqual(self.run_at('2026-10-19T15:05:00'), (['asia-pacific'], ['americas']))
+        # Midnight in New York (EDT, UTC-4)
+        self.assertEqual(self.run_at('2026-10-20T04:05:00'), (['americas'], ['asia-pacific']))
+
+        self.assertEqual(self.run_at('2026-10-20T04:10:00', force=['americas']), (['americas'], ['asia-pacific']))
+
+        state = regional_rollover.load_state(self.state_dir)
+        self.assertEqual(state['asia-pacific']['local_date'], '2026-10-20')
+        self.assertEqual(state['americas']['local_date'], '2026-10-20')
+
+    def test_regional_endpoints(self):
+        """Test that regional endpoints hold the region fields and use their own history"""
+        self.run_at('2026-10-19T15:05:00')
+        themes = ['all'] + sorted(gq.theme_index(gq.load_quotes()))
+        for region in ('americas', 'asia-pacific'):
+            for theme in themes:
+                with self.subTest(region=region, theme=theme):
+                    endpoint = self.test_dir / 'api' / region / f'random-quote-{theme}.json'
+                    quote = json.loads(endpoint.read_text(encoding='utf-8'))
+                    self.assertEqual(quote['region'], region)
+                    self.assertIn('layouts', quote)
+
+        tokyo = json.loads((self.test_dir / 'api' / 'asia-pacific' / 'random-quote-all.json').read_text())
+        self.assertEqual((tokyo['timezone'], tokyo['local_date']), ('Asia/Tokyo', '2026-10-20'))
+        history = gq.load_quote_history(self.state_dir / 'americas.quote-history.json')
+        self.assertEqual(len(history['quotes']), len(themes))
+        self.assertFalse((self.test_dir / 'api' / 'random-quote-all.json').exists())
+
+
+if __name__ == '__main__':
+    # Run tests with verbose output
+    unittest.main(verbosity=2)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test suite for the rotation simulator
+
+Tests verify:
+1. Endpoints run 'all' first, then every theme in sorted order
+2. Large pools never repeat a quote inside the reuse window
+3. Small pools reset the shared history and repeat early
+4. Weighted simulation follows the weights, like the generator
+5. Window recommendations and the JSON report
+"""
+
+import json
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+# Add current directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+import rotation_simulator
+from quote_record import Quote
+
+
+def make_quotes(themes):
+    """Synthetic catalog: theme -> number of quotes"""
+    quotes = []
+    for theme, count in themes.items():
+        for i in range(count):
+            author = 'Master Oogway' if i % 2 else 'Po'
+            quotes.append(Quote(len(quotes) + 1, f'{theme} quote {i}', author, 'Kung Fu Panda', theme))
+    return quotes
+
+
+@unittest.skipUnless(rotation_simulator.np is not None, 'numpy not installed')
+class TestRotationSimulator(unittest.TestCase):
+    """Test suite for the vectorized rotation simulation"""
+
+    def setUp(self):
+        """Create a temporary directory"""
+        self.test_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_endpoint_order(self):
+        """Test that 'all' comes first and themes follow in sorted order"""
+        quotes = make_quotes({'Wisdom': 3, 'Humor': 2})
+        endpoints = rotation_simulator.build_endpoints(quotes)
+        self.assertEqual(list(endpoints), ['all', 'humor', 'wisdom'])
+        self.assertEqual(list(endpoints['all']), list(range(5)))
+        self.assertEqual(list(endpoints['humor']), [3, 4])
+
+    def test_large_pool_respects_window(self):
+        """Test that a pool larger than the window never resets or repeats early"""
+        # 'all' + 'wisdom' pick 2 quotes a day: 24 quotes outlast a 7-day window
+        quotes = make_quotes({'Wisdom': 24})
+        result = rotation_simulator.simulate(quotes, days=200, seeds=50, window=7)
+        for name, stats in result['endpoints'].items():
+            with self.subTest(endpoint=name):
+                self.assertEqual(stats['resets_per_year'], 0.0)
+                self.assertGreaterEqual(stats['gap_min'], 7)
+                self.assertEqual(stats['repeats_within_window'], 0.0)
+
+    def test_small_pool_resets_shared_history(self):
+        """Test that a tiny theme exhausts and resets the history"""
+        quotes = make_quotes({'Wisdom': 30, 'Villainy': 2})
+        result = rotation_simulator.simulate(quotes, days=100, seeds=20, window=7)
+        villainy = result['endpoints']['villainy']
+        self.assertGreater(villainy['resets_per_year'], 0)
+        self.assertLess(villainy['gap_min'], 7)
+        self.assertGreater(villainy['repeats_within_window'], 0)
+
+    def test_deterministic_for_seed(self):
+        """Test that the same seed gives the same results"""
+        quotes = make_quotes({'Wisdom': 10, 'Humor': 5})
+        first = rotation_simulator.simulate(quotes, days=60, seeds=10, window=5, seed=3)
+        second = rotation_simulator.simulate(quotes, days=60, seeds=10, window=5, seed=3)
+        self.assertEqual(first, second)
+
+    def test_weighted_selection(self):
+        """Test that weights shift exposure and weight 0 falls back to uniform picks"""
+        quotes = make_quotes({'Wisdom': 20})
+        rules = {'author': {'Master Oogway': 5.0}}
+        # One day: every pool is fresh, so picks follow the weights alone
+        result = rotation_simulator.simulate(quotes, days=1, seeds=500, window=30, rules=rules)
+        exposure = result['exposure']
+        oogway = sum(exposure[str(q.id)] for q in quotes if q.author == 'Master Oogway')
+        po = sum(exposure[str(q.id)] for q in quotes if q.author == 'Po')
+        self.assertGreater(oogway, po)
+
+        # Only weight-0 quotes left: still picked, no reset
+        rules = {'author': {'Po': 0.0}}
+        result = rotation_simulator.simulate(quotes, days=10, seeds=20, window=30, rules=rules)
+        self.assertEqual(result['endpoints']['all']['resets_per_year'], 0.0)
+        self.assertTrue(all(exposure > 0 for exposure in result['exposure'].values()))
+
+    def test_recommend_windows(self):
+        """Test that the largest window under the reset limit is recommended"""
+        results = [
+            {'window': 30, 'endpoints': {'all': {'resets_per_year': 0.0}, 'villainy': {'resets_per_year': 180.0}}},
+            {'window': 7, 'endpoints': {'all': {'resets_per_year': 0.0}, 'villainy': {'resets_per_year': 50.0}}},
+        ]
+        self.assertEqual(rotation_simulator.recommend_windows(results, max_resets=1.0),
+                         {'all': 30, 'villainy': None})
+
+    def test_main_writes_report(self):
+        """Test that the CLI writes the JSON report for the real catalog"""
+        output = self.test_dir / 'simulation.json'
+        with patch('sys.stdout'):
+            code = rotation_simulator.main(['--days', '30', '--seeds', '5', '--windows', '7,14',
+                                            '--output', str(output)])
+        self.assertEqual(code, 0)
+        report = json.loads(output.read_text())
+        self.assertEqual([r['window'] for r in report['results']], [7, 14])
+        self.assertIn('all', report['recommended'])
+
+
+if __name__ == '__main__':
+    # Run tests with verbose output
+    unittest.main(verbosity=2)
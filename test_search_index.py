@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Test suite for the sharded search index
+
+Tests verify:
+1. Text is tokenized without accents, apostrophes, short words or stopwords
+   (a stopword still being typed is kept as a prefix)
+2. Queries match every word, the last one as a prefix, and facet filters
+3. The index is only rebuilt when the catalog changes, and stale shards go away
+4. The local server answers /api/search from the published index
+"""
+
+import json
+import threading
+import unittest
+import urllib.error
+import urllib.request
+import tempfile
+import shutil
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+# Add current directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+import generate_random_quote as gq
+import search_index
+import serve_quotes
+from quote_record import Quote
+
+
+PROJECT_ROOT = Path(__file__).parent
+
+
+def words(text):
+    return set(search_index.tokenize(text))
+
+
+class TestSearchIndex(unittest.TestCase):
+    """Test suite for building and querying the index"""
+
+    def setUp(self):
+        """Publish the real catalog's index to a temporary directory"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.index_dir = self.test_dir / 'search'
+        self.quotes = gq.load_quotes(PROJECT_ROOT / 'quotes.json')
+        search_index.publish(self.quotes, self.index_dir)
+        self.index = search_index.SearchIndex(self.index_dir)
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_tokenize(self):
+        """Test that accents, apostrophes and one-letter words are dropped"""
+        self.assertEqual(search_index.tokenize("I'm the Dragon Wárrior, Po!"), ['im', 'the', 'dragon', 'warrior', 'po'])
+        # Every combining mark goes, not just the U+0300 block (U+20DD is enclosing)
+        self.assertEqual(search_index.tokenize('Po\u20dd Tigre\u0301ss'), ['po', 'tigress'])
+        self.assertEqual(search_index.decode_postings(search_index.encode_postings([3, 10, 12])), [3, 10, 12])
+        self.assertEqual(search_index.encode_postings([3, 10, 12]), [3, 7, 2])
+
+    def test_query_matches_every_word(self):
+        """Test that results contain all query words and nothing is missed"""
+        result = self.index.search('dragon warrior', limit=100)
+        expected = [q.id for q in self.quotes if {'dragon', 'warrior'} <= words(q.text)]
+        self.assertTrue(expected)
+        self.assertEqual([r['id'] for r in result['results']], sorted(set(expected)))
+        self.assertEqual(result['total'], len(set(expected)))
+
+    def test_last_word_matches_prefix(self):
+        """Test search-as-you-type on the last word"""
+        result = self.index.search('drag', limit=100)
+        self.assertTrue(result['results'])
+        for quote in result['results']:
+            self.assertTrue(any(word.startswith('drag') for word in words(quote['text'])))
+
+    def test_stopwords_and_unknown_words(self):
+        """Test that stopword-only and unknown queries match nothing"""
+        self.assertEqual(self.index.search('the ')['total'], 0)
+        self.assertEqual(self.index.search('the dragon.')['total'], self.index.search('dragon')['total'])
+        self.assertEqual(self.index.search('skadoosh-nonexistent')['total'], 0)
+        self.assertEqual(self.index.search('')['total'], 0)
+
+    def test_stopword_being_typed(self):
+        """Test that a last word that is a stopword is still matched as a prefix"""
+        stopwords = search_index.STOPWORDS
+        self.assertEqual(search_index.query_terms('master the', stopwords), ['master', 'the'])
+        self.assertEqual(search_index.query_terms('master the ', stopwords), ['master'])
+        self.assertEqual(search_index.query_terms('the dr', stopwords), ['dr'])
+
+        result = self.index.search('the', limit=100)
+        expected = {q.id for q in self.quotes if any(w.startswith('the') and w not in stopwords for w in words(q.text))}
+        self.assertTrue(expected)
+        self.assertEqual({r['id'] for r in result['results']}, expected)
+
+    def test_facet_filters_and_counts(self):
+        """Test that filters are case-insensitive and facet counts add up"""
+        result = self.index.search(author='master oogway', theme='WISDOM', limit=100)
+        expected = [q.id for q in self.quotes if q.author == 'Master Oogway' and q.theme == 'Wisdom']
+        self.assertEqual(result['total'], len(set(expected)))
+        self.assertEqual(result['facets']['author'], {'Master Oogway': result['total']})
+        self.assertEqual(sum(result['facets']['movie'].values()), result['total'])
+
+        page = self.index.search(author='Po', limit=2, offset=1)
+        self.assertEqual(len(page['results']), 2)
+        self.assertEqual(page['results'][0]['id'], self.index.search(author='Po', limit=2)['results'][1]['id'])
+
+        with self.assertRaises(ValueError):
+            self.index.search(colour='red')
+
+    def test_rebuild_only_when_catalog_changes(self):
+        """Test that a current index is skipped and stale shards are removed"""
+        catalog = self.test_dir / 'quotes.json'
+        catalog.write_text(json.dumps([q.to_dict() for q in self.quotes]), encoding='utf-8')
+        digest = search_index.catalog_digest(catalog)
+        self.assertIsNotNone(search_index.publish(self.quotes, self.index_dir, digest))
+        self.assertIsNone(search_index.publish(self.quotes, self.index_dir, digest))
+
+        # One new quote: only its shards and the manifest change
+        extra = Quote(9999, 'Kaboomzilla!', 'Po', 'Kung Fu Panda', 'Humor')
+        stats = search_index.publish(self.quotes + (extra,), self.index_dir, 'changed')
+        self.assertLess(stats['written'], stats['files'] / 2)
+        self.assertEqual(self.index.search('kaboomzilla')['results'][0]['id'], 9999)
+
+        stats = search_index.publish(self.quotes, self.index_dir, 'original')
+        self.assertGreater(stats['removed'], 0)
+        self.assertFalse((self.index_dir / 'terms' / 'ka.json').exists())
+        self.assertEqual(self.index.search('kaboomzilla')['total'], 0)
+
+    def test_forced_build_records_digest(self):
+        """Test that build --force rebuilds but still records the catalog digest"""
+        catalog = self.test_dir / 'quotes.json'
+        catalog.write_text(json.dumps([q.to_dict() for q in self.quotes]), encoding='utf-8')
+        digest = search_index.catalog_digest(catalog)
+        self.assertIsNotNone(search_index.publish(self.quotes, self.index_dir, digest))
+        self.assertIsNotNone(search_index.publish(self.quotes, self.index_dir, digest, force=True))
+
+        with patch('sys.stdout'):
+            search_index.main(['build', '--force', '--catalog', str(catalog), '--output', str(self.index_dir)])
+        self.assertEqual(search_index.read_manifest(self.index_dir)['catalog'], digest)
+        # The next normal build sees a current index
+        self.assertIsNone(search_index.publish(self.quotes, self.index_dir, digest))
+
+    def test_generator_publishes_index(self):
+        """Test that the generator publishes the index under api/search"""
+        with patch.object(gq, 'OUTPUT_ROOT', self.test_dir), patch('sys.stdout'):
+            self.assertIsNotNone(gq.publish_search_index())
+            self.assertIsNone(gq.publish_search_index())
+        manifest = search_index.read_manifest(self.test_dir / 'api' / 'search')
+        self.assertEqual(manifest['catalog'], search_index.catalog_digest(gq.QUOTES_FILE))
+        self.assertEqual(manifest['quotes'], len([q for q in self.quotes if q.id is not None]))
+
+
+class TestSearchServer(unittest.TestCase):
+    """Test suite for the /api/search endpoint"""
+
+    def setUp(self):
+        """Serve a temporary directory with a published index"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.quiet = patch.object(serve_quotes.PrecompressedHandler, 'log_message')
+        self.quiet.start()
+        self.server = serve_quotes.make_server(self.test_dir, port=0)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api/search"
+
+    def tearDown(self):
+        """Stop the server and clean up"""
+        self.server.shutdown()
+        self.server.server_close()
+        self.quiet.stop()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def fetch(self, query):
+        try:
+            with urllib.request.urlopen(f"{self.url}?{query}") as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    def test_search_endpoint(self):
+        """Test queries, bad parameters and a missing index"""
+        status, body = self.fetch('q=peace')
+        self.assertEqual(status, 503)
+        self.assertIn('error', body)
+
+        search_index.publish(gq.load_quotes(PROJECT_ROOT / 'quotes.json'), self.test_dir / 'api' / 'search')
+        status, body = self.fetch('q=inner+peace&limit=1')
+        self.assertEqual(status, 200)
+        self.assertGreaterEqual(body['total'], 1)
+        self.assertEqual(len(body['results']), 1)
+        self.assertIn('peace', words(body['results'][0]['text']))
+
+        status, body = self.fetch('q=peace&limit=many')
+        self.assertEqual(status, 400)
+
+
+if __name__ == '__main__':
+    # Run tests with verbose output
+    unittest.main(verbosity=2)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test suite for precomputed quote text layouts
+
+Tests verify:
+1. Every quote in quotes.json fits every layout without overflowing
+2. Line breaks preserve the quote text
+3. Larger boxes never get a smaller font than they need
+4. Generated quotes carry the precomputed layouts
+"""
+
+import json
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+# Add current directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+import text_fit
+import generate_random_quote as gq
+
+
+class TestTextFit(unittest.TestCase):
+    """Test suite for offline text fitting"""
+
+    def setUp(self):
+        """Load the quote catalog"""
+        with open(Path(__file__).parent / 'quotes.json', 'r', encoding='utf-8') as f:
+            self.quotes = json.load(f)
+
+    def test_no_precomputed_layout_overflows(self):
+        """Test that every quote/layout combination fits its quote box"""
+        for quote in self.quotes:
+            layouts = text_fit.fit_quote_layouts(quote['text'])
+            for layout in text_fit.LAYOUT_BOXES:
+                with self.subTest(id=quote['id'], layout=layout):
+                    self.assertIn(layout, layouts)
+                    fitted = layouts[layout]
+                    self.assertTrue(text_fit.fits(layout, fitted['size'], fitted['lines']))
+
+    def test_lines_preserve_text(self):
+        """Test that joining the line breaks gives back the original words"""
+        for quote in self.quotes:
+            for fitted in text_fit.fit_quote_layouts(quote['text']).values():
+                self.assertEqual(' '.join(fitted['lines']).split(), quote['text'].split())
+
+    def test_short_quote_uses_largest_size(self):
+        """Test that a short quote is not shrunk below the layout maximum"""
+        fitted = text_fit.fit_layout('Skadoosh.', 'full')
+        self.assertEqual(fitted['size'], text_fit.LAYOUT_BOXES['full']['max_size'])
+        self.assertEqual(fitted['lines'], ['Skadoosh.'])
+
+    def test_unfittable_text_is_left_out(self):
+        """Test that text too long for any size falls back to data-value-fit"""
+        layouts = text_fit.fit_quote_layouts('kung fu ' * 500)
+        self.assertNotIn('quadrant', layouts)
+
+    def test_overflowing_lines_detected(self):
+        """Test that fits() rejects a line wider than the box"""
+        self.assertFalse(text_fit.fits('quadrant', 'value--large', ['x' * 200]))
+
+
+class TestGeneratedLayouts(unittest.TestCase):
+    """Test that the generator emits precomputed layouts"""
+
+    def setUp(self):
+        """Create a temporary directory for test files"""
+        self.test_dir = tempfile.mkdtemp()
+        self.history_patcher = patch.object(gq, 'HISTORY_FILE', Path(self.test_dir) / '.quote-history.json')
+        self.history_patcher.start()
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        self.history_patcher.stop()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_generated_quote_has_layouts(self):
+        """Test that generate_random_quote attaches layouts for every template"""
+        quote = gq.generate_random_quote()
+        self.assertEqual(set(quote['layouts']), set(text_fit.LAYOUT_BOXES))
+
+
+if __name__ == '__main__':
+    # Run tests with verbose output
+    unittest.main(verbosity=2)
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Test suite for watch mode
+
+Tests verify:
+1. Rules run in dependency order and only for the files that changed
+2. Files written by a rule do not trigger it again
+3. Single posters are re-embedded without touching the other blocks
+4. Catalog edits regenerate the endpoints and index
+5. Template checks catch unbalanced Liquid block tags
+"""
+
+import json
+import os
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+# Add current directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+import embed_posters
+import embed_posters_bw_outline
+import generate_random_quote as gq
+import watch
+from watch import Rule
+
+
+PROJECT_ROOT = Path(__file__).parent
+
+
+def touch(path, text):
+    """Write a file and move its mtime forward so the change is always seen"""
+    path.write_text(text)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestWatch(unittest.TestCase):
+    """Test suite for the dependency graph and the watcher"""
+
+    def setUp(self):
+        """Create a temporary directory and skip the settle delay"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.settle = patch.object(watch, 'SETTLE_TIME', 0)
+        self.settle.start()
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        self.settle.stop()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def chain(self):
+        """source -> middle -> final, and an unrelated rule"""
+        source, middle, final, other = (self.test_dir / name for name in ('source', 'middle', 'final', 'other'))
+        for path in (source, middle, final, other):
+            path.write_text('0')
+        runs = []
+
+        def step(name, output=None):
+            def build():
+                runs.append(name)
+                if output:
+                    touch(output, output.read_text() + '1')
+            return build
+
+        rules = [
+            Rule('final', (middle,), (final,), step('final', final)),
+            Rule('middle', (source,), (middle,), step('middle', middle)),
+            Rule('other', (other,), (), step('other')),
+        ]
+        return rules, runs, (source, middle, final, other)
+
+    def test_build_order(self):
+        """Test that producers run before consumers and cycles are rejected"""
+        rules, _, (source, middle, _, other) = self.chain()
+        self.assertEqual([r.name for r in watch.order_rules(rules)], ['middle', 'final', 'other'])
+        self.assertEqual(watch.affected(rules, {source}), ['middle', 'final'])
+        self.assertEqual(watch.affected(rules, {middle}), ['final'])
+        self.assertEqual(watch.affected(rules, {other}), ['other'])
+
+        cycle = [Rule('a', (source,), (middle,), None), Rule('b', (middle,), (source,), None)]
+        with self.assertRaises(ValueError):
+            watch.order_rules(cycle)
+
+    def test_watcher_runs_affected_rules_once(self):
+        """Test that an edit runs its rules once and their outputs do not retrigger them"""
+        rules, runs, (source, _, _, other) = self.chain()
+        ordered = watch.order_rules(rules)
+        watcher = watch.Watcher(graph=lambda: ordered, log=lambda line: None)
+        self.assertEqual(watcher.poll(), [])
+
+        touch(source, 'edited')
+        self.assertEqual([name for name, _, _ in watcher.poll()], ['middle', 'final'])
+        self.assertEqual(watcher.poll(), [])
+        self.assertEqual(runs, ['middle', 'final'])
+
+        touch(other, 'edited')
+        self.assertEqual([name for name, _, _ in watcher.poll()], ['other'])
+
+    def test_failed_rule_stops_its_chain(self):
+        """Test that a failing rule is reported and its consumers do not run"""
+        rules, runs, (source, _, _, _) = self.chain()
+
+        def fail():
+            raise RuntimeError('encoder crashed')
+
+        rules[1] = rules[1]._replace(build=fail)
+        ordered = watch.order_rules(rules)
+        watcher = watch.Watcher(graph=lambda: ordered, log=lambda line: None)
+        touch(source, 'edited')
+        self.assertEqual([(name, error) for name, _, error in watcher.poll()], [('middle', 'encoder crashed')])
+        self.assertEqual(runs, [])
+
+    def test_embed_single_poster(self):
+        """Test that re-embedding one poster leaves the other blocks alone"""
+        shared_file = self.test_dir / 'shared-posters.liquid'
+        shared_file.write_text(
+            '{%- capture poster_kfp_1 -%}\nold-1\n{%- endcapture -%}\n'
+            '{%- capture poster_kfp_2 -%}\nold-2\n{%- endcapture -%}\n')
+        (self.test_dir / embed_posters.POSTER_FILES[1]).write_bytes(b'\xff\xd8poster')
+
+        with patch('sys.stdout'):
+            self.assertTrue(embed_posters.embed_poster(2, self.test_dir, shared_file))
+            self.assertFalse(embed_posters.embed_poster(1, self.test_dir, shared_file))
+            self.assertFalse(embed_posters.embed_poster(5, self.test_dir, shared_file))
+        content = shared_file.read_text()
+        self.assertIn('old-1', content)
+        self.assertIn('data:image/jpeg;base64,/9hwb3N0ZXI=\n{%- endcapture -%}', content)
+        self.assertNotIn('old-2', content)
+
+    def test_embed_poster_argument(self):
+        """Test that a bad poster number is a usage error, not a traceback"""
+        for main in (embed_posters.main, embed_posters_bw_outline.main):
+            for argv in (['abc'], ['0'], [str(len(embed_posters.POSTER_FILES) + 1)]):
+                with self.subTest(main=main.__module__, argv=argv), patch('sys.stderr'), \
+                        self.assertRaises(SystemExit) as context:
+                    main(argv)
+                self.assertEqual(context.exception.code, 2)
+
+    def test_poster_edit_graph(self):
+        """Test which rules the real graph runs for a poster and a catalog edit"""
+        rules = watch.build_graph(encode=True)
+        bw_source = embed_posters.PROJECT_ROOT / 'assets' / 'posters-small-bw-outline' / \
+            'kung-fu-panda-3-poster-bw-outline.png'
+        self.assertEqual(watch.affected(rules, {bw_source}),
+                         ['encode-bw:3', 'embed-bw:3', 'template:shared-posters'])
+        self.assertEqual(watch.affected(rules, {embed_posters.POSTER_DIR / embed_posters.POSTER_FILES[0]}),
+                         ['embed:1', 'template:shared-posters'])
+        self.assertEqual(watch.affected(rules, {Path(gq.QUOTES_FILE)}), ['catalog'])
+
+    def test_catalog_edit_rebuilds_endpoints(self):
+        """Test that editing the catalog regenerates endpoints and the search index"""
+        quotes_file = self.test_dir / 'quotes.json'
+        quotes = json.loads((PROJECT_ROOT / 'quotes.json').read_text(encoding='utf-8'))
+        quotes_file.write_text(json.dumps(quotes))
+        with patch.object(gq, 'QUOTES_FILE', quotes_file), \
+                patch.object(gq, 'OUTPUT_ROOT', self.test_dir), \
+                patch.object(gq, 'HISTORY_FILE', self.test_dir / '.preview-history.json'), \
+                patch('sys.stdout'):
+            watcher = watch.Watcher(graph=lambda: watch.build_graph(encode=False), log=lambda line: None)
+            quotes.append(dict(quotes[0], id=len(quotes) + 1, text='Kaboomzilla!', theme='Humor'))
+            touch(quotes_file, json.dumps(quotes))
+            results = watcher.poll()
+
+        self.assertEqual([(name, error) for name, _, error in results], [('catalog', None)])
+        self.assertTrue((self.test_dir / 'api' / 'random-quote-humor.json').exists())
+        manifest = json.loads((self.test_dir / 'api' / 'search' / 'manifest.json').read_text())
+        self.assertEqual(manifest['quotes'], len(quotes))
+
+    def test_template_check(self):
+        """Test that unbalanced block tags are reported with line numbers"""
+        for name in ('full', 'half_horizontal', 'half_vertical', 'quadrant', 'shared', 'shared-posters'):
+            with self.subTest(template=name):
+                self.assertTrue(watch.check_template(PROJECT_ROOT / 'templates' / f'{name}.liquid'))
+
+        template = self.test_dir / 'broken.liquid'
+        for text, message in (
+            ('{% if a %}\n<p>{{ a }}</p>\n', 'line 1: {% if %} is never closed'),
+            ('{% for q in quotes %}\n{% endif %}\n{% endfor %}', 'line 2: {% endif %} but expected endfor (line 1)'),
+            ('{% else %}', 'line 1: {% else %} outside of a block'),
+        ):
+            with self.subTest(text=text):
+                template.write_text(text)
+                with self.assertRaises(ValueError) as context:
+                    watch.check_template(template)
+                self.assertIn(message, str(context.exception))
+
+        template.write_text('{%- comment -%}\n{% if %} in a comment\n{%- endcomment -%}')
+        self.assertTrue(watch.check_template(template))
+
+
+if __name__ == '__main__':
+    # Run tests with verbose output
+    unittest.main(verbosity=2)
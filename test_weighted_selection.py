@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Test suite for weighted quote selection
+
+Tests verify:
+1. Alias tables sample in proportion to their weights
+2. Weight changes are applied without rebuilding the table
+3. Excluded quotes are never picked
+4. The generator honors a weights file and the 30-day history
+"""
+
+import json
+import os
+import random
+import unittest
+import tempfile
+import shutil
+from collections import Counter
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+# Add current directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+import generate_random_quote as gq
+import weighted_selection
+from quote_record import Quote
+from weighted_selection import AliasTable, QuoteSelector, WeightedSampler
+
+
+SAMPLES = 40_000
+
+
+def frequencies(sample, weights, rng):
+    counts = Counter(sample(rng) for _ in range(SAMPLES))
+    return [counts[i] / SAMPLES for i in range(len(weights))]
+
+
+class TestWeightedSelection(unittest.TestCase):
+    """Test suite for alias tables and incremental updates"""
+
+    def assertMatchesWeights(self, observed, weights):
+        total = sum(weights)
+        for index, (share, weight) in enumerate(zip(observed, weights)):
+            self.assertAlmostEqual(share, weight / total, delta=0.015, msg=f"index {index}")
+
+    def test_alias_table_distribution(self):
+        """Test that picks follow the weights"""
+        weights = [1, 2, 3, 4, 0, 10]
+        table = AliasTable(weights)
+        self.assertMatchesWeights(frequencies(table.sample, weights, random.Random(1)), weights)
+        with self.assertRaises(ValueError):
+            AliasTable([0, 0])
+
+    def test_incremental_updates_without_rebuild(self):
+        """Test that lowered and raised weights are exact without a rebuild"""
+        sampler = WeightedSampler([4, 4, 4, 4, 4])
+        sampler.set_weight(0, 0)  # excluded
+        sampler.set_weight(1, 2)  # decayed
+        sampler.set_weight(2, 8)  # raised, goes to the overflow
+        self.assertEqual(sampler.rebuilds, 1)
+
+        expected = [0, 2, 8, 4, 4]
+        self.assertEqual(sampler.total, sum(expected))
+        self.assertMatchesWeights(frequencies(sampler.sample, expected, random.Random(2)), expected)
+
+    def test_rebuild_when_mostly_rejected(self):
+        """Test that the table is rebuilt once most of its mass is excluded"""
+        sampler = WeightedSampler([1] * 10)
+        for index in range(6):
+            sampler.set_weight(index, 0)
+        self.assertEqual(sampler.rebuilds, 2)
+        self.assertTrue(all(sampler.sample(random.Random(i)) >= 6 for i in range(100)))
+
+        for index in range(10):
+            sampler.set_weight(index, 0)
+        with self.assertRaises(IndexError):
+            sampler.sample()
+
+    def test_selector_exclusions_and_author_decay(self):
+        """Test that exclusions and recent authors update only changed weights"""
+        quotes = [
+            Quote(1, 'Skadoosh!', 'Po', 'Kung Fu Panda', 'Humor'),
+            Quote(2, 'Buddy bear hug!', 'Po', 'Kung Fu Panda 4', 'Humor'),
+            Quote(3, 'There are no accidents.', 'Master Oogway', 'Kung Fu Panda', 'Wisdom'),
+        ]
+        rules = {'author': {'Master Oogway': 2.0}, 'movie': {'Kung Fu Panda 4': 1.5}, 'recent_author_decay': 0.5}
+        selector = QuoteSelector(quotes, rules)
+        self.assertEqual(selector.sampler.weights, [1.0, 1.5, 2.0])
+
+        selector.update({1}, {'Master Oogway': 2})
+        self.assertEqual(selector.sampler.weights, [0.0, 1.5, 0.5])
+        rng = random.Random(3)
+        self.assertNotIn(0, {selector.choice(rng) for _ in range(200)})
+
+        selector.update(set(), {})
+        self.assertEqual(selector.sampler.weights, [1.0, 1.5, 2.0])
+
+
+class TestWeightedGeneration(unittest.TestCase):
+    """Test suite for weighted selection in generate_random_quote()"""
+
+    def setUp(self):
+        """Create a temporary history and weights file"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.weights_file = self.test_dir / 'weights.json'
+        self.patchers = [
+            patch.object(gq, 'HISTORY_FILE', self.test_dir / '.quote-history.json'),
+            patch.object(gq, 'WEIGHTS_FILE', self.weights_file),
+            patch('sys.stdout'),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+        weighted_selection._selectors.clear()
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        for patcher in reversed(self.patchers):
+            patcher.stop()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_weights_and_history(self):
+        """Test that zero-weight authors are skipped until only they remain"""
+        self.weights_file.write_text(json.dumps({'author': {'Mr. Ping': 0}}))
+        wisdom = [q for q in gq.load_quotes() if q.theme == 'Wisdom']
+        others = {q.id for q in wisdom if q.author != 'Mr. Ping'}
+
+        picked = [gq.generate_random_quote('wisdom') for _ in others]
+        self.assertEqual({q['id'] for q in picked}, others)
+
+        # Only Mr. Ping is left: weight 0 everywhere falls back to a uniform pick
+        self.assertEqual(gq.generate_random_quote('wisdom')['author'], 'Mr. Ping')
+
+    def test_weights_file_parsed_once(self):
+        """Test that the weights file is parsed once per version, not once per pick"""
+        self.weights_file.write_text(json.dumps({'author': {'Po': 2}}))
+        with patch.object(weighted_selection, 'load_weight_rules',
+                          wraps=weighted_selection.load_weight_rules) as load_rules:
+            for theme in ('wisdom', 'humor', 'wisdom'):
+                gq.generate_random_quote(theme)
+            self.assertEqual(load_rules.call_count, 1)
+
+            self.weights_file.write_text(json.dumps({'author': {'Po': 3}}))
+            stat = self.weights_file.stat()
+            os.utime(self.weights_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            gq.generate_random_quote('wisdom')
+            self.assertEqual(load_rules.call_count, 2)
+
+    def test_invalid_weights_file(self):
+        """Test that negative weights are rejected"""
+        self.weights_file.write_text(json.dumps({'movie': {'Kung Fu Panda': -1}}))
+        with self.assertRaises(ValueError):
+            gq.generate_random_quote('wisdom')
+
+
+if __name__ == '__main__':
+    # Run tests with verbose output
+    unittest.main(verbosity=2)
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Precompute quote text layout for every TRMNL layout
+
+The templates render quotes in 'Courier New' (monospace), so the width of a
+line is simply its character count times the font's advance width. This lets
+the generator pick the largest value size class and the line breaks that fit
+each layout's quote box ahead of time, instead of having TRMNL search for a
+font size with data-value-fit on every render.
+
+Usage:
+    python3 text_fit.py            # Report fitted layouts for every quote
+"""
+
+import json
+from pathlib import Path
+
+
+# Courier New metrics (units per em = 2048)
+UNITS_PER_EM = 2048
+ADVANCE_WIDTH = 1229  # Every glyph in a monospace font shares this advance
+
+# TRMNL framework value size classes, largest first: (class, font px, line height px)
+VALUE_SIZES = [
+    ('value--xxxlarge', 64, 72),
+    ('value--xxlarge', 52, 58),
+    ('value--xlarge', 42, 48),
+    ('value--large', 34, 40),
+    ('value', 26, 30),
+    ('value--small', 20, 24),
+    ('value--xsmall', 16, 20),
+    ('value--xxsmall', 13, 16),
+]
+
+# Quote box per layout, matching templates/*.liquid:
+#   width      - usable width of the quote column in px
+#   max_height - the data-value-fit-max-height the template used to rely on
+#   icon       - size of the inline opening/closing quote mark images in px
+#   max_size   - largest value class the template allows
+LAYOUT_BOXES = {
+    'full': {'width': 500, 'max_height': 280, 'icon': 25, 'max_size': 'value--xxxlarge'},
+    'half_horizontal': {'width': 500, 'max_height': 130, 'icon': 18, 'max_size': 'value--xxxlarge'},
+    'half_vertical': {'width': 368, 'max_height': 160, 'icon': 20, 'max_size': 'value--xxxlarge'},
+    'quadrant': {'width': 368, 'max_height': 120, 'icon': 18, 'max_size': 'value--large'},
+}
+
+
+def char_width(font_px):
+    """Width in px of a single character at the given font size"""
+    return font_px * ADVANCE_WIDTH / UNITS_PER_EM
+
+
+def line_width(line, font_px, icon_px=0):
+    """Rendered width in px of a line of text plus any inline quote mark icons
+
+    Args:
+        line: Text of the line
+        font_px: Font size in px
+        icon_px: Total width of quote mark images placed on this line
+
+    Returns:
+        Width in px
+    """
+    return len(line) * char_width(font_px) + icon_px
+
+
+def wrap_text(text, font_px, box_width, icon_px):
+    """Greedily wrap text into lines that fit box_width at font_px
+
+    The opening quote mark sits on the first line and the closing mark on the
+    last line, so their widths are reserved there.
+
+    Args:
+        text: Quote text
+        font_px: Font size in px
+        box_width: Available width in px
+        icon_px: Width of a single quote mark image in px
+
+    Returns:
+        List of lines, or None if a single word cannot fit on a line
+    """
+    words = text.split()
+    lines = []
+    current = ''
+
+    for word in words:
+        candidate = f"{current} {word}" if current else word
+        reserved = icon_px if not lines else 0
+        if line_width(candidate, font_px, reserved) <= box_width:
+            current = candidate
+            continue
+        if not current:
+            return None
+        lines.append(current)
+        current = word
+        if line_width(current, font_px) > box_width:
+            return None
+
+    lines.append(current)
+
+    # Make room for the closing quote mark on the last line
+    first_reserved = icon_px if len(lines) == 1 else 0
+    if line_width(lines[-1], font_px, icon_px + first_reserved) > box_width:
+        last_words = lines[-1].split()
+        if len(last_words) < 2:
+            return None
+        lines[-1] = ' '.join(last_words[:-1])
+        lines.append(last_words[-1])
+
+    return lines
+
+
+def fits(layout, size, lines):
+    """Check that the given lines render inside a layout's quote box
+
+    Args:
+        layout: Layout name (key of LAYOUT_BOXES)
+        size: Value size class name
+        lines: List of text lines
+
+    Returns:
+        True if no line is too wide and the block is not too tall
+    """
+    box = LAYOUT_BOXES[layout]
+    font_px, line_px = next((f, h) for name, f, h in VALUE_SIZES if name == size)
+
+    if len(lines) * line_px > box['max_height']:
+        return False
+
+    for i, line in enumerate(lines):
+        icon_px = 0
+        if i == 0:
+            icon_px += box['icon']
+        if i == len(lines) - 1:
+            icon_px += box['icon']
+        if line_width(line, font_px, icon_px) > box['width']:
+            return False
+
+    return True
+
+
+def fit_layout(text, layout):
+    """Find the largest value size and line breaks that fit a layout
+
+    Args:
+        text: Quote text
+        layout: Layout name (key of LAYOUT_BOXES)
+
+    Returns:
+        Dictionary with 'size' (value class) and 'lines' (list of strings),
+        or None if the text does not fit even at the smallest size
+    """
+    box = LAYOUT_BOXES[layout]
+    names = [name for name, _, _ in VALUE_SIZES]
+    start = names.index(box['max_size'])
+
+    for name, font_px, _ in VALUE_SIZES[start:]:
+        lines = wrap_text(text, font_px, box['width'], box['icon'])
+        if lines is not None and fits(layout, name, lines):
+            return {'size': name, 'lines': lines}
+
+    return None
+
+
+def fit_quote_layouts(text):
+    """Precompute size class and line breaks of a quote for every layout
+
+    Layouts the text cannot fit are left out, so templates fall back to
+    data-value-fit for them.
+
+    Args:
+        text: Quote text
+
+    Returns:
+        Dictionary mapping layout name to {'size': ..., 'lines': [...]}
+    """
+    layouts = {}
+    for layout in LAYOUT_BOXES:
+        fitted = fit_layout(text, layout)
+        if fitted is not None:
+            layouts[layout] = fitted
+    return layouts
+
+
+if __name__ == "__main__":
+    quotes_file = Path(__file__).parent / "quotes.json"
+    with open(quotes_file, 'r', encoding='utf-8') as f:
+        quotes = json.load(f)
+
+    print(f"📐 Fitting {len(quotes)} quotes into {len(LAYOUT_BOXES)} layouts\n")
+
+    unfitted = 0
+    for quote in quotes:
+        layouts = fit_quote_layouts(quote['text'])
+        sizes = ', '.join(f"{name}={fitted['size']}/{len(fitted['lines'])}L" for name, fitted in layouts.items())
+        print(f"  #{quote['id']:<3} {sizes}")
+        unfitted += len(LAYOUT_BOXES) - len(layouts)
+
+    if unfitted:
+        print(f"\n⚠️  {unfitted} quote/layout combinations fall back to data-value-fit")
+    else:
+        print(f"\n✅ Every quote fits every layout")
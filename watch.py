@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Watch mode: rebuild only what an edit affects
+
+Keeps a dependency graph from source files to the files built from them and
+polls the sources. When a file changes, only the rules that read it run,
+followed by the rules that read their outputs:
+
+    quotes.json (+ --weights)                  -> api/random-quote-*.json, api/search, api/catalog
+    assets/posters-small/<poster>              -> poster_kfp_<n> block in templates/shared-posters.liquid
+    assets/posters-small-bw-outline/
+        kung-fu-panda-<n>-poster-bw-outline.png -> ...-webp.webp (needs cwebp)
+        kung-fu-panda-<n>-poster-bw-outline-webp.webp -> poster_kfp_<n>_bw block
+    templates/*.liquid                         -> Liquid tag check (unclosed or stray blocks)
+
+Editing one poster re-encodes and re-embeds that poster only; editing the
+catalog regenerates the endpoints and republishes the search index and
+paged catalog (both skip files that did not change). Templates have no
+build step (TRMNL renders them), so a template edit is checked for
+unbalanced Liquid block tags, which is the mistake that otherwise only
+shows up in the TRMNL editor.
+
+Polling a few dozen files with os.stat() every quarter second costs well
+under a millisecond, so no inotify dependency is needed and it works the
+same on macOS and Linux.
+
+Endpoints picked while watching are recorded in a separate history
+(.preview-history.json), so previews do not use up the daily rotation.
+
+Usage:
+    python3 watch.py                      # Watch until Ctrl-C
+    python3 watch.py --interval 1         # Poll every second
+    python3 serve_quotes.py               # In another terminal, to preview the endpoints
+"""
+
+import argparse
+import re
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Callable, NamedTuple, Tuple
+
+import embed_posters
+import embed_posters_bw_outline
+import generate_random_quote as gq
+import profiling
+
+
+PROJECT_ROOT = Path(__file__).parent
+TEMPLATES_DIR = PROJECT_ROOT / 'templates'
+PREVIEW_HISTORY = PROJECT_ROOT / '.preview-history.json'
+
+POLL_INTERVAL = 0.25  # seconds
+# Wait this long for an editor to finish writing before building
+SETTLE_TIME = 0.05
+
+# Liquid block tags and the tags allowed directly inside them
+BLOCK_TAGS = {'if': {'elsif', 'else'}, 'unless': {'elsif', 'else'}, 'case': {'when', 'else'},
+              'for': {'else'}, 'tablerow': set(), 'capture': set(), 'comment': set(), 'raw': set()}
+LIQUID_TAG = re.compile(r'{%-?\s*(\w+)')
+
+
+class Rule(NamedTuple):
+    """One build step: run build() when any input changes"""
+    name: str
+    inputs: Tuple[Path, ...]
+    outputs: Tuple[Path, ...]
+    build: Callable[[], object]
+
+
+def file_state(path):
+    """(mtime_ns, size) of a file, or None if it does not exist"""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def snapshot(paths):
+    """Path -> file_state() for every path"""
+    return {path: file_state(path) for path in paths}
+
+
+def order_rules(rules):
+    """Rules in build order: every rule after the rules producing its inputs
+
+    Raises:
+        ValueError: If the rules form a cycle
+    """
+    producers = {}
+    for rule in rules:
+        for output in rule.outputs:
+            producers.setdefault(output, []).append(rule.name)
+
+    by_name = {rule.name: rule for rule in rules}
+    ordered, visiting, done = [], set(), set()
+
+    def visit(rule):
+        if rule.name in done:
+            return
+        if rule.name in visiting:
+            raise ValueError(f"dependency cycle through rule '{rule.name}'")
+        visiting.add(rule.name)
+        for path in rule.inputs:
+            for producer in producers.get(path, ()):
+                if producer != rule.name:
+                    visit(by_name[producer])
+        visiting.discard(rule.name)
+        done.add(rule.name)
+        ordered.append(rule)
+
+    for rule in rules:
+        visit(rule)
+    return ordered
+
+
+def affected(rules, changed):
+    """Names of the rules an edit to the changed paths would run, in build order"""
+    dirty, names = set(changed), []
+    for rule in order_rules(rules):
+        if dirty.intersection(rule.inputs):
+            names.append(rule.name)
+            dirty.update(rule.outputs)
+    return names
+
+
+def check_template(path):
+    """Check a Liquid template for unclosed, stray or misplaced block tags
+
+    Raises:
+        ValueError: Listing every problem with its line number
+    """
+    content = Path(path).read_text(encoding='utf-8')
+    problems, stack = [], []
+    for match in LIQUID_TAG.finditer(content):
+        tag = match.group(1)
+        line = content.count('\n', 0, match.start()) + 1
+        # Nothing inside comment/raw is a tag
+        if stack and stack[-1][0] in ('comment', 'raw') and tag != f'end{stack[-1][0]}':
+            continue
+        if tag in BLOCK_TAGS:
+            stack.append((tag, line))
+        elif tag.startswith('end') and tag[3:] in BLOCK_TAGS:
+            if not stack or stack[-1][0] != tag[3:]:
+                expected = f"end{stack[-1][0]} (line {stack[-1][1]})" if stack else 'no open block'
+                problems.append(f"line {line}: {{% {tag} %}} but expected {expected}")
+                continue
+            stack.pop()
+        elif any(tag in inner for inner in BLOCK_TAGS.values()):
+            if not stack or tag not in BLOCK_TAGS[stack[-1][0]]:
+                problems.append(f"line {line}: {{% {tag} %}} outside of a block that allows it")
+    problems.extend(f"line {line}: {{% {tag} %}} is never closed" for tag, line in stack)
+    if problems:
+        raise ValueError(f"{Path(path).name}: " + '; '.join(problems))
+    return True
+
+
+def rebuild_catalog():
+    """Regenerate the endpoints and republish the search index and paged catalog"""
+    gq.generate_all_theme_files()
+    gq.publish_search_index()
+    gq.publish_catalog_pages()
+
+
+def encode_bw_poster(source, output):
+    """Re-encode one BW outline poster to WebP with the quality-aware search"""
+    import resize_posters_webp  # Needs Pillow
+
+    temp_output = str(output) + '.tmp'
+    try:
+        chosen, _ = resize_posters_webp.find_optimal_width(str(source), temp_output,
+                                                            resize_posters_webp.TARGET_MAX_SIZE)
+    finally:
+        Path(temp_output).unlink(missing_ok=True)
+    if chosen is None:
+        raise RuntimeError(f"{source.name}: no width fits {resize_posters_webp.TARGET_MAX_SIZE / 1024:.0f} KB")
+    resize_posters_webp.resize_and_convert_to_webp(str(source), str(output), chosen['width'], chosen['setting'])
+
+
+def embedded(embed, number):
+    """Build step for one poster block (the embed functions return False on failure)"""
+    def build():
+        if not embed(number):
+            raise RuntimeError(f"could not embed poster {number}")
+    return build
+
+
+def build_graph(encode=None):
+    """Every rule for the files currently on disk
+
+    Args:
+        encode: Whether BW outline sources are re-encoded (default: if cwebp is installed)
+    """
+    if encode is None:
+        encode = shutil.which('cwebp') is not None
+    shared_file = embed_posters.SHARED_FILE
+
+    catalog_inputs = (Path(gq.QUOTES_FILE),) + ((Path(gq.WEIGHTS_FILE),) if gq.WEIGHTS_FILE else ())
+    api_dir = Path(gq.OUTPUT_ROOT) / 'api'
+    rules = [Rule('catalog', catalog_inputs,
+                  (api_dir / 'random-quote-all.json', api_dir / 'search' / 'manifest.json',
+                   api_dir / 'catalog' / 'manifest.json'),
+                  rebuild_catalog)]
+
+    for number, filename in enumerate(embed_posters.POSTER_FILES, 1):
+        rules.append(Rule(f'embed:{number}', (embed_posters.POSTER_DIR / filename,), (shared_file,),
+                          embedded(embed_posters.embed_poster, number)))
+
+    bw_dir = embed_posters_bw_outline.POSTER_DIR
+    for number, filename in enumerate(embed_posters_bw_outline.POSTER_FILES, 1):
+        webp = bw_dir / filename
+        if encode:
+            source = bw_dir / filename.replace('-webp.webp', '.png')
+            rules.append(Rule(f'encode-bw:{number}', (source,), (webp,),
+                              lambda source=source, webp=webp: encode_bw_poster(source, webp)))
+        rules.append(Rule(f'embed-bw:{number}', (webp,), (shared_file,),
+                          embedded(embed_posters_bw_outline.embed_bw_outline_poster, number)))
+
+    for template in sorted(TEMPLATES_DIR.glob('*.liquid')):
+        rules.append(Rule(f'template:{template.stem}', (template,), (),
+                          lambda template=template: check_template(template)))
+    return order_rules(rules)
+
+
+class Watcher:
+    """Polls the graph's inputs and runs the rules affected by each change"""
+
+    def __init__(self, graph=build_graph, log=print):
+        """
+        Args:
+            graph: Function returning the ordered rules (called on every poll,
+                so new templates are picked up)
+            log: Function for progress lines
+        """
+        self.graph = graph
+        self.log = log
+        self.state = snapshot(self.watched(graph()))
+
+    @staticmethod
+    def watched(rules):
+        return {path for rule in rules for path in rule.inputs + rule.outputs}
+
+    def changes(self, rules):
+        """Paths whose state differs from the last poll, once writes settle"""
+        paths = self.watched(rules)
+        current = snapshot(paths)
+        changed = {path for path in paths if current[path] != self.state.get(path)}
+        while changed and SETTLE_TIME:
+            time.sleep(SETTLE_TIME)
+            settled = snapshot(paths)
+            if settled == current:
+                break
+            changed |= {path for path in paths if settled[path] != current[path]}
+            current = settled
+        self.state = current
+        return changed
+
+    def poll(self):
+        """Check once and rebuild what changed
+
+        Returns:
+            List of (rule name, seconds, error or None) for the rules that ran
+        """
+        rules = self.graph()
+        dirty = self.changes(rules)
+        if not dirty:
+            return []
+
+        names = ', '.join(sorted(str(p.relative_to(PROJECT_ROOT)) if p.is_relative_to(PROJECT_ROOT) else str(p)
+                                 for p in dirty))
+        self.log(f"\n✏️  Changed: {names}")
+        results = []
+        for rule in rules:
+            if not dirty.intersection(rule.inputs):
+                continue
+            start = time.perf_counter()
+            try:
+                rule.build()
+                error = None
+            except Exception as e:
+                error = str(e)
+            elapsed = time.perf_counter() - start
+            results.append((rule.name, elapsed, error))
+            if error:
+                self.log(f"❌ {rule.name}: {error}")
+                continue
+            self.log(f"🔁 {rule.name} rebuilt in {elapsed * 1000:.0f} ms")
+            dirty.update(rule.outputs)
+            # Our own writes are not edits
+            self.state.update(snapshot(rule.outputs))
+        return results
+
+    def run(self, interval=POLL_INTERVAL):
+        """Poll until interrupted"""
+        while True:
+            self.poll()
+            time.sleep(interval)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Rebuild endpoints, poster embeds and checks as files change')
+    parser.add_argument('--interval', type=float, default=POLL_INTERVAL, help='Seconds between polls (default: 0.25)')
+    parser.add_argument('--catalog', type=Path, help='Quote catalog (default: quotes.json)')
+    parser.add_argument('--weights', type=Path, help='Weights file (see weighted_selection.py)')
+    parser.add_argument('--history', type=Path, default=PREVIEW_HISTORY,
+                        help='History for endpoints generated while watching (default: .preview-history.json)')
+    args = parser.parse_args(argv)
+
+    if args.catalog:
+        gq.QUOTES_FILE = args.catalog
+    if args.weights:
+        gq.WEIGHTS_FILE = args.weights
+    gq.HISTORY_FILE = args.history
+
+    rules = build_graph()
+    if not any(rule.name.startswith('encode-bw') for rule in rules):
+        print("⚠️  cwebp not found: BW outline sources will not be re-encoded (install via: brew install webp)")
+    watcher = Watcher()
+    print(f"👀 Watching {len(Watcher.watched(rules))} files for {len(rules)} rules (Ctrl-C to stop)")
+    try:
+        watcher.run(args.interval)
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(profiling.run_main(main))
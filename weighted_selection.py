@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Weighted quote selection with Vose alias tables
+
+random.choice() treats every quote alike. With a weights file, quotes are
+picked in proportion to a weight built from per-author, per-movie and
+per-theme multipliers, with an optional decay for authors shown recently:
+
+    {
+      "author": {"Master Oogway": 2.0},
+      "movie": {"Kung Fu Panda 4": 1.5},
+      "theme": {},
+      "recent_author_decay": 0.5
+    }
+
+A quote's weight is the product of its multipliers (1.0 when not listed),
+times recent_author_decay for every time its author appears in the 30-day
+history. Recently used quotes get weight 0.
+
+Each theme pool gets an alias table, built once in O(n); a pick is O(1).
+Weight changes (exclusions, author decay) do not rebuild the table:
+lowered weights are handled by rejecting a table pick with probability
+1 - weight/built weight, and raised weights go to a small overflow list
+sampled directly. The table is rebuilt only when more than half of its
+mass has been rejected away or the overflow grows past OVERFLOW_LIMIT.
+
+Usage:
+    python3 generate_random_quote.py --weights weights.json
+"""
+
+import json
+import os
+import random
+import threading
+
+
+# Rebuild when the overflow holds more raised weights than this
+OVERFLOW_LIMIT = 32
+
+# Rebuild when less than this share of the table's mass can still be accepted
+MIN_ACCEPTANCE = 0.5
+
+# Selector tables kept in memory (one per catalog + theme + rules)
+MAX_CACHED_SELECTORS = 32
+
+RULE_KEYS = ('author', 'movie', 'theme')
+
+
+class AliasTable:
+    """Vose's alias method: O(n) build, O(1) sampling"""
+
+    def __init__(self, weights):
+        n = len(weights)
+        total = sum(weights)
+        if n == 0 or total <= 0:
+            raise ValueError('alias table needs a positive total weight')
+
+        scaled = [w * n / total for w in weights]
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] += scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Whatever is left over is 1.0 up to rounding error
+
+    def sample(self, rng=random):
+        """Index drawn in proportion to the build weights"""
+        i = rng.randrange(len(self.prob))
+        return i if rng.random() < self.prob[i] else self.alias[i]
+
+
+class WeightedSampler:
+    """Alias-table sampler whose weights can change without a full rebuild"""
+
+    def __init__(self, weights):
+        self.weights = [float(w) for w in weights]
+        self.rebuilds = 0
+        self._rebuild()
+
+    def _rebuild(self):
+        self._built = list(self.weights)
+        self._built_total = sum(self._built)
+        self._table = AliasTable(self._built) if self._built_total > 0 else None
+        self._accepted_total = self._built_total  # Sum of min(weight, built weight)
+        self._overflow = {}  # index -> weight above the built weight
+        self._overflow_total = 0.0
+        self.rebuilds += 1
+
+    @property
+    def total(self):
+        """Current total weight"""
+        return self._accepted_total + self._overflow_total
+
+    def set_weight(self, index, weight):
+        """Change one weight (0 excludes the item)"""
+        if weight < 0:
+            raise ValueError('weights must not be negative')
+        old, built = self.weights[index], self._built[index]
+        self.weights[index] = weight = float(weight)
+
+        self._accepted_total += min(weight, built) - min(old, built)
+        extra = weight - built
+        self._overflow_total += max(extra, 0.0) - self._overflow.pop(index, 0.0)
+        if extra > 0:
+            self._overflow[index] = extra
+
+        if (len(self._overflow) > OVERFLOW_LIMIT
+                or self._accepted_total < self._built_total * MIN_ACCEPTANCE):
+            self._rebuild()
+
+    def sample(self, rng=random):
+        """Index drawn in proportion to the current weights
+
+        Raises:
+            IndexError: If every weight is 0
+        """
+        if self.total <= 0:
+            raise IndexError('no weighted items to choose from')
+
+        while True:
+            r = rng.random() * (self._built_total + self._overflow_total)
+            if r >= self._built_total and self._overflow:
+                r -= self._built_total
+                for index, extra in self._overflow.items():
+                    r -= extra
+                    if r < 0:
+                        return index
+                return index
+
+            index = self._table.sample(rng)
+            weight, built = self.weights[index], self._built[index]
+            # Accept with probability weight / built weight
+            if weight >= built or rng.random() * built < weight:
+                return index
+
+
+def load_weight_rules(path):
+    """Load and validate a weights file
+
+    Raises:
+        ValueError: If a multiplier or the decay is not a non-negative number
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        rules = json.load(f)
+
+    for key in RULE_KEYS:
+        for name, value in rules.get(key, {}).items():
+            if not isinstance(value, (int, float)) or value < 0:
+                raise ValueError(f"{path}: {key} weight for '{name}' must be a non-negative number")
+    decay = rules.get('recent_author_decay', 1.0)
+    if not isinstance(decay, (int, float)) or decay < 0:
+        raise ValueError(f"{path}: recent_author_decay must be a non-negative number")
+    return rules
+
+
+# Parsed weights files by (path, size, mtime_ns), reused while unchanged
+_rules_cache = {}
+_rules_lock = threading.Lock()
+
+
+def cached_weight_rules(path):
+    """load_weight_rules(), parsed once per version of the file
+
+    Returns:
+        Tuple of (rules, canonical JSON of the rules for cache keys)
+    """
+    stat = os.stat(path)
+    key = (str(path), stat.st_size, stat.st_mtime_ns)
+    with _rules_lock:
+        entry = _rules_cache.get(key)
+    if entry is None:
+        rules = load_weight_rules(path)
+        entry = (rules, json.dumps(rules, sort_keys=True))
+        with _rules_lock:
+            while len(_rules_cache) >= MAX_CACHED_SELECTORS:
+                _rules_cache.pop(next(iter(_rules_cache)))
+            _rules_cache[key] = entry
+    return entry
+
+
+def base_weight(quote, rules):
+    """Product of the quote's author, movie and theme multipliers"""
+    weight = 1.0
+    for key in RULE_KEYS:
+        weight *= rules.get(key, {}).get(getattr(quote, key), 1.0)
+    return weight
+
+
+class QuoteSelector:
+    """Weighted picks from one quote pool, kept in sync with the history
+
+    Picks return an index into the pool the selector was built from.
+    """
+
+    def __init__(self, quotes, rules):
+        self.decay = rules.get('recent_author_decay', 1.0)
+        self.ids, self.authors, self.base = [], [], []
+        self.index_of, self.by_author = {}, {}
+        for index, quote in enumerate(quotes):
+            self.ids.append(quote.id)
+            self.authors.append(quote.author)
+            self.base.append(base_weight(quote, rules))
+            self.index_of.setdefault(quote.id, index)
+            self.by_author.setdefault(quote.author, []).append(index)
+
+        self.excluded = set()
+        self.author_counts = {}
+        self.sampler = WeightedSampler(self.base)
+
+    def weight(self, index):
+        """Current weight of the quote at index"""
+        if index in self.excluded:
+            return 0.0
+        return self.base[index] * self.decay ** self.author_counts.get(self.authors[index], 0)
+
+    def update(self, excluded_ids, author_counts):
+        """Apply the current exclusions and recent author counts
+
+        Only quotes whose weight changed are touched.
+
+        Args:
+            excluded_ids: Quote ids that must not be picked
+            author_counts: Dictionary of author -> appearances in the history
+        """
+        excluded = {self.index_of[i] for i in excluded_ids if i in self.index_of}
+        changed = excluded ^ self.excluded
+        if self.decay != 1.0:
+            for author in set(author_counts) | set(self.author_counts):
+                if author_counts.get(author, 0) != self.author_counts.get(author, 0):
+                    changed.update(self.by_author.get(author, ()))
+
+        self.excluded = excluded
+        self.author_counts = dict(author_counts)
+        for index in changed:
+            self.sampler.set_weight(index, self.weight(index))
+
+    def choice(self, rng=random):
+        """Index of a weighted random quote
+
+        Raises:
+            IndexError: If every remaining quote has weight 0
+        """
+        return self.sampler.sample(rng)
+
+
+_selectors = {}
+# multi_tenant.py picks for several tenants at once on a thread pool
+_selectors_lock = threading.Lock()
+
+
+def selector_for(key, quotes, rules):
+    """Cached selector for a pool (built on first use)
+
+    Args:
+        key: Identifies the pool and rules; must change when either changes
+        quotes: The pool, in a stable order
+        rules: Weight rules
+    """
+    with _selectors_lock:
+        selector = _selectors.pop(key, None)
+        if selector is not None:
+            _selectors[key] = selector
+            return selector
+
+    # Built outside the lock so other tenants are not held up
+    selector = QuoteSelector(quotes, rules)
+    with _selectors_lock:
+        while len(_selectors) >= MAX_CACHED_SELECTORS:
+            _selectors.pop(next(iter(_selectors)))
+        _selectors[key] = selector
+    return selector